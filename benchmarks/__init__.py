@@ -0,0 +1,64 @@
+"""
+Benchmarks for import time, resource registration, icon construction, pixmap
+throughput and memory. All measurements are lower is better.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import subprocess
+import sys
+import time
+from collections.abc import Callable
+
+# Prepended to the source of measurements that run in a new interpreter.
+PRELUDE = '''
+import json, os, sys, time
+
+def rss():
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except OSError:
+        return 0
+
+result = {}
+'''
+
+
+def run_python(source: str) -> dict[str, float]:
+    """
+    Run 'source' in a new headless interpreter and return the 'result' dictionary
+    it fills.
+    """
+
+    source = PRELUDE + source + '\nprint(json.dumps(result))\n'
+    env = dict(os.environ, QT_QPA_PLATFORM='offscreen')
+    process = subprocess.run(
+        [sys.executable, '-c', source],
+        capture_output=True,
+        text=True,
+        env=env,
+    )
+    if process.returncode:
+        raise RuntimeError(process.stderr)
+    return json.loads(process.stdout.splitlines()[-1])
+
+
+def best_of(results: list[dict[str, float]]) -> dict[str, float]:
+    """Return the lowest value of every measurement across runs."""
+
+    return {key: min(result[key] for result in results) for key in results[0]}
+
+
+def timeit(func: Callable[[], object], number: int = 100, repeat: int = 5) -> float:
+    """Return the best time in seconds per call of 'func'."""
+
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        times.append((time.perf_counter() - start) / number)
+    return min(times)
@@ -0,0 +1,99 @@
+"""
+Run the benchmarks headless and compare them against a baseline.
+
+python -m benchmarks --output results.json
+python -m benchmarks --baseline results.json --threshold 0.2
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import os
+import platform
+import sys
+
+SUITES = ('startup', 'resources', 'render')
+
+logger = logging.getLogger(__name__)
+
+
+def run(suites: tuple[str, ...]) -> dict[str, float]:
+    """Run the suites and return all measurements."""
+
+    from benchmarks import render, resources, startup
+
+    results = {}
+    if 'startup' in suites:
+        results.update(startup.run())
+    if 'resources' in suites:
+        results.update(resources.run())
+    if 'render' in suites:
+        results.update(render.run())
+    return results
+
+
+def compare(
+    results: dict[str, float], baseline: dict[str, float], threshold: float
+) -> list[str]:
+    """Print the measurements next to the baseline and return the regressions."""
+
+    regressions = []
+    for key, value in results.items():
+        base = baseline.get(key)
+        if not base:
+            print(f'{key:<48} {value:>14.6g}')
+            continue
+        change = (value - base) / base
+        marker = ''
+        if change > threshold:
+            marker = ' REGRESSION'
+            regressions.append(key)
+        print(f'{key:<48} {value:>14.6g} {base:>14.6g} {change:>+8.1%}{marker}')
+    return regressions
+
+
+def main() -> None:
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--suites', nargs='+', default=SUITES, choices=SUITES)
+    parser.add_argument('-o', '--output', help='The path to save the json results.')
+    parser.add_argument('--baseline', help='The path of json results to compare.')
+    parser.add_argument(
+        '--threshold',
+        type=float,
+        default=0.2,
+        help='The relative change that counts as a regression.',
+    )
+    args = parser.parse_args()
+
+    import qt_material_icons
+
+    data = {
+        'version': qt_material_icons.__version__,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'results': run(tuple(args.suites)),
+    }
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(data, f, indent=2)
+        logger.info(f'Results saved: {args.output}')
+
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)['results']
+
+    regressions = compare(data['results'], baseline, args.threshold)
+    if regressions:
+        logger.error(f'{len(regressions)} measurements regressed.')
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    main()
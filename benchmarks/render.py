@@ -0,0 +1,94 @@
+"""
+Measure icon construction, pixmap() and fill_pixmap throughput in the current
+process. A QApplication is created if there is none.
+"""
+
+from __future__ import annotations
+
+from benchmarks import timeit
+
+SIZES = (16, 24, 48, 96, 256)
+DPRS = (1.0, 1.25, 1.5, 2.0)
+
+
+def run(name: str = 'search', sizes: tuple[int, ...] = SIZES) -> dict[str, float]:
+    """Return the seconds per call of the rendering functions."""
+
+    from qt_material_icons import MaterialIcon, SVGIcon, pixmap_cache
+    from qt_material_icons._engine import fill_pixmap
+    from qt_material_icons._icon import QtGui, QtWidgets
+
+    app = QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+
+    results = {}
+    results['render.construct.seconds'] = timeit(lambda: MaterialIcon(name))
+
+    icon = MaterialIcon(name)
+    color = QtGui.QColor('red')
+    for size in sizes:
+
+        def cold() -> None:
+            clear_caches()
+            icon.pixmap(size)
+
+        def tint() -> None:
+            pixmap_cache.clear()
+            icon.pixmap(size)
+
+        results[f'render.pixmap.cold.{size}.seconds'] = timeit(cold)
+        # Only the pixmap is rendered again, the alpha mask is cached.
+        results[f'render.pixmap.tint.{size}.seconds'] = timeit(tint)
+        results[f'render.pixmap.warm.{size}.seconds'] = timeit(
+            lambda: icon.pixmap(size)
+        )
+        pixmap = icon.pixmap(size)
+        results[f'render.fill_pixmap.{size}.seconds'] = timeit(
+            lambda: fill_pixmap(pixmap, color)
+        )
+
+    # Tinted alpha masks compared to SVGs filled in the paint pass, a fill_pixmap
+    # pass and compiled paths, all rendered from the SVG data. Another color of an
+    # icon only renders the pixmap again, the parsed SVG and the mask are kept.
+    for rendering in SVGIcon.Rendering:
+        SVGIcon.set_rendering(rendering)
+        for size in sizes:
+
+            def colored() -> None:
+                clear_caches()
+                icon.pixmap(size, color=color)
+
+            def recolored() -> None:
+                pixmap_cache.clear()
+                icon.pixmap(size, color=color)
+
+            key = f'render.rendering.{rendering.value}.{size}.seconds'
+            results[key] = timeit(colored)
+            key = f'render.rendering.{rendering.value}.recolor.{size}.seconds'
+            results[key] = timeit(recolored)
+    SVGIcon.set_rendering(SVGIcon.Rendering.MASK)
+
+    # Fractional scaling renders at the exact pixel size for every ratio.
+    for dpr in DPRS:
+
+        def scaled() -> None:
+            clear_caches()
+            icon.pixmap(24, dpr=dpr)
+
+        results[f'render.pixmap.dpr.{dpr}.seconds'] = timeit(scaled)
+
+    clear_caches()
+    del app
+    return results
+
+
+def clear_caches() -> None:
+    """Clear every cache layer, so icons are rendered from their SVG data."""
+
+    from qt_material_icons import _engine, _path
+    from qt_material_icons._cache import image_cache, mask_cache, pixmap_cache
+
+    pixmap_cache.clear()
+    image_cache.clear()
+    mask_cache.clear()
+    _engine._renderers.clear()
+    _path.clear()
@@ -0,0 +1,81 @@
+"""
+Compare registration time and resident memory of the rcc resource modules and the
+icon packs for every style and size. Every measurement runs in a new interpreter.
+
+python -m benchmarks.resources --styles outlined --sizes 20 24
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+
+from benchmarks import run_python
+
+STYLES = ('outlined', 'rounded', 'sharp')
+SIZES = (20, 24, 40, 48)
+
+SOURCE = '''
+from qt_material_icons import MaterialIcon
+from qt_material_icons._icon import QtCore
+
+style = MaterialIcon.Style({style!r})
+path = MaterialIcon.resource_path({name!r}, style, False, {size})
+rss_start = rss()
+start = time.perf_counter()
+{loader}
+result['seconds'] = time.perf_counter() - start
+result['rss'] = rss() - rss_start
+result['bytes'] = len(data)
+'''
+
+RCC = '''
+MaterialIcon.import_resource(style, {size})
+f = QtCore.QFile(path)
+f.open(QtCore.QIODevice.OpenModeFlag.ReadOnly)
+data = bytes(f.readAll())
+'''
+
+PACK = '''
+pack = MaterialIcon.resource_pack(style, {size})
+data = pack.data(os.path.basename(path))
+'''
+
+
+def run(
+    styles: tuple[str, ...] = STYLES,
+    sizes: tuple[int, ...] = SIZES,
+    name: str = 'search',
+) -> dict[str, float]:
+    """Return the time and memory used to read one icon of every resource."""
+
+    results = {}
+    for style in styles:
+        for size in sizes:
+            for format_, loader in (('rcc', RCC), ('pack', PACK)):
+                source = SOURCE.format(
+                    style=style,
+                    size=size,
+                    name=name,
+                    loader=loader.format(size=size),
+                )
+                result = run_python(source)
+                prefix = f'resources.{format_}.{style}.{size}'
+                results[f'{prefix}.seconds'] = result['seconds']
+                results[f'{prefix}.rss'] = result['rss']
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--styles', nargs='+', default=STYLES, choices=STYLES)
+    parser.add_argument('--sizes', nargs='+', type=int, default=SIZES, choices=SIZES)
+    parser.add_argument('--name', default='search')
+    args = parser.parse_args()
+
+    results = run(tuple(args.styles), tuple(args.sizes), args.name)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
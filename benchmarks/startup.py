@@ -0,0 +1,38 @@
+"""
+Measure the import of qt_material_icons and the construction and first render of
+an icon, each in a new interpreter.
+"""
+
+from __future__ import annotations
+
+from benchmarks import best_of, run_python
+
+SOURCE = '''
+rss_start = rss()
+start = time.perf_counter()
+import qt_material_icons
+from qt_material_icons import MaterialIcon
+result['import.seconds'] = time.perf_counter() - start
+result['import.rss'] = rss() - rss_start
+
+from qt_material_icons._icon import QtWidgets
+app = QtWidgets.QApplication([])
+
+rss_start = rss()
+start = time.perf_counter()
+icon = MaterialIcon({name!r})
+result['first_icon.seconds'] = time.perf_counter() - start
+
+start = time.perf_counter()
+icon.pixmap(24)
+result['first_pixmap.seconds'] = time.perf_counter() - start
+result['first_icon.rss'] = rss() - rss_start
+'''
+
+
+def run(name: str = 'search', repeat: int = 3) -> dict[str, float]:
+    """Return the startup measurements."""
+
+    source = SOURCE.format(name=name)
+    results = best_of([run_python(source) for _ in range(repeat)])
+    return {f'startup.{key}': value for key, value in results.items()}
@@ -1,16 +1,43 @@
+from __future__ import annotations
+
+import argparse
+import concurrent.futures
+import hashlib
+import json
 import logging
 import os
+import shutil
 import subprocess
+import urllib.request
+from collections.abc import Sequence
 
 from qt_material_icons import MaterialIcon
-from qt_material_icons.create import create_resource_file, qrc_file, write_qrc_file
+from qt_material_icons._catalog import Catalog, variant_bit
+from qt_material_icons._font import font_filename
+from qt_material_icons._path import VERSION as PATH_VERSION
+from qt_material_icons.create import create_pack_file, create_resource_file, pack_file
+from qt_material_icons.optimize import (
+    DIFF_THRESHOLD,
+    PRECISION,
+    VERSION as OPTIMIZE_VERSION,
+    optimize_files,
+)
+from qt_material_icons.precompile import compile_files
+from qt_material_icons.render import init_worker
 
 BUILD_DIR = 'build'
+RESOURCE_DIR = os.path.join('qt_material_icons', 'resources')
+SOURCE_DIR = os.path.join('material-design-icons', 'symbols', 'web')
+FONT_DIR = os.path.join('material-design-icons', 'variablefont')
+MANIFEST_PATH = os.path.join(BUILD_DIR, 'manifest.json')
+TAGS_PATH = os.path.join(BUILD_DIR, 'tags.json')
+OPTIMIZE_REPORT_PATH = os.path.join(BUILD_DIR, 'optimize.json')
+METADATA_URL = 'https://fonts.google.com/metadata/icons?key=material_symbols'
 SIZES = (20, 24, 40, 48)
 
 
-def clone_repo() -> None:
-    """Clone the source repo."""
+def clone_repo(pull: bool = True) -> None:
+    """Clone the source repo and pull it unless 'pull' is False."""
 
     repo = 'material-design-icons'
 
@@ -27,7 +54,11 @@ def clone_repo() -> None:
         )
         subprocess.run('git config core.sparseCheckout true', cwd=repo, shell=True)
         with open(os.path.join(repo, '.git', 'info', 'sparse-checkout'), 'a') as f:
-            f.write('symbols/web/')
+            f.write('symbols/web/\n')
+            f.write('variablefont/\n')
+    elif not pull:
+        logging.info(f'Using repo without pulling: {repo}')
+        return
 
     logging.info(f'Pulling repo: {repo}')
     subprocess.run(
@@ -37,51 +68,345 @@ def clone_repo() -> None:
     )
 
 
-def create_qrc_files(force: bool = False) -> None:
-    """Create the resource files for all icon sets."""
+def scan_sources() -> dict[str, dict[str, set[str]]]:
+    """Return the svg filenames of every icon by style, listing the sources once."""
 
-    for style in MaterialIcon.Style:
-        for size in SIZES:
-            qrc_path = os.path.join(BUILD_DIR, qrc_file(style, size))
+    sources = {}
+    for icon in sorted(os.listdir(SOURCE_DIR)):
+        sources[icon] = {}
+        for style in MaterialIcon.Style:
+            style_path = os.path.join(SOURCE_DIR, icon, f'materialsymbols{style.value}')
+            try:
+                sources[icon][style.value] = set(os.listdir(style_path))
+            except FileNotFoundError:
+                sources[icon][style.value] = set()
+    return sources
 
-            if not force and os.path.exists(qrc_path):
-                logging.debug(f'Path already exists, skipping: {qrc_path}')
-                continue
 
-            if not os.path.exists(os.path.dirname(qrc_path)):
-                os.makedirs(os.path.dirname(qrc_path))
+def collect_files(
+    sources: dict[str, dict[str, set[str]]], style: MaterialIcon.Style, size: int
+) -> list[str]:
+    """Return the svg files for a style and size."""
+
+    files = []
+    for icon, styles in sources.items():
+        style_path = os.path.join(SOURCE_DIR, icon, f'materialsymbols{style.value}')
+        for filename in (f'{icon}_{size}px.svg', f'{icon}_fill1_{size}px.svg'):
+            if filename in styles[style.value]:
+                files.append(os.path.join(style_path, filename))
+    return files
+
+
+def hash_files(files: Sequence[str], options: str = '') -> str:
+    """Return a hash of the paths and contents of the files and the build options."""
+
+    digest = hashlib.sha256(options.encode('utf-8'))
+    for file in files:
+        digest.update(file.replace('\\', '/').encode('utf-8'))
+        with open(file, 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+def build_resources(
+    style: MaterialIcon.Style,
+    size: int,
+    files: Sequence[str],
+    digest: str | None,
+    force: bool = False,
+    precision: int | None = PRECISION,
+) -> tuple[str, dict | None] | None:
+    """
+    Create the resource file and pack for a style and size. The SVGs are optimized
+    with path data rounded to 'precision' decimals, None keeps them as they are.
+    The pack also stores the compiled path of every SVG that can be compiled.
+    Return the hash of the files and the optimization report or None if the
+    resources could not be created. The resources are skipped if the hash matches
+    'digest' and the resources exist, the report is None then.
+    """
+
+    resource_path = os.path.join(RESOURCE_DIR, f'icons_{style.value}_{size}.py')
+    pack_path = os.path.join(RESOURCE_DIR, pack_file(style, size))
+
+    # The options of the optimization and the compiled paths change the outputs.
+    options = (
+        f'precision={precision}:threshold={DIFF_THRESHOLD}:'
+        f'optimize={OPTIMIZE_VERSION}:path={PATH_VERSION}'
+    )
+    current = hash_files(files, options)
+    outputs = (resource_path, pack_path)
+    if not force and current == digest and all(map(os.path.exists, outputs)):
+        logging.debug(f'Sources unchanged, skipping: {style.value} {size}')
+        return current, None
+
+    logging.info(f'Collecting files for: {resource_path}')
+
+    # Resource paths are the paths of the files relative to the root.
+    resources = {}
+    try:
+        for file in files:
+            with open(file, 'rb') as f:
+                resources[file.replace('\\', '/')] = f.read()
+    except OSError as e:
+        logging.error(f'Could not read source file: {e}')
+        return None
 
-            logging.info(f'Collecting files for: {qrc_path}')
+    report = None
+    if precision is not None:
+        resources, optimize_report = optimize_files(resources, size, precision)
+        report = optimize_report.to_dict()
+    paths, _ = compile_files(resources, size)
+    logging.info(f'Compiled {len(paths)} of {len(resources)} paths: {pack_path}')
 
-            files = []
-            root = os.path.join('material-design-icons', 'symbols', 'web')
-            for icon in os.listdir(root):
-                style_path = os.path.join(
-                    '..', root, icon, f'materialsymbols{style.value}'
+    try:
+        create_resource_file(resource_path, resources)
+        create_pack_file(pack_path, {**resources, **paths})
+    except OSError as e:
+        logging.error(f'Could not create resources: {resource_path}: {e}')
+        return None
+    return current, report
+
+
+def create_resources(
+    sources: dict[str, dict[str, set[str]]],
+    force: bool = False,
+    jobs: int | None = None,
+    precision: int | None = PRECISION,
+) -> None:
+    """
+    Create the resources for all styles and sizes in parallel. Only styles and
+    sizes whose sources changed since the last build are created. The bytes saved
+    by optimizing the SVGs are logged and saved in the build directory.
+    """
+
+    os.makedirs(BUILD_DIR, exist_ok=True)
+    os.makedirs(RESOURCE_DIR, exist_ok=True)
+
+    manifest = read_json(MANIFEST_PATH)
+    reports = read_json(OPTIMIZE_REPORT_PATH)
+
+    # Workers render the SVGs to verify the optimization and the compiled paths.
+    with concurrent.futures.ProcessPoolExecutor(
+        max_workers=jobs, initializer=init_worker
+    ) as executor:
+        futures = {}
+        for style in MaterialIcon.Style:
+            for size in SIZES:
+                key = f'{style.value}_{size}'
+                files = collect_files(sources, style, size)
+                future = executor.submit(
+                    build_resources,
+                    style,
+                    size,
+                    files,
+                    manifest.get(key),
+                    force,
+                    precision,
                 )
-                files.append(os.path.join(style_path, f'{icon}_{size}px.svg'))
-                files.append(os.path.join(style_path, f'{icon}_fill1_{size}px.svg'))
+                futures[future] = key
+
+        for future in concurrent.futures.as_completed(futures):
+            key = futures[future]
+            result = future.result()
+            if result is None:
+                logging.error(f'Could not create resources: {key}')
+                manifest.pop(key, None)
+                continue
+            manifest[key], report = result
+            if precision is None:
+                reports.pop(key, None)
+            elif report is not None:
+                reports[key] = report
+
+    with open(MANIFEST_PATH, 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    with open(OPTIMIZE_REPORT_PATH, 'w') as f:
+        json.dump(reports, f, indent=2, sort_keys=True)
+    log_optimize_report(reports)
+
+
+def read_json(path: str) -> dict:
+    """Return the data of a json file or an empty dict if it doesn't exist."""
+
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def log_optimize_report(reports: dict[str, dict]) -> None:
+    """Log the bytes saved by optimizing the SVGs of every style and size."""
 
-            write_qrc_file(qrc_path, files)
+    if not reports:
+        return
+    lines = [f'{"resource":<16} {"files":>6} {"original":>10} {"optimized":>10} saved']
+    for key, report in sorted(reports.items()):
+        original = report['original_bytes']
+        saved = report['saved_bytes']
+        percent = saved / original * 100 if original else 0
+        lines.append(
+            f'{key:<16} {report["files"]:>6} {original:>10} '
+            f'{report["optimized_bytes"]:>10} {saved} ({percent:.1f}%)'
+        )
+        if report['rejected']:
+            lines.append(f'  {len(report["rejected"])} files kept unoptimized')
+    logging.info('Optimized SVGs:\n' + '\n'.join(lines))
 
 
-def create_resource_files() -> None:
-    """Create resource files for all styles and sizes."""
+def copy_fonts(digest: str | None = None, force: bool = False) -> str:
+    """
+    Copy the variable fonts and their codepoints for all styles. Return the hash
+    of the font files, the fonts are skipped if it matches 'digest' and the copies
+    exist.
+    """
 
+    files = {}
     for style in MaterialIcon.Style:
-        for size in SIZES:
-            qrc_path = os.path.join(BUILD_DIR, qrc_file(style, size))
-            resource_path = os.path.join(
-                'qt_material_icons', 'resources', f'icons_{style.value}_{size}.py'
-            )
-            create_resource_file(qrc_path=qrc_path, resource_path=resource_path)
+        filename = font_filename(style.value)
+        source = os.path.join(FONT_DIR, f'{filename}[FILL,GRAD,opsz,wght]')
+        for extension in ('.ttf', '.codepoints'):
+            source_path = source + extension
+            if not os.path.exists(source_path):
+                logging.warning(f'Font file not found: {source_path}')
+                continue
+            files[source_path] = os.path.join(RESOURCE_DIR, filename + extension)
+
+    current = hash_files(list(files))
+    if not force and current == digest and all(map(os.path.exists, files.values())):
+        logging.debug('Fonts unchanged, skipping.')
+        return current
+
+    for source_path, target_path in files.items():
+        logging.info(f'Copying font file: {target_path}')
+        shutil.copyfile(source_path, target_path)
+    return current
+
+
+def fetch_tags() -> dict[str, str]:
+    """Return the tags of the icons from the Google Fonts metadata."""
+
+    logging.info(f'Fetching tags: {METADATA_URL}')
+    try:
+        with urllib.request.urlopen(METADATA_URL, timeout=30) as response:
+            content = response.read().decode('utf-8')
+        # The response is prefixed to prevent json hijacking.
+        data = json.loads(content[content.index('{') :])
+    except (OSError, ValueError) as e:
+        logging.warning(f'Could not fetch tags: {e}')
+        return {}
+    return {icon['name']: ' '.join(icon.get('tags', ())) for icon in data['icons']}
+
+
+def read_tags(fetch: bool = False) -> dict[str, str]:
+    """
+    Return the tags of the icons cached in the build directory, 'fetch' fetches
+    them and updates the cache first.
+    """
+
+    if fetch:
+        tags = fetch_tags()
+        if tags:
+            os.makedirs(BUILD_DIR, exist_ok=True)
+            with open(TAGS_PATH, 'w') as f:
+                json.dump(tags, f, indent=0, sort_keys=True)
+            return tags
+    return read_json(TAGS_PATH)
+
+
+def hash_catalog(sources: dict[str, dict[str, set[str]]], tags: dict[str, str]) -> str:
+    """Return a hash of the svg filenames and the tags of the icons."""
+
+    filenames = {
+        icon: {style: sorted(names) for style, names in by_style.items()}
+        for icon, by_style in sources.items()
+    }
+    content = json.dumps([filenames, tags, SIZES], sort_keys=True)
+    return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+
+def create_catalog(
+    sources: dict[str, dict[str, set[str]]],
+    digest: str | None = None,
+    force: bool = False,
+    fetch: bool = False,
+) -> str:
+    """
+    Create the catalog of icon names, variants and tags. Return the hash of the
+    filenames and tags, the catalog is skipped if it matches 'digest' and the
+    catalog exists. The tags are fetched if 'fetch' is True or if the catalog is
+    created without cached tags.
+    """
+
+    styles = [style.value for style in MaterialIcon.Style]
+    catalog_path = os.path.join(RESOURCE_DIR, 'catalog.json')
+    tags = read_tags(fetch)
+    current = hash_catalog(sources, tags)
+    if not force and current == digest and os.path.exists(catalog_path):
+        logging.debug('Catalog unchanged, skipping.')
+        return current
+    if not tags and not fetch:
+        tags = read_tags(fetch=True)
+        current = hash_catalog(sources, tags)
+
+    icons = {}
+    for icon, filenames in sources.items():
+        mask = 0
+        for style in styles:
+            for size in SIZES:
+                for fill in (False, True):
+                    suffix = '_fill1' if fill else ''
+                    if f'{icon}{suffix}_{size}px.svg' in filenames[style]:
+                        mask |= variant_bit(styles, SIZES, style, fill, size)
+        icons[icon] = (mask, tags.get(icon, ''))
+
+    logging.info(f'Creating catalog: {catalog_path}')
+    Catalog(icons, styles, SIZES).save(catalog_path)
+    return current
 
 
 def main() -> None:
+    parser = argparse.ArgumentParser(description='Compiles the Material Symbols.')
+    parser.add_argument(
+        '--force', action='store_true', help='Create unchanged resources again.'
+    )
+    parser.add_argument(
+        '-j', '--jobs', type=int, help='The number of processes (default: all cpus).'
+    )
+    parser.add_argument(
+        '--precision',
+        type=int,
+        default=PRECISION,
+        help=f'The decimals of optimized path data (default: {PRECISION}).',
+    )
+    parser.add_argument(
+        '--no-optimize', action='store_true', help='Keep the SVGs as they are.'
+    )
+    parser.add_argument(
+        '--no-pull',
+        action='store_true',
+        help='Build from the existing source repo without pulling it.',
+    )
+    parser.add_argument(
+        '--fetch-tags',
+        action='store_true',
+        help='Fetch the icon tags again instead of using the cached tags.',
+    )
+    args = parser.parse_args()
+
     logging.basicConfig(level=logging.INFO, force=True)
-    clone_repo()
-    create_qrc_files()
-    create_resource_files()
+    clone_repo(pull=not args.no_pull)
+    sources = scan_sources()
+    precision = None if args.no_optimize else args.precision
+    create_resources(sources, force=args.force, jobs=args.jobs, precision=precision)
+
+    # The hashes of the fonts and the catalog are kept in the manifest as well.
+    manifest = read_json(MANIFEST_PATH)
+    manifest['fonts'] = copy_fonts(manifest.get('fonts'), args.force)
+    manifest['catalog'] = create_catalog(
+        sources, manifest.get('catalog'), args.force, args.fetch_tags
+    )
+    with open(MANIFEST_PATH, 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
 
 
 if __name__ == '__main__':
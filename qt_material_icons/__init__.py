@@ -1,3 +1,16 @@
+from ._atlas import IconAtlas
+from ._catalog import Catalog
+from ._cache import (
+    IconRegistry,
+    ImageCache,
+    PixmapCache,
+    icon_registry,
+    image_cache,
+    pixmap_cache,
+)
+from ._disk import DiskCache, disk_cache
 from ._icon import MaterialIcon, SVGIcon
+from ._preload import Preload
+from ._stats import Stats, stats
 
 __version__ = '0.5.0'
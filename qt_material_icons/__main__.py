@@ -1,12 +1,26 @@
 import argparse
 import logging
+import sys
+from collections.abc import Iterable, Sequence
 
-from qt_material_icons import MaterialIcon, extract
+from qt_material_icons import Catalog, MaterialIcon, extract, render, scan
 
 
 def main() -> None:
+    # The extraction is the default command to keep existing invocations working.
+    argv = sys.argv[1:]
+    if argv[:1] == ['render']:
+        main_render(argv[1:])
+        return
+    if argv[:1] == ['extract']:
+        argv = argv[1:]
+    main_extract(argv)
+
+
+def main_extract(argv: Sequence[str]) -> None:
     parser = argparse.ArgumentParser(
-        description='Extracts a qt_material_icons resources.'
+        prog='qtmaterialicons',
+        description='Extracts a qt_material_icons resources.',
     )
 
     parser.add_argument(
@@ -15,6 +29,37 @@ def main() -> None:
         nargs='+',
         help='The icon names (e.g., home, account_circle).',
     )
+    parser.add_argument(
+        '--specs',
+        type=str,
+        nargs='+',
+        help=(
+            'The icon variants as name:style:fill:size, style, fill and size are '
+            'optional (e.g., home:rounded:fill:24, search:20).'
+        ),
+    )
+    parser.add_argument(
+        '--spec-file',
+        type=str,
+        help='A file with one icon spec per line.',
+    )
+    parser.add_argument(
+        '--scan',
+        type=str,
+        nargs='+',
+        help=(
+            'Scan the python files in the paths for the icons that are used '
+            '(e.g., src).'
+        ),
+    )
+    parser.add_argument(
+        '--scan-cache',
+        type=str,
+        help=(
+            'The path of the cache of scanned files '
+            '(default: in the cache location of the user).'
+        ),
+    )
 
     parser.add_argument(
         '--styles',
@@ -42,20 +87,205 @@ def main() -> None:
             '(e.g., mypackage).'
         ),
     )
+    parser.add_argument(
+        '-j',
+        '--jobs',
+        type=int,
+        help='The number of threads used for extraction (default: all cpus).',
+    )
+    parser.add_argument(
+        '--force',
+        action='store_true',
+        help='Create resource files even if they are up to date.',
+    )
 
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
 
-    styles = tuple(MaterialIcon.Style(s) for s in args.styles)
+    if not (args.names or args.specs or args.spec_file or args.scan):
+        parser.error(
+            'one of the arguments --names --specs --spec-file --scan is required'
+        )
+
+    variants = set()
+    try:
+        for spec in args.specs or ():
+            variants.add(extract.parse_spec(spec))
+        if args.spec_file:
+            variants.update(extract.read_spec_file(args.spec_file))
+    except (OSError, ValueError) as e:
+        parser.error(str(e))
+    if variants:
+        validate_names(parser, {variant[0] for variant in variants})
+    if args.names:
+        validate_names(parser, args.names)
+        variants.update(
+            (name, MaterialIcon.Style(style), fill, size)
+            for name in args.names
+            for style in args.styles
+            for fill in (False, True)
+            for size in args.sizes
+        )
+    if args.scan:
+        cache_path = args.scan_cache or scan.default_cache_path(args.output)
+        # The extracted package is in the output and may be part of the scan.
+        scanned = scan.scan_paths(
+            args.scan,
+            cache_path=cache_path,
+            jobs=args.jobs,
+            excluded=[extract.package_dir(args.output)],
+        )
+        # Unknown names in the code are reported and skipped.
+        invalid = invalid_names({variant[0] for variant in scanned})
+        for message in name_messages(invalid):
+            logging.warning(message)
+        variants.update(v for v in scanned if v[0] not in invalid)
 
     extract.extract_package(output=args.output)
-    extract.extract_icons_multi(
+    extract.extract_variants(
+        variants=variants,
+        output=args.output,
+        force=args.force,
+        jobs=args.jobs,
+    )
+
+
+def main_render(argv: Sequence[str]) -> None:
+    parser = argparse.ArgumentParser(
+        prog='qtmaterialicons render',
+        description='Renders qt_material_icons icons to images.',
+    )
+    parser.add_argument(
+        '--names',
+        type=str,
+        nargs='+',
+        required=True,
+        help='The icon names (e.g., home, account_circle).',
+    )
+    parser.add_argument(
+        '--styles',
+        type=str,
+        nargs='+',
+        default=('outlined',),
+        choices=['outlined', 'rounded', 'sharp'],
+        help='The icon styles (outlined, rounded, sharp).',
+    )
+    parser.add_argument(
+        '--fills',
+        type=int,
+        nargs='+',
+        default=(0,),
+        choices=[0, 1],
+        help='The fill variants (0, 1).',
+    )
+    parser.add_argument(
+        '--sizes',
+        type=int,
+        nargs='+',
+        default=(24,),
+        choices=[20, 24, 40, 48],
+        help='The icon size (20, 24, 40, 48).',
+    )
+    parser.add_argument(
+        '--colors',
+        type=str,
+        nargs='+',
+        default=('#000000',),
+        help='The icon colors (e.g., #000000, #80ffffff, red).',
+    )
+    parser.add_argument(
+        '--dprs',
+        type=float,
+        nargs='+',
+        default=(1.0,),
+        help='The device pixel ratios (e.g., 1, 1.5, 2).',
+    )
+    parser.add_argument(
+        '--formats',
+        type=str,
+        nargs='+',
+        default=('png',),
+        choices=render.FORMATS,
+        help='The image formats, an ico file holds all sizes of an icon.',
+    )
+    parser.add_argument(
+        '--atlas',
+        type=str,
+        help='The filename of an atlas with all icons without extension.',
+    )
+    parser.add_argument(
+        '-o',
+        '--output',
+        type=str,
+        required=True,
+        help='The directory to save the images.',
+    )
+    parser.add_argument(
+        '-j',
+        '--jobs',
+        type=int,
+        help='The number of processes used for rendering (default: all cpus).',
+    )
+    parser.add_argument(
+        '--force',
+        action='store_true',
+        help='Render images even if they are up to date.',
+    )
+
+    args = parser.parse_args(argv)
+
+    validate_names(parser, args.names)
+    for color in args.colors:
+        try:
+            render.color_name(color)
+        except ValueError as e:
+            parser.error(str(e))
+
+    render.render_icons(
+        output=args.output,
         names=args.names,
-        styles=styles,
+        styles=tuple(MaterialIcon.Style(s) for s in args.styles),
+        fills=tuple(bool(f) for f in args.fills),
         sizes=args.sizes,
-        output=args.output,
+        colors=args.colors,
+        dprs=args.dprs,
+        formats=args.formats,
+        atlas=args.atlas,
+        force=args.force,
+        jobs=args.jobs,
     )
 
 
+def validate_names(parser: argparse.ArgumentParser, names: Iterable[str]) -> None:
+    """Report typos in the icon names before anything is extracted."""
+
+    invalid = invalid_names(names)
+    if invalid:
+        parser.error('\n'.join(name_messages(invalid)))
+
+
+def invalid_names(names: Iterable[str]) -> dict[str, list[str]]:
+    """Return the names that don't exist with suggestions for each name."""
+
+    try:
+        catalog = Catalog.load()
+    except OSError:
+        logging.warning('Catalog not found, icon names are not validated.')
+        return {}
+    return catalog.validate(sorted(names))
+
+
+def name_messages(invalid: dict[str, list[str]]) -> list[str]:
+    """Return a message for every invalid name."""
+
+    messages = []
+    for name, suggestions in invalid.items():
+        message = f'unknown icon name: {name}'
+        if suggestions:
+            message += f' (did you mean {", ".join(suggestions)}?)'
+        messages.append(message)
+    return messages
+
+
 if __name__ == '__main__':
     logging.basicConfig(level=logging.INFO)
     main()
@@ -0,0 +1,230 @@
+from __future__ import annotations
+
+import json
+import os
+from collections.abc import Iterable, Sequence
+from typing import Optional, Tuple
+
+try:
+    from qtpy import QtCore, QtGui
+except ImportError:
+    try:
+        from PySide6 import QtCore, QtGui
+    except ImportError:
+        from PySide2 import QtCore, QtGui
+
+from ._engine import device_pixel_ratio, physical_size
+from ._icon import MaterialIcon
+
+# An icon in the atlas: name, style, fill, size and color
+Spec = Tuple[str, MaterialIcon.Style, bool, int, Optional[QtGui.QColor]]
+Key = Tuple[str, MaterialIcon.Style, bool, int, Optional[int]]
+
+# Whether the binding draws a list of pixmap fragments in one call.
+_fragment_lists: bool | None = None
+
+
+class IconAtlas:
+    """
+    A single texture of many icons that are rasterized once. Delegates can blit
+    icons from the texture instead of requesting a pixmap for every icon.
+    """
+
+    def __init__(
+        self,
+        image: QtGui.QImage,
+        rects: dict[Key, QtCore.QRect],
+    ) -> None:
+        self._image = image
+        self._rects = rects
+        self._pixmap: QtGui.QPixmap | None = None
+
+    def __repr__(self) -> str:
+        return f'{self.__class__.__name__}(count={len(self._rects)})'
+
+    def __contains__(self, spec: Spec) -> bool:
+        return atlas_key(spec) in self._rects
+
+    def __len__(self) -> int:
+        return len(self._rects)
+
+    @classmethod
+    def build(
+        cls,
+        specs: Iterable[Spec],
+        dpr: float | None = None,
+        max_width: int = 1024,
+    ) -> IconAtlas:
+        """
+        Rasterize the icons for the specs into a new atlas. The specs are tuples of
+        name, style, fill, size and color, if color is None the palette is used.
+        """
+
+        if dpr is None:
+            dpr = device_pixel_ratio()
+
+        # Unique icons sorted by height to pack them in shelves.
+        specs = {atlas_key(spec): spec for spec in specs}
+        keys = sorted(specs, key=lambda k: k[3], reverse=True)
+
+        rects = {}
+        x = y = shelf_height = width = 0
+        for key in keys:
+            size = physical_size(QtCore.QSize(key[3], key[3]), dpr).width()
+            if x and x + size > max_width:
+                x = 0
+                y += shelf_height
+                shelf_height = 0
+            rects[key] = QtCore.QRect(x, y, size, size)
+            x += size
+            width = max(width, x)
+            shelf_height = max(shelf_height, size)
+        height = y + shelf_height
+
+        image = QtGui.QImage(
+            max(width, 1),
+            max(height, 1),
+            QtGui.QImage.Format.Format_ARGB32_Premultiplied,
+        )
+        image.fill(QtCore.Qt.GlobalColor.transparent)
+        painter = QtGui.QPainter(image)
+        for key, rect in rects.items():
+            name, style, fill, size, color = specs[key]
+            icon = MaterialIcon(name, style, fill, size)
+            pixmap = icon.pixmap(size, color=color, dpr=dpr)
+            painter.drawPixmap(rect, pixmap)
+        painter.end()
+        image.setDevicePixelRatio(dpr)
+
+        return cls(image, rects)
+
+    @classmethod
+    def load(cls, path: str) -> IconAtlas:
+        """Load an atlas saved with 'save'."""
+
+        image = QtGui.QImage(path)
+        if image.isNull():
+            raise OSError(f'Could not load atlas image: {path}')
+
+        with open(metadata_path(path)) as f:
+            metadata = json.load(f)
+
+        image.setDevicePixelRatio(metadata['dpr'])
+        rects = {}
+        for name, style, fill, size, rgba, x, y, w, h in metadata['icons']:
+            key = (name, MaterialIcon.Style(style), fill, size, rgba)
+            rects[key] = QtCore.QRect(x, y, w, h)
+        return cls(image, rects)
+
+    def save(self, path: str) -> None:
+        """Save the atlas as an image and a json file with the rects next to it."""
+
+        if not self._image.save(path):
+            raise OSError(f'Could not save atlas image: {path}')
+
+        icons = []
+        for key, rect in self._rects.items():
+            name, style, fill, size, rgba = key
+            icons.append(
+                (name, style.value, fill, size, rgba)
+                + (rect.x(), rect.y(), rect.width(), rect.height())
+            )
+        metadata = {'dpr': self._image.devicePixelRatio(), 'icons': icons}
+        with open(metadata_path(path), 'w') as f:
+            json.dump(metadata, f)
+
+    def image(self) -> QtGui.QImage:
+        """Return the texture."""
+
+        return self._image
+
+    def pixmap(self) -> QtGui.QPixmap:
+        """Return the texture as a pixmap, it is only converted once."""
+
+        if self._pixmap is None:
+            self._pixmap = QtGui.QPixmap.fromImage(self._image)
+        return self._pixmap
+
+    def rect(self, spec: Spec) -> QtCore.QRect:
+        """Return the source rect of the icon in device pixels of the texture."""
+
+        return self._rects[atlas_key(spec)]
+
+    def draw(
+        self,
+        painter: QtGui.QPainter,
+        target: QtCore.QRect | QtCore.QPoint,
+        spec: Spec,
+    ) -> None:
+        """Draw the icon at 'target', a point draws the icon at its size."""
+
+        painter.drawPixmap(target_rect(target, spec), self.pixmap(), self.rect(spec))
+
+    def draw_many(
+        self,
+        painter: QtGui.QPainter,
+        items: Sequence[tuple[QtCore.QRect | QtCore.QPoint, Spec]],
+    ) -> None:
+        """Draw the icons at the targets with a single call to the paint engine."""
+
+        fragments = []
+        for target, spec in items:
+            target = target_rect(target, spec)
+            source = self.rect(spec)
+            fragments.append(
+                QtGui.QPainter.PixmapFragment.create(
+                    QtCore.QRectF(target).center(),
+                    QtCore.QRectF(source),
+                    target.width() / source.width(),
+                    target.height() / source.height(),
+                )
+            )
+        if fragments:
+            draw_fragments(painter, fragments, self.pixmap())
+
+
+def atlas_key(spec: Spec) -> Key:
+    """Return the key of the spec with the color as rgba."""
+
+    name, style, fill, size, color = spec
+    rgba = None if color is None else QtGui.QColor(color).rgba()
+    return name, style, fill, size, rgba
+
+
+def draw_fragments(
+    painter: QtGui.QPainter,
+    fragments: list[QtGui.QPainter.PixmapFragment],
+    pixmap: QtGui.QPixmap,
+) -> None:
+    """
+    Draw the fragments of 'pixmap'. PyQt draws a list of fragments in one call,
+    PySide only binds a single fragment per call.
+    """
+
+    global _fragment_lists
+
+    if _fragment_lists is not False:
+        try:
+            painter.drawPixmapFragments(fragments, pixmap)
+        except TypeError:
+            _fragment_lists = False
+        else:
+            _fragment_lists = True
+            return
+    for fragment in fragments:
+        painter.drawPixmapFragments(fragment, 1, pixmap)
+
+
+def target_rect(target: QtCore.QRect | QtCore.QPoint, spec: Spec) -> QtCore.QRect:
+    """Return the target rect of the icon, a point is the top left at its size."""
+
+    if isinstance(target, QtCore.QPoint):
+        size = spec[3]
+        return QtCore.QRect(target, QtCore.QSize(size, size))
+    return target
+
+
+def metadata_path(path: str) -> str:
+    """Return the path of the json file for the atlas image."""
+
+    return f'{os.path.splitext(path)[0]}.json'
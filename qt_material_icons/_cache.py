@@ -0,0 +1,273 @@
+from __future__ import annotations
+
+import collections
+import threading
+import weakref
+from collections.abc import Callable, Hashable
+
+try:
+    from qtpy import QtCore, QtGui
+except ImportError:
+    try:
+        from PySide6 import QtCore, QtGui
+    except ImportError:
+        from PySide2 import QtCore, QtGui
+
+
+DEFAULT_MAX_BYTES = 32 * 1024 * 1024
+
+
+class PixmapCache:
+    """
+    A least recently used cache of colorized pixmaps bounded by a byte budget. The
+    alpha masks the pixmaps are tinted from count against the same budget, they
+    can use up to a quarter of it.
+    """
+
+    def __init__(
+        self, max_bytes: int = DEFAULT_MAX_BYTES, masks: ImageCache | None = None
+    ) -> None:
+        self._pixmaps: collections.OrderedDict[Hashable, QtGui.QPixmap] = (
+            collections.OrderedDict()
+        )
+        self._masks = masks
+        self._max_bytes = max_bytes
+        self._bytes = 0
+        if masks is not None:
+            masks.set_max_bytes(max_bytes // 4)
+        self.hits = 0
+        self.misses = 0
+
+    def __repr__(self) -> str:
+        return (
+            f'{self.__class__.__name__}('
+            f'count={len(self)}, bytes={self._bytes}, max_bytes={self._max_bytes})'
+        )
+
+    def __len__(self) -> int:
+        return len(self._pixmaps)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._pixmaps
+
+    @property
+    def bytes(self) -> int:
+        """Return the number of bytes used by the cached pixmaps."""
+
+        return self._bytes
+
+    @property
+    def max_bytes(self) -> int:
+        """Return the byte budget of the cache."""
+
+        return self._max_bytes
+
+    def set_max_bytes(self, max_bytes: int) -> None:
+        """Set the byte budget and evict pixmaps and masks that no longer fit."""
+
+        self._max_bytes = max_bytes
+        if self._masks is not None:
+            self._masks.set_max_bytes(max_bytes // 4)
+        self._evict()
+
+    def get(self, key: Hashable) -> QtGui.QPixmap | None:
+        """Return the pixmap for 'key' and mark it as recently used."""
+
+        pixmap = self._pixmaps.get(key)
+        if pixmap is None:
+            self.misses += 1
+            return None
+        self._pixmaps.move_to_end(key)
+        self.hits += 1
+        return pixmap
+
+    def insert(self, key: Hashable, pixmap: QtGui.QPixmap) -> None:
+        """Insert 'pixmap' for 'key' and evict the least recently used pixmaps."""
+
+        self.remove(key)
+        size = pixmap_bytes(pixmap)
+        if size > self._max_bytes:
+            return
+        self._pixmaps[key] = pixmap
+        self._bytes += size
+        self._evict()
+
+    def remove(self, key: Hashable) -> None:
+        """Remove the pixmap for 'key' if it is cached."""
+
+        pixmap = self._pixmaps.pop(key, None)
+        if pixmap is not None:
+            self._bytes -= pixmap_bytes(pixmap)
+
+    def clear(self) -> None:
+        """Remove all pixmaps and reset the counters."""
+
+        self._pixmaps.clear()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def _evict(self) -> None:
+        mask_bytes = 0 if self._masks is None else self._masks.bytes
+        while self._bytes + mask_bytes > self._max_bytes and self._pixmaps:
+            _, pixmap = self._pixmaps.popitem(last=False)
+            self._bytes -= pixmap_bytes(pixmap)
+
+
+class ImageCache:
+    """
+    A thread-safe least recently used cache of images bounded by a byte budget.
+    Images rasterized in other threads are taken out of the cache when they are
+    converted to pixmaps on the GUI thread.
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES) -> None:
+        self._images: collections.OrderedDict[Hashable, QtGui.QImage] = (
+            collections.OrderedDict()
+        )
+        self._lock = threading.Lock()
+        self._max_bytes = max_bytes
+        self._bytes = 0
+
+    def __repr__(self) -> str:
+        return (
+            f'{self.__class__.__name__}('
+            f'count={len(self)}, bytes={self._bytes}, max_bytes={self._max_bytes})'
+        )
+
+    def __len__(self) -> int:
+        return len(self._images)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._images
+
+    @property
+    def bytes(self) -> int:
+        """Return the number of bytes used by the cached images."""
+
+        return self._bytes
+
+    def set_max_bytes(self, max_bytes: int) -> None:
+        """Set the byte budget and evict images that no longer fit."""
+
+        with self._lock:
+            self._max_bytes = max_bytes
+            self._evict()
+
+    def insert(self, key: Hashable, image: QtGui.QImage) -> None:
+        """Insert 'image' for 'key' and evict the least recently used images."""
+
+        size = image_bytes(image)
+        with self._lock:
+            previous = self._images.pop(key, None)
+            if previous is not None:
+                self._bytes -= image_bytes(previous)
+            if size > self._max_bytes:
+                return
+            self._images[key] = image
+            self._bytes += size
+            self._evict()
+
+    def get(self, key: Hashable) -> QtGui.QImage | None:
+        """Return the image for 'key' and mark it as recently used."""
+
+        with self._lock:
+            image = self._images.get(key)
+            if image is not None:
+                self._images.move_to_end(key)
+            return image
+
+    def take(self, key: Hashable) -> QtGui.QImage | None:
+        """Remove and return the image for 'key'."""
+
+        with self._lock:
+            image = self._images.pop(key, None)
+            if image is not None:
+                self._bytes -= image_bytes(image)
+            return image
+
+    def clear(self) -> None:
+        """Remove all images."""
+
+        with self._lock:
+            self._images.clear()
+            self._bytes = 0
+
+    def _evict(self) -> None:
+        while self._bytes > self._max_bytes and self._images:
+            _, image = self._images.popitem(last=False)
+            self._bytes -= image_bytes(image)
+
+
+class IconRegistry:
+    """
+    A registry of icons that are still alive so identical icons can be shared
+    instead of duplicated.
+    """
+
+    def __init__(self) -> None:
+        self._icons: weakref.WeakValueDictionary[Hashable, QtGui.QIcon] = (
+            weakref.WeakValueDictionary()
+        )
+        self.hits = 0
+        self.misses = 0
+        self.bytes_saved = 0
+
+    def __repr__(self) -> str:
+        return (
+            f'{self.__class__.__name__}('
+            f'count={len(self)}, hits={self.hits}, bytes_saved={self.bytes_saved})'
+        )
+
+    def __len__(self) -> int:
+        return len(self._icons)
+
+    def get(self, key: Hashable, factory: Callable[[], QtGui.QIcon]) -> QtGui.QIcon:
+        """Return the icon for 'key', 'factory' creates it if it isn't alive."""
+
+        icon = self._icons.get(key)
+        if icon is None:
+            self.misses += 1
+            icon = factory()
+            self._icons[key] = icon
+        else:
+            self.hits += 1
+            self.bytes_saved += icon_bytes(icon)
+        return icon
+
+    def clear(self) -> None:
+        """Forget all icons and reset the counters."""
+
+        self._icons.clear()
+        self.hits = 0
+        self.misses = 0
+        self.bytes_saved = 0
+
+
+def icon_bytes(icon: QtGui.QIcon) -> int:
+    """
+    Return the number of bytes of the pixmaps a duplicate of 'icon' would render
+    for the normal and disabled mode at its native size.
+    """
+
+    sizes = icon.availableSizes() or [QtCore.QSize()]
+    return sum(size.width() * size.height() * 4 * 2 for size in sizes)
+
+
+def image_bytes(image: QtGui.QImage) -> int:
+    """Return the number of bytes used by 'image'."""
+
+    return image.width() * image.height() * image.depth() // 8
+
+
+def pixmap_bytes(pixmap: QtGui.QPixmap) -> int:
+    """Return the number of bytes used by 'pixmap'."""
+
+    return pixmap.width() * pixmap.height() * pixmap.depth() // 8
+
+
+# Alpha masks of the SVGs by path, size and dpr.
+mask_cache = ImageCache(DEFAULT_MAX_BYTES // 4)
+pixmap_cache = PixmapCache(masks=mask_cache)
+image_cache = ImageCache()
+icon_registry = IconRegistry()
@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+import bisect
+import difflib
+import json
+import os
+from collections.abc import Iterable, Iterator, Sequence
+
+RESOURCE_DIR = os.path.join(os.path.dirname(__file__), 'resources')
+CATALOG_PATH = os.path.join(RESOURCE_DIR, 'catalog.json')
+
+# The catalog stores the available variants of an icon as a bitmask:
+# bit = (style index * len(sizes) + size index) * 2 + fill
+#
+#   {"styles": [...], "sizes": [...], "icons": {"name": [mask, "tag tag"]}}
+
+
+class Catalog:
+    """
+    An index of the icon names with their available styles, sizes, fill variants
+    and tags. It is read without importing any resources.
+    """
+
+    _default: Catalog | None = None
+
+    def __init__(
+        self,
+        icons: dict[str, tuple[int, str]],
+        styles: Sequence[str],
+        sizes: Sequence[int],
+    ) -> None:
+        self._icons = icons
+        self._names = sorted(icons)
+        self._styles = list(styles)
+        self._sizes = list(sizes)
+
+    def __repr__(self) -> str:
+        return f'{self.__class__.__name__}(count={len(self)})'
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._icons
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._names)
+
+    def __len__(self) -> int:
+        return len(self._icons)
+
+    @classmethod
+    def load(cls, path: str | None = None) -> Catalog:
+        """Load a catalog, the catalog of the package is only loaded once."""
+
+        if path is None:
+            if cls._default is None:
+                cls._default = cls.load(CATALOG_PATH)
+            return cls._default
+
+        with open(path, 'r') as f:
+            data = json.load(f)
+        icons = {name: (mask, tags) for name, (mask, tags) in data['icons'].items()}
+        return cls(icons, data['styles'], data['sizes'])
+
+    def save(self, path: str) -> None:
+        """Save the catalog as compact json."""
+
+        data = {
+            'styles': self._styles,
+            'sizes': self._sizes,
+            'icons': {name: list(self._icons[name]) for name in self._names},
+        }
+        with open(path, 'w') as f:
+            json.dump(data, f, separators=(',', ':'))
+
+    def exists(self, name: str, style: str, fill: bool, size: int) -> bool:
+        """Return whether the variant of the icon exists."""
+
+        icon = self._icons.get(name)
+        if icon is None or style not in self._styles or size not in self._sizes:
+            return False
+        return bool(icon[0] & variant_bit(self._styles, self._sizes, style, fill, size))
+
+    def variants(self, name: str) -> list[tuple[str, bool, int]]:
+        """Return the style, fill and size of all variants of the icon."""
+
+        mask = self._icons[name][0]
+        return [
+            (style, fill, size)
+            for style in self._styles
+            for size in self._sizes
+            for fill in (False, True)
+            if mask & variant_bit(self._styles, self._sizes, style, fill, size)
+        ]
+
+    def tags(self, name: str) -> list[str]:
+        """Return the tags of the icon."""
+
+        return self._icons[name][1].split()
+
+    def prefix(self, prefix: str) -> list[str]:
+        """Return the names starting with 'prefix'."""
+
+        start = bisect.bisect_left(self._names, prefix)
+        end = bisect.bisect_left(self._names, prefix + '\uffff', start)
+        return self._names[start:end]
+
+    def search(self, query: str, limit: int = 20) -> list[str]:
+        """
+        Return the names matching the query. Prefix matches come first, followed by
+        names and tags containing the query and close matches for typos.
+        """
+
+        query = query.strip().lower()
+        name_query = query.replace(' ', '_')
+        results = dict.fromkeys(self.prefix(name_query))
+        if len(results) < limit:
+            for name in self._names:
+                if name_query in name or query in self._icons[name][1]:
+                    results[name] = None
+        if len(results) < limit:
+            results.update(dict.fromkeys(self.fuzzy(name_query, limit)))
+        return list(results)[:limit]
+
+    def fuzzy(self, query: str, limit: int = 5) -> list[str]:
+        """Return the closest names to the query."""
+
+        return difflib.get_close_matches(query, self._names, n=limit, cutoff=0.6)
+
+    def validate(self, names: Iterable[str]) -> dict[str, list[str]]:
+        """Return the names that don't exist with suggestions for each name."""
+
+        return {name: self.fuzzy(name, 3) for name in names if name not in self}
+
+
+def variant_bit(
+    styles: Sequence[str], sizes: Sequence[int], style: str, fill: bool, size: int
+) -> int:
+    """Return the bit of a variant in the mask of an icon."""
+
+    index = styles.index(style) * len(sizes) + sizes.index(size)
+    return 1 << (index * 2 + int(fill))
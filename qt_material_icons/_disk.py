@@ -0,0 +1,242 @@
+from __future__ import annotations
+
+import hashlib
+import logging
+import mmap
+import os
+import struct
+import tempfile
+from collections.abc import Hashable
+
+try:
+    from qtpy import QtCore, QtGui
+except ImportError:
+    try:
+        from PySide6 import QtCore, QtGui
+    except ImportError:
+        from PySide2 import QtCore, QtGui
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+VERSION = 1
+
+# A cached image is a header followed by the raw premultiplied ARGB32 pixels:
+#   magic, version, width, height, bytes per line, dpr
+HEADER = struct.Struct('<4sHIIId')
+MAGIC = b'QMIC'
+SUFFIX = '.img'
+FORMAT = QtGui.QImage.Format.Format_ARGB32_Premultiplied
+
+
+class DiskCache:
+    """
+    A cache of rasterized icons that persists across application runs. Images
+    are stored uncompressed and memory-mapped on load, so nothing is parsed.
+    Files are replaced atomically, several processes can share the directory.
+    """
+
+    def __init__(
+        self, directory: str | None = None, max_bytes: int = DEFAULT_MAX_BYTES
+    ) -> None:
+        self._directory = directory
+        self._max_bytes = max_bytes
+        self._bytes: int | None = None
+        self._namespace = ''
+        self.hits = 0
+        self.misses = 0
+
+    def __repr__(self) -> str:
+        return (
+            f'{self.__class__.__name__}('
+            f'directory={self._directory!r}, max_bytes={self._max_bytes})'
+        )
+
+    @property
+    def enabled(self) -> bool:
+        """Return whether images are read from and written to the disk."""
+
+        return self._directory is not None
+
+    @property
+    def directory(self) -> str | None:
+        """Return the directory of the cached images."""
+
+        return self._directory
+
+    @property
+    def max_bytes(self) -> int:
+        """Return the byte budget of the cache."""
+
+        return self._max_bytes
+
+    def enable(
+        self, directory: str | None = None, max_bytes: int | None = None
+    ) -> None:
+        """
+        Start caching images in 'directory', by default in the cache location of
+        the application.
+        """
+
+        from . import __version__
+
+        if directory is None:
+            location = QtCore.QStandardPaths.writableLocation(
+                QtCore.QStandardPaths.StandardLocation.CacheLocation
+            )
+            directory = os.path.join(location, 'qt_material_icons')
+        os.makedirs(directory, exist_ok=True)
+
+        self._directory = directory
+        self._namespace = f'{__version__}:{VERSION}'
+        self._bytes = None
+        if max_bytes is not None:
+            self.set_max_bytes(max_bytes)
+
+    def disable(self) -> None:
+        """Stop caching images, the files are kept."""
+
+        self._directory = None
+
+    def set_max_bytes(self, max_bytes: int) -> None:
+        """Set the byte budget and evict images that no longer fit."""
+
+        self._max_bytes = max_bytes
+        self.evict()
+
+    def get(self, key: Hashable) -> QtGui.QImage | None:
+        """Return the image for 'key' or None if it isn't cached."""
+
+        if self._directory is None:
+            return None
+
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f, mmap.mmap(
+                f.fileno(), 0, access=mmap.ACCESS_READ
+            ) as mapped:
+                image = read_image(mapped)
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+
+        # Recently used files are evicted last.
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        self.hits += 1
+        return image
+
+    def insert(self, key: Hashable, image: QtGui.QImage) -> None:
+        """Write 'image' for 'key' and evict the least recently used images."""
+
+        if self._directory is None:
+            return
+
+        data = image_data(image)
+        path = self._path(key)
+        try:
+            fd, temp_path = tempfile.mkstemp(suffix='.tmp', dir=self._directory)
+        except OSError as e:
+            logger.debug(f'Could not write cached image: {e}')
+            return
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(temp_path, path)
+        except OSError as e:
+            logger.debug(f'Could not write cached image: {e}')
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+            return
+
+        if self._bytes is not None:
+            self._bytes += len(data)
+        if self._bytes is None or self._bytes > self._max_bytes:
+            self.evict()
+
+    def evict(self) -> None:
+        """Remove the least recently used images until the cache fits its budget."""
+
+        if self._directory is None:
+            return
+
+        entries = []
+        for entry in os.scandir(self._directory):
+            if not entry.name.endswith(SUFFIX):
+                continue
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+        total = sum(size for _, size, _ in entries)
+        if total > self._max_bytes:
+            # Evict down to 90% to not scan the directory on every insert.
+            target = self._max_bytes * 0.9
+            for _, size, path in sorted(entries):
+                if total <= target:
+                    break
+                try:
+                    os.remove(path)
+                except OSError:
+                    continue
+                total -= size
+        self._bytes = total
+
+    def clear(self) -> None:
+        """Remove all cached images and reset the counters."""
+
+        if self._directory is not None:
+            for entry in os.scandir(self._directory):
+                if entry.name.endswith(SUFFIX):
+                    try:
+                        os.remove(entry.path)
+                    except OSError:
+                        pass
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, key: Hashable) -> str:
+        name = hashlib.sha1(repr((self._namespace, key)).encode('utf-8')).hexdigest()
+        return os.path.join(self._directory, f'{name}{SUFFIX}')
+
+
+def image_data(image: QtGui.QImage) -> bytes:
+    """Return the header and the pixels of 'image'."""
+
+    image = image.convertToFormat(FORMAT)
+    header = HEADER.pack(
+        MAGIC,
+        VERSION,
+        image.width(),
+        image.height(),
+        image.bytesPerLine(),
+        image.devicePixelRatio(),
+    )
+    return header + bytes(image.constBits())[: image.sizeInBytes()]
+
+
+def read_image(data: mmap.mmap | bytes) -> QtGui.QImage:
+    """Return a copy of the image stored in 'data'."""
+
+    magic, version, width, height, bytes_per_line, dpr = HEADER.unpack_from(data)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError('Unsupported cached image')
+    size = bytes_per_line * height
+    if len(data) < HEADER.size + size:
+        raise ValueError('Truncated cached image')
+
+    with memoryview(data)[HEADER.size : HEADER.size + size] as pixels:
+        # The image references the mapped memory, copy it before it is unmapped.
+        image = QtGui.QImage(pixels, width, height, bytes_per_line, FORMAT).copy()
+    image.setDevicePixelRatio(dpr)
+    return image
+
+
+disk_cache = DiskCache()
@@ -0,0 +1,623 @@
+from __future__ import annotations
+
+import collections
+import enum
+import hashlib
+import math
+import re
+from collections.abc import Sequence
+
+try:
+    from qtpy import QtCore, QtGui, QtSvg
+except ImportError:
+    try:
+        from PySide6 import QtCore, QtGui, QtSvg
+    except ImportError:
+        from PySide2 import QtCore, QtGui, QtSvg
+
+from ._cache import image_cache, mask_cache, pixmap_cache
+from ._disk import disk_cache
+from ._font import is_glyph_path, render_glyph
+from ._mask import MASK_FORMAT, tint_images
+from ._path import CompiledPath, compiled_path
+from ._stats import instrument, path_key
+
+ColorRole = QtGui.QPalette.ColorRole
+ColorGroup = QtGui.QPalette.ColorGroup
+State = QtGui.QIcon.State
+Mode = QtGui.QIcon.Mode
+
+# Engines returned from clone() are owned by Qt but only referenced from C++,
+# keep them alive until Qt deletes them.
+_clones: list[SVGIconEngine] = []
+# The cache key of the application palette and the number of its changes.
+_palette_key: int | None = None
+_palette_generation = 0
+
+# SVGs parsed with the color injected by path, hash of the data and color.
+_renderers: collections.OrderedDict[tuple, QtSvg.QSvgRenderer] = (
+    collections.OrderedDict()
+)
+MAX_RENDERERS = 256
+
+# The start tag of the root element and the fill attributes in it.
+SVG_START_TAG = re.compile(rb'<svg\b(?:[^>"\']|"[^"]*"|\'[^\']*\')*>')
+FILL_ATTRIBUTE = re.compile(rb'\s(?:fill|fill-opacity)\s*=\s*(?:"[^"]*"|\'[^\']*\')')
+
+
+class Rendering(enum.Enum):
+    # Render the SVG with the color injected as the fill of its root element, the
+    # parsed SVG is cached per color.
+    SVG = 'svg'
+    # Render the SVG and fill the pixmap with the color in a second pass.
+    TINT = 'tint'
+    # Render an alpha mask of the SVG once and tint it for every color.
+    MASK = 'mask'
+    # Fill the path compiled at build time, icons without one are rendered as MASK.
+    PATH = 'path'
+
+
+class SVGIconEngine(QtGui.QIconEngine):
+    """
+    An icon engine that stores the path and the color rules of an SVG and only
+    rasterizes the sizes and modes that are actually painted.
+    """
+
+    rendering = Rendering.MASK
+
+    def __init__(
+        self,
+        path: str,
+        size: QtCore.QSize | None = None,
+        data: bytes | None = None,
+    ) -> None:
+        super().__init__()
+        self._path = path
+        self._size = size
+        self._data = data
+        self._colors: dict[tuple[Mode, State], QtGui.QColor | ColorRole] = {}
+        self._resolved: dict[tuple[Mode, State], QtGui.QColor] = {}
+        self._generation = 0
+        self._paths: dict[tuple[Mode, State], tuple[str, bytes | None]] = {}
+        self._icons: dict[tuple[Mode, State], QtGui.QIcon] = {}
+
+    def actualSize(self, size: QtCore.QSize, mode: Mode, state: State) -> QtCore.QSize:
+        return size
+
+    def addFile(
+        self, filename: str, size: QtCore.QSize, mode: Mode, state: State
+    ) -> None:
+        self._paths[(mode, state)] = (filename, None)
+
+    def addPixmap(self, pixmap: QtGui.QPixmap, mode: Mode, state: State) -> None:
+        self._icons[(mode, state)] = QtGui.QIcon(pixmap)
+
+    def availableSizes(
+        self, mode: Mode = Mode.Normal, state: State = State.Off
+    ) -> list[QtCore.QSize]:
+        return [self.size()]
+
+    def clone(self) -> SVGIconEngine:
+        engine = SVGIconEngine(self._path, self._size, self._data)
+        engine._colors = dict(self._colors)
+        engine._resolved = dict(self._resolved)
+        engine._generation = self._generation
+        engine._paths = dict(self._paths)
+        engine._icons = dict(self._icons)
+
+        _clones[:] = [clone for clone in _clones if is_alive(clone)]
+        _clones.append(engine)
+        return engine
+
+    def scaledPixmap(
+        self, size: QtCore.QSize, mode: Mode, state: State, scale: float
+    ) -> QtGui.QPixmap:
+        return self.pixmap(size, mode, state, dpr=scale)
+
+    def isNull(self) -> bool:
+        return not self._path
+
+    def key(self) -> str:
+        return 'SVGIconEngine'
+
+    def paint(
+        self, painter: QtGui.QPainter, rect: QtCore.QRect, mode: Mode, state: State
+    ) -> None:
+        # Render at the exact pixel size of the device to avoid scaling.
+        dpr = painter.device().devicePixelRatioF()
+        pixmap = self.pixmap(rect.size(), mode, state, dpr=dpr)
+        painter.drawPixmap(rect, pixmap)
+
+    def pixmap(
+        self,
+        size: QtCore.QSize,
+        mode: Mode = Mode.Normal,
+        state: State = State.Off,
+        color: QtGui.QColor | None = None,
+        dpr: float | None = None,
+    ) -> QtGui.QPixmap:
+        icon = self._icons.get((mode, state))
+        if icon is not None:
+            return icon.pixmap(size, mode, state)
+
+        path, data = self._paths.get((mode, state), (self._path, self._data))
+        if color is None:
+            color = self.color(mode, state)
+        if size.isEmpty():
+            size = self.size()
+
+        # Repaints request the same pixmaps over and over, share them process-wide.
+        # Pixmaps are cached per device pixel ratio, so moving a window between
+        # screens reuses the pixmaps of the previous screen.
+        if dpr is None:
+            dpr = device_pixel_ratio()
+        key = pixmap_key(path, size, dpr, color)
+        pixmap = pixmap_cache.get(key)
+        if pixmap is None:
+            # Images preloaded in other threads or cached by previous runs only need
+            # to be converted.
+            image = image_cache.take(key)
+            disk_key = None
+            if image is None and disk_cache.enabled:
+                # Files can change between runs, the key includes their content.
+                disk_key = key + (self.rendering.value, content_hash(path, data))
+                image = disk_cache.get(disk_key)
+            if image is not None:
+                pixmap = QtGui.QPixmap.fromImage(image)
+            else:
+                compiled = None
+                if self.rendering == Rendering.PATH and not is_glyph_path(path):
+                    compiled = compiled_path(path)
+                if is_glyph_path(path):
+                    pixmap = render_glyph(path, physical_size(size, dpr), color)
+                    pixmap.setDevicePixelRatio(dpr)
+                elif compiled is not None:
+                    pixmap = QtGui.QPixmap.fromImage(
+                        render_path(path, compiled, size, color, dpr)
+                    )
+                elif self.rendering == Rendering.SVG:
+                    pixmap = render_svg(path, size, color, data, dpr)
+                elif self.rendering in (Rendering.MASK, Rendering.PATH):
+                    mask = render_mask(path, size, data, dpr)
+                    pixmap = QtGui.QPixmap.fromImage(tint_mask(path, mask, [color])[0])
+                else:
+                    pixmap = fill_pixmap(render_pixmap(path, size, data, dpr), color)
+                if disk_key is not None:
+                    disk_cache.insert(disk_key, pixmap.toImage())
+            pixmap_cache.insert(key, pixmap)
+        return pixmap
+
+    def images(
+        self,
+        size: QtCore.QSize,
+        colors: Sequence[QtGui.QColor],
+        state: State = State.Off,
+        dpr: float | None = None,
+    ) -> list[QtGui.QImage]:
+        """
+        Return an image for every color. The SVG is rasterized to an alpha mask once
+        and all colors are computed from the mask.
+        """
+
+        path, data = self._paths.get((Mode.Normal, state), (self._path, self._data))
+        if size.isEmpty():
+            size = self.size()
+        if dpr is None:
+            dpr = device_pixel_ratio()
+        return tint_mask(path, render_mask(path, size, data, dpr), colors)
+
+    def color(self, mode: Mode = Mode.Normal, state: State = State.Off) -> QtGui.QColor:
+        """
+        Return the color used for 'mode' and 'state'. Palette roles are resolved
+        once per palette generation.
+        """
+
+        generation = palette_generation()
+        if generation != self._generation:
+            self._resolved.clear()
+            self._generation = generation
+
+        color = self._resolved.get((mode, state))
+        if color is None:
+            color = resolve_color(self.color_rule(mode, state), mode)
+            self._resolved[(mode, state)] = color
+        return color
+
+    def color_rule(
+        self, mode: Mode = Mode.Normal, state: State = State.Off
+    ) -> QtGui.QColor | ColorRole | None:
+        """Return the color or palette role set for 'mode' and 'state'."""
+
+        keys = [(mode, state)]
+        if mode == Mode.Disabled:
+            keys.append((mode, State.Off))
+        keys.extend(((Mode.Normal, state), (mode, State.Off), (Mode.Normal, State.Off)))
+        for key in keys:
+            color = self._colors.get(key)
+            if color is not None:
+                return color
+        return None
+
+    def set_color(
+        self,
+        color: QtGui.QColor | ColorRole,
+        mode: Mode = Mode.Normal,
+        state: State = State.Off,
+    ) -> None:
+        """
+        Set the color used for 'mode' and 'state'. A palette role follows changes
+        of the application palette.
+        """
+
+        if not isinstance(color, ColorRole):
+            color = QtGui.QColor(color)
+        self._colors[(mode, state)] = color
+        self._resolved.clear()
+        self._icons.pop((mode, state), None)
+
+    def set_path(
+        self,
+        path: str,
+        mode: Mode = Mode.Normal,
+        state: State = State.Off,
+        data: bytes | None = None,
+    ) -> None:
+        """Set the SVG used for 'mode' and 'state'."""
+
+        self._paths[(mode, state)] = (path, data)
+        self._icons.pop((mode, state), None)
+
+    def set_icon(
+        self,
+        icon: QtGui.QIcon,
+        mode: Mode = Mode.Normal,
+        state: State = State.Off,
+    ) -> None:
+        """Set a different icon used for 'mode' and 'state'."""
+
+        self._icons[(mode, state)] = icon
+
+    def path(self) -> str:
+        """Return the path of the SVG."""
+
+        return self._path
+
+    def data(self) -> bytes | None:
+        """Return the SVG data if the icon wasn't loaded from the path."""
+
+        return self._data
+
+    def size(self) -> QtCore.QSize:
+        """Return the native size of the SVG, it is only read when first needed."""
+
+        if self._size is None:
+            if self._data is None:
+                self._size = QtGui.QImageReader(self._path).size()
+            else:
+                buffer = QtCore.QBuffer()
+                buffer.setData(self._data)
+                self._size = QtGui.QImageReader(buffer, b'svg').size()
+        return self._size
+
+
+def palette_generation() -> int:
+    """
+    Return the number of application palette changes. The palette is compared when
+    colors are looked up, so no event of the application needs to be filtered.
+    """
+
+    global _palette_key, _palette_generation
+
+    if QtGui.QGuiApplication.instance() is None:
+        return _palette_generation
+    key = QtGui.QGuiApplication.palette().cacheKey()
+    if key != _palette_key:
+        _palette_key = key
+        _palette_generation += 1
+    return _palette_generation
+
+
+def resolve_color(color: QtGui.QColor | ColorRole | None, mode: Mode) -> QtGui.QColor:
+    """Return the color, palette roles are read from the application palette."""
+
+    if color is None:
+        return QtGui.QColor()
+    if isinstance(color, ColorRole):
+        group = ColorGroup.Disabled if mode == Mode.Disabled else ColorGroup.Normal
+        return QtGui.QGuiApplication.palette().color(group, color)
+    return color
+
+
+def device_pixel_ratio() -> float:
+    """Return the device pixel ratio of the application."""
+
+    app = QtGui.QGuiApplication.instance()
+    if app is None:
+        return 1.0
+    return app.devicePixelRatio()
+
+
+@instrument('fill_pixmap')
+def fill_pixmap(pixmap: QtGui.QPixmap, color: QtGui.QColor) -> QtGui.QPixmap:
+    """
+    Return a copy of 'pixmap' filled with 'color'.
+    """
+
+    pixmap = QtGui.QPixmap(pixmap)
+    painter = QtGui.QPainter(pixmap)
+    painter.setCompositionMode(QtGui.QPainter.CompositionMode.CompositionMode_SourceIn)
+    painter.fillRect(pixmap.rect(), color)
+    painter.end()
+    return pixmap
+
+
+@instrument('render_pixmap', path_key)
+def render_pixmap(
+    path: str,
+    size: QtCore.QSize,
+    data: bytes | None = None,
+    dpr: float = 1.0,
+) -> QtGui.QPixmap:
+    """
+    Return a pixmap of the SVG at 'path' or of 'data' at 'size'. The SVG is
+    rasterized at the exact pixel size for the device pixel ratio.
+    """
+
+    if data is None:
+        reader = QtGui.QImageReader(path)
+    else:
+        buffer = QtCore.QBuffer()
+        buffer.setData(data)
+        reader = QtGui.QImageReader(buffer, b'svg')
+    reader.setScaledSize(physical_size(size, dpr))
+    pixmap = QtGui.QPixmap.fromImage(reader.read())
+    pixmap.setDevicePixelRatio(dpr)
+    return pixmap
+
+
+@instrument('render_svg', path_key)
+def render_svg(
+    path: str,
+    size: QtCore.QSize,
+    color: QtGui.QColor,
+    data: bytes | None = None,
+    dpr: float = 1.0,
+) -> QtGui.QPixmap:
+    """
+    Return a pixmap of the SVG at 'path' or of 'data' at 'size' filled with
+    'color'. The color is the fill of the SVG, so the pixmap is painted once
+    without compositing it.
+    """
+
+    pixmap = QtGui.QPixmap(physical_size(size, dpr))
+    pixmap.fill(QtCore.Qt.GlobalColor.transparent)
+    painter = QtGui.QPainter(pixmap)
+    svg_renderer(path, color, data).render(painter)
+    painter.end()
+    pixmap.setDevicePixelRatio(dpr)
+    return pixmap
+
+
+@instrument('render_path', path_key)
+def render_path(
+    path: str,
+    compiled: CompiledPath,
+    size: QtCore.QSize,
+    color: QtGui.QColor | None,
+    dpr: float = 1.0,
+) -> QtGui.QImage:
+    """
+    Return an image of the compiled path of the SVG at 'path' at 'size' filled with
+    'color'. Without a color the alpha mask of the path is returned.
+    """
+
+    if color is None:
+        image = compiled.mask(physical_size(size, dpr))
+    else:
+        image = compiled.image(physical_size(size, dpr), color)
+    image.setDevicePixelRatio(dpr)
+    return image
+
+
+def render_image(
+    data: bytes,
+    size: QtCore.QSize,
+    color: QtGui.QColor,
+    dpr: float = 1.0,
+    rendering: Rendering | None = None,
+    path: str | None = None,
+) -> QtGui.QImage:
+    """
+    Return an image of the SVG 'data' at 'size' filled with 'color'. Unlike
+    pixmaps, images can be rendered outside of the GUI thread. 'path' is used to
+    find the compiled path of the SVG.
+    """
+
+    if rendering is None:
+        rendering = SVGIconEngine.rendering
+    if rendering == Rendering.PATH:
+        compiled = None if path is None else compiled_path(path)
+        if compiled is not None:
+            return render_path(path, compiled, size, color, dpr)
+    if rendering in (Rendering.MASK, Rendering.PATH):
+        return tint_mask(path, svg_mask(path, data, size, dpr), [color])[0]
+    return render_data(path, data, size, color, dpr, rendering)
+
+
+@instrument('render_image', path_key)
+def render_data(
+    path: str | None,
+    data: bytes,
+    size: QtCore.QSize,
+    color: QtGui.QColor,
+    dpr: float = 1.0,
+    rendering: Rendering = Rendering.SVG,
+) -> QtGui.QImage:
+    """
+    Return an image of the SVG 'data' filled with 'color' in any thread. Renderers
+    are not shared between threads, so the SVG rendering injects the color into
+    the SVG that is parsed for the image.
+    """
+
+    image = QtGui.QImage(
+        physical_size(size, dpr), QtGui.QImage.Format.Format_ARGB32_Premultiplied
+    )
+    image.fill(QtCore.Qt.GlobalColor.transparent)
+    painter = QtGui.QPainter(image)
+    if rendering == Rendering.SVG:
+        renderer = QtSvg.QSvgRenderer(QtCore.QByteArray(fill_svg(data, color)))
+        renderer.render(painter)
+    else:
+        QtSvg.QSvgRenderer(QtCore.QByteArray(data)).render(painter)
+        painter.setCompositionMode(
+            QtGui.QPainter.CompositionMode.CompositionMode_SourceIn
+        )
+        painter.fillRect(image.rect(), color)
+    painter.end()
+    image.setDevicePixelRatio(dpr)
+    return image
+
+
+def render_mask(
+    path: str,
+    size: QtCore.QSize,
+    data: bytes | None = None,
+    dpr: float = 1.0,
+) -> QtGui.QImage:
+    """
+    Return the alpha mask of the SVG at 'path' or of 'data' at 'size'. Masks are
+    cached by path, size and dpr within the byte budget of the pixmap cache.
+    """
+
+    key = (path, size.width(), size.height(), dpr)
+    mask = mask_cache.get(key)
+    if mask is not None:
+        return mask
+
+    compiled = None
+    if SVGIconEngine.rendering == Rendering.PATH and not is_glyph_path(path):
+        compiled = compiled_path(path)
+    if is_glyph_path(path):
+        pixmap = render_glyph(path, physical_size(size, dpr), QtGui.QColor('black'))
+        mask = pixmap.toImage().convertToFormat(MASK_FORMAT)
+        mask.setDevicePixelRatio(dpr)
+    elif compiled is not None:
+        mask = render_path(path, compiled, size, None, dpr)
+    else:
+        if data is None:
+            data = read_data(path)
+        mask = svg_mask(path, data, size, dpr)
+    mask_cache.insert(key, mask)
+    return mask
+
+
+@instrument('render_mask', path_key)
+def svg_mask(
+    path: str | None, data: bytes, size: QtCore.QSize, dpr: float = 1.0
+) -> QtGui.QImage:
+    """Return the alpha mask of the SVG 'data' of 'path' at 'size' in any thread."""
+
+    mask = QtGui.QImage(physical_size(size, dpr), MASK_FORMAT)
+    mask.fill(0)
+    painter = QtGui.QPainter(mask)
+    QtSvg.QSvgRenderer(QtCore.QByteArray(data)).render(painter)
+    painter.end()
+    mask.setDevicePixelRatio(dpr)
+    return mask
+
+
+@instrument('tint_mask', path_key)
+def tint_mask(
+    path: str | None, mask: QtGui.QImage, colors: Sequence[QtGui.QColor]
+) -> list[QtGui.QImage]:
+    """Return an image of the alpha mask of the SVG at 'path' for every color."""
+
+    return tint_images(mask, colors)
+
+
+def read_data(path: str) -> bytes:
+    """Return the data of the file or resource at 'path'."""
+
+    qfile = QtCore.QFile(path)
+    if not qfile.open(QtCore.QIODevice.OpenModeFlag.ReadOnly):
+        return b''
+    data = qfile.readAll().data()
+    qfile.close()
+    return data
+
+
+def content_hash(path: str, data: bytes | None = None) -> str:
+    """
+    Return a hash of the SVG data of 'path' or of 'data'. Glyphs are drawn from the
+    font of the package and have no data.
+    """
+
+    if is_glyph_path(path):
+        return ''
+    if data is None:
+        data = read_data(path)
+    return hashlib.sha1(data).hexdigest()
+
+
+def svg_renderer(
+    path: str, color: QtGui.QColor, data: bytes | None = None
+) -> QtSvg.QSvgRenderer:
+    """
+    Return a renderer of the SVG at 'path' or of 'data' filled with 'color', it is
+    parsed once per color. Data is cached by its hash, not by the path.
+    """
+
+    key = (path, None if data is None else hash(data), color.rgba())
+    renderer = _renderers.get(key)
+    if renderer is not None:
+        _renderers.move_to_end(key)
+        return renderer
+
+    if data is None:
+        data = read_data(path)
+
+    renderer = QtSvg.QSvgRenderer(QtCore.QByteArray(fill_svg(data, color)))
+    _renderers[key] = renderer
+    if len(_renderers) > MAX_RENDERERS:
+        _renderers.popitem(last=False)
+    return renderer
+
+
+def fill_svg(data: bytes, color: QtGui.QColor) -> bytes:
+    """
+    Return the SVG data with 'color' as the fill of the root element, a fill of
+    the root element is replaced. Material Symbols don't set a fill, so every
+    shape inherits it.
+    """
+
+    match = SVG_START_TAG.search(data)
+    if match is None:
+        return data
+    tag = FILL_ATTRIBUTE.sub(b'', match.group())
+    fill = f' fill="{color.name()}" fill-opacity="{color.alphaF():.3f}"'.encode()
+    tag = tag[:4] + fill + tag[4:]
+    return data[: match.start()] + tag + data[match.end() :]
+
+
+def pixmap_key(
+    path: str, size: QtCore.QSize, dpr: float, color: QtGui.QColor
+) -> tuple[str, int, int, float, int]:
+    """Return the key of a pixmap in the pixmap and image caches."""
+
+    return path, size.width(), size.height(), dpr, color.rgba()
+
+
+def physical_size(size: QtCore.QSize, dpr: float) -> QtCore.QSize:
+    """Return the size in device pixels, fractional sizes are rounded up."""
+
+    return QtCore.QSize(math.ceil(size.width() * dpr), math.ceil(size.height() * dpr))
+
+
+def is_alive(engine: QtGui.QIconEngine) -> bool:
+    """Return whether the C++ object of 'engine' has not been deleted yet."""
+
+    try:
+        QtGui.QIconEngine.key(engine)
+    except RuntimeError:
+        return False
+    return True
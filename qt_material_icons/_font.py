@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+import logging
+import os
+import urllib.parse
+
+try:
+    from qtpy import QtCore, QtGui
+except ImportError:
+    try:
+        from PySide6 import QtCore, QtGui
+    except ImportError:
+        from PySide2 import QtCore, QtGui
+
+from ._stats import instrument, path_key
+
+logger = logging.getLogger(__name__)
+
+RESOURCE_DIR = os.path.join(os.path.dirname(__file__), 'resources')
+
+# Glyphs are addressed like paths, so they share the color rules and the pixmap
+# cache of the SVG icons: materialsymbols:outlined/search?fill=1&wght=400&grad=0
+SCHEME = 'materialsymbols:'
+
+_families: dict[str, str | None] = {}
+_codepoints: dict[str, dict[str, str]] = {}
+
+
+def font_filename(style: str) -> str:
+    """Return the filename of the variable font for a style without extension."""
+
+    return f'MaterialSymbols{style.title()}'
+
+
+def font_family(style: str) -> str | None:
+    """Return the family of the variable font for a style, it is loaded once."""
+
+    if style not in _families:
+        path = os.path.join(RESOURCE_DIR, f'{font_filename(style)}.ttf')
+        font_id = QtGui.QFontDatabase.addApplicationFont(path)
+        if font_id == -1:
+            logger.error(f'Could not load font: {path}')
+            _families[style] = None
+        else:
+            _families[style] = QtGui.QFontDatabase.applicationFontFamilies(font_id)[0]
+    return _families[style]
+
+
+def codepoints(style: str) -> dict[str, str]:
+    """Return the characters of the glyphs by name, the index is read once."""
+
+    if style not in _codepoints:
+        index = {}
+        path = os.path.join(RESOURCE_DIR, f'{font_filename(style)}.codepoints')
+        try:
+            with open(path, 'r') as f:
+                for line in f:
+                    name, _, codepoint = line.partition(' ')
+                    if codepoint:
+                        index[name] = chr(int(codepoint, 16))
+        except OSError:
+            logger.error(f'Could not read codepoints: {path}')
+        _codepoints[style] = index
+    return _codepoints[style]
+
+
+def glyph_path(
+    name: str,
+    style: str,
+    fill: bool,
+    size: int,
+    weight: int = 400,
+    grade: int = 0,
+) -> str:
+    """Return the path of a glyph with the values of the variable font axes."""
+
+    query = urllib.parse.urlencode(
+        {'fill': int(fill), 'wght': weight, 'grad': grade, 'opsz': size}
+    )
+    return f'{SCHEME}{style}/{name}?{query}'
+
+
+def is_glyph_path(path: str) -> bool:
+    """Return whether the path is the path of a glyph."""
+
+    return path.startswith(SCHEME)
+
+
+@instrument('render_glyph', path_key)
+def render_glyph(path: str, size: QtCore.QSize, color: QtGui.QColor) -> QtGui.QPixmap:
+    """Return a pixmap of the glyph at 'path' drawn at 'size' in device pixels."""
+
+    location, _, query = path[len(SCHEME) :].partition('?')
+    style, _, name = location.partition('/')
+    axes = dict(urllib.parse.parse_qsl(query))
+
+    pixmap = QtGui.QPixmap(size)
+    pixmap.fill(QtCore.Qt.GlobalColor.transparent)
+
+    family = font_family(style)
+    character = codepoints(style).get(name)
+    if family is None or character is None:
+        return pixmap
+
+    em = min(size.width(), size.height())
+    font = QtGui.QFont(family)
+    font.setPixelSize(em)
+    if hasattr(font, 'setVariableAxis'):
+        # Variable axes are available since Qt 6.7.
+        optical_size = min(max(float(axes.get('opsz', 24)), 20), 48)
+        font.setVariableAxis(QtGui.QFont.Tag('FILL'), float(axes.get('fill', 0)))
+        font.setVariableAxis(QtGui.QFont.Tag('wght'), float(axes.get('wght', 400)))
+        font.setVariableAxis(QtGui.QFont.Tag('GRAD'), float(axes.get('grad', 0)))
+        font.setVariableAxis(QtGui.QFont.Tag('opsz'), optical_size)
+
+    painter = QtGui.QPainter(pixmap)
+    painter.setRenderHint(QtGui.QPainter.RenderHint.TextAntialiasing)
+    painter.setFont(font)
+    painter.setPen(color)
+    # The glyphs fill the em square above the baseline like the viewBox of the SVGs
+    # (0 -960 960 960), the line height of the font isn't centered.
+    origin = QtCore.QPointF((size.width() - em) / 2, (size.height() + em) / 2)
+    painter.drawText(origin, character)
+    painter.end()
+    return pixmap
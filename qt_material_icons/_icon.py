@@ -1,8 +1,13 @@
 from __future__ import annotations
 
 import enum
+import functools
 import importlib
+import json
+import logging
 import os
+import re
+from collections.abc import Iterable, Sequence
 
 try:
     from qtpy import QtCore, QtGui, QtWidgets
@@ -12,17 +17,55 @@ except ImportError:
     except ImportError:
         from PySide2 import QtCore, QtGui, QtWidgets
 
+from ._cache import icon_registry, image_cache, mask_cache, pixmap_cache
+from ._engine import (
+    Rendering,
+    SVGIconEngine,
+    device_pixel_ratio,
+    fill_pixmap,
+    pixmap_key,
+    resolve_color,
+)
+from ._font import codepoints, glyph_path
+from ._pack import IconPack
+from ._path import SUFFIX as PATH_SUFFIX, add_loader
+from ._rcc import FORMAT_VERSION, ResourceTree, resource_sections
+from ._preload import Preload, preload
+from ._stats import instrument
+
+logger = logging.getLogger(__name__)
+
 ColorRole = QtGui.QPalette.ColorRole
 ColorGroup = QtGui.QPalette.ColorGroup
 State = QtGui.QIcon.State
 Mode = QtGui.QIcon.Mode
 
+_packs: dict[tuple[MaterialIcon.Style, int], IconPack | None] = {}
+_manifests: dict[tuple[MaterialIcon.Style, int], frozenset[str] | None] = {}
+# The sections of the registered packs, Qt reads them without copying.
+_registered: dict[tuple[MaterialIcon.Style, int], tuple[bytes, bytes, bytes]] = {}
+
+RESOURCE_PATTERN = re.compile(
+    r':/material-design-icons/symbols/web/[^/]+/materialsymbols(\w+)/'
+    r'([^/]+_(\d+)px\.svg)$'
+)
+FILENAME_PATTERN = re.compile(r'(.+?)(_fill1)?_(\d+)px\.svg$')
+
 
 class SVGIcon(QtGui.QIcon):
-    def __init__(self, path: str) -> None:
-        super().__init__()
+    Rendering = Rendering
+
+    @instrument('construct', lambda self, path, *args, **kwargs: path)
+    def __init__(
+        self,
+        path: str,
+        size: QtCore.QSize | None = None,
+        data: bytes | None = None,
+    ) -> None:
+        # Only the path and color rules are stored, pixmaps are rendered on demand.
+        self._engine = SVGIconEngine(path, size, data)
+        super().__init__(self._engine)
         self._path = path
-        self._pixmap = QtGui.QPixmap(path)
         self._init_colors()
 
     def __repr__(self) -> str:
@@ -30,11 +73,24 @@ class SVGIcon(QtGui.QIcon):
         return f'{self.__class__.__name__}({name!r})'
 
     def _init_colors(self) -> None:
-        palette = QtWidgets.QApplication.palette()
-        self._color_normal = palette.color(ColorGroup.Normal, ColorRole.WindowText)
-        self._color_disabled = palette.color(ColorGroup.Disabled, ColorRole.WindowText)
-        self.set_color(self._color_normal, Mode.Normal, State.Off)
-        self.set_color(self._color_disabled, Mode.Disabled, State.Off)
+        # The colors follow the application palette and are resolved when painted.
+        self.set_color(ColorRole.WindowText, Mode.Normal, State.Off)
+        self.set_color(ColorRole.WindowText, Mode.Disabled, State.Off)
+
+    @staticmethod
+    def set_rendering(rendering: Rendering) -> None:
+        """
+        Set how colors are applied to the SVGs of all icons. Rendering.SVG renders
+        the SVG with the color as its fill, Rendering.TINT fills a copy of the
+        rendered pixmap, Rendering.MASK tints an alpha mask that is rasterized once
+        for all colors and Rendering.PATH fills the path compiled at build time
+        without parsing the SVG.
+        """
+
+        SVGIconEngine.rendering = rendering
+        pixmap_cache.clear()
+        image_cache.clear()
+        mask_cache.clear()
 
     def set_icon(
         self,
@@ -42,11 +98,10 @@ class SVGIcon(QtGui.QIcon):
         mode: Mode = Mode.Normal,
         state: State = State.Off,
     ):
-        if isinstance(icon, type(self)):
-            pixmap = icon._pixmap
+        if isinstance(icon, SVGIcon):
+            self._engine.set_path(icon._path, mode, state, icon._engine.data())
         else:
-            pixmap = icon.pixmap(self._pixmap.size())
-        self.addPixmap(pixmap, mode, state)
+            self._engine.set_icon(icon, mode, state)
 
     def pixmap(
         self,
@@ -54,39 +109,43 @@ class SVGIcon(QtGui.QIcon):
         mode: Mode = Mode.Normal,
         state: State = State.Off,
         color: QtGui.QColor | None = None,
+        dpr: float | None = None,
     ) -> QtGui.QPixmap:
-        if size:
-            pixmap = QtGui.QIcon(self._path).pixmap(size)
-        else:
-            pixmap = self._pixmap
+        if isinstance(size, int):
+            size = QtCore.QSize(size, size)
+        return self._engine.pixmap(size, mode, state, color, dpr)
 
-        if color is None:
-            if state == State.Off and mode == Mode.Disabled:
-                color = self._color_disabled
-            else:
-                color = self._color_normal
-        return fill_pixmap(pixmap, color)
+    def images(
+        self,
+        size: QtCore.QSize | int = 0,
+        modes: Sequence[Mode] = (
+            Mode.Normal,
+            Mode.Disabled,
+            Mode.Active,
+            Mode.Selected,
+        ),
+        state: State = State.Off,
+        colors: Sequence[QtGui.QColor] | None = None,
+        dpr: float | None = None,
+    ) -> list[QtGui.QImage]:
+        """
+        Return an image for every mode, or for every color if colors are given.
+        The SVG is rasterized once and all images are tinted from its alpha mask.
+        """
+
+        if isinstance(size, int):
+            size = QtCore.QSize(size, size)
+        if colors is None:
+            colors = [self._engine.color(mode, state) for mode in modes]
+        return self._engine.images(size, colors, state, dpr)
 
     def set_color(
         self,
-        color: QtGui.QColor,
+        color: QtGui.QColor | ColorRole,
         mode: Mode = Mode.Normal,
         state: State = State.Off,
     ):
-        self.addPixmap(self.pixmap(color=color), mode, state)
-
-
-def fill_pixmap(pixmap: QtGui.QPixmap, color: QtGui.QColor) -> QtGui.QPixmap:
-    """
-    Return a copy of 'pixmap' filled with 'color'.
-    """
-
-    pixmap = QtGui.QPixmap(pixmap)
-    painter = QtGui.QPainter(pixmap)
-    painter.setCompositionMode(QtGui.QPainter.CompositionMode.CompositionMode_SourceIn)
-    painter.fillRect(pixmap.rect(), color)
-    painter.end()
-    return pixmap
+        self._engine.set_color(color, mode, state)
 
 
 class MaterialIcon(SVGIcon):
@@ -99,21 +158,125 @@ class MaterialIcon(SVGIcon):
     ROUNDED = Style.ROUNDED
     SHARP = Style.SHARP
 
+    class Loading(enum.Enum):
+        # Read only the requested icon from the icon pack.
+        ICON = 'icon'
+        # Import the resource module with all icons of the style and size.
+        RESOURCE = 'resource'
+
+    loading = Loading.ICON
+
+    class Backend(enum.Enum):
+        # Render the SVGs of the resources.
+        SVG = 'svg'
+        # Render the glyphs of the Material Symbols variable fonts.
+        FONT = 'font'
+
+    backend = Backend.SVG
+
     def __init__(
         self,
         name: str,
         style: Style = Style.OUTLINED,
         fill: bool = False,
         size: int = 20,
+        weight: int = 400,
+        grade: int = 0,
     ) -> None:
         self.name = name
-        self.import_resource(style, size)
-        super().__init__(MaterialIcon.resource_path(name, style, fill, size))
+        if MaterialIcon.backend == MaterialIcon.Backend.FONT:
+            # Glyphs can be drawn at any size with any value of the font axes.
+            path = glyph_path(name, style.value, fill, size, weight, grade)
+            super().__init__(path, QtCore.QSize(size, size))
+            return
+
+        path = MaterialIcon.resource_path(name, style, fill, size)
+        manifest = MaterialIcon.resource_manifest(style, size)
+        if manifest is not None and os.path.basename(path) not in manifest:
+            logger.warning(
+                f'Icon was not extracted: {name}:{style.value}'
+                f'{":fill" if fill else ""}:{size}'
+            )
+        if MaterialIcon.loading == MaterialIcon.Loading.ICON:
+            data = MaterialIcon.resource_data(name, style, fill, size)
+        else:
+            self.import_resource(style, size)
+            data = None
+        super().__init__(path, QtCore.QSize(size, size), data)
 
     def __repr__(self) -> str:
         return f'{self.__class__.__name__}({self.name!r})'
 
+    @classmethod
+    def get(
+        cls,
+        name: str,
+        style: Style = Style.OUTLINED,
+        fill: bool = False,
+        size: int = 20,
+        color: QtGui.QColor | None = None,
+    ) -> MaterialIcon:
+        """
+        Return a shared icon, icons that are still alive are reused instead of
+        created again. Shared icons should not be modified with set_color or set_icon.
+        """
+
+        rgba = None if color is None else QtGui.QColor(color).rgba()
+        key = (cls, MaterialIcon.backend, name, style, fill, size, rgba)
+
+        def factory() -> MaterialIcon:
+            icon = cls(name, style, fill, size)
+            if color is not None:
+                icon.set_color(color)
+            return icon
+
+        return icon_registry.get(key, factory)
+
+    @staticmethod
+    def preload(
+        specs: Iterable[tuple[str, Style, bool, int, QtGui.QColor | None]],
+        dpr: float | None = None,
+        pool: QtCore.QThreadPool | None = None,
+    ) -> Preload:
+        """
+        Rasterize the icons for the specs in a thread pool. Icons created later on
+        the GUI thread only convert the images to pixmaps. The specs are tuples of
+        name, style, fill, size and color, if color is None the palette is used.
+        Glyphs of the font backend are not preloaded.
+        """
+
+        if dpr is None:
+            dpr = device_pixel_ratio()
+        if MaterialIcon.backend == MaterialIcon.Backend.FONT:
+            return preload([], SVGIconEngine.rendering, pool)
+
+        jobs = []
+        for name, style, fill, size, color in specs:
+            if color is None:
+                color = resolve_color(ColorRole.WindowText, Mode.Normal)
+            else:
+                color = QtGui.QColor(color)
+            qsize = QtCore.QSize(size, size)
+            path = MaterialIcon.resource_path(name, style, fill, size)
+            key = pixmap_key(path, qsize, dpr, color)
+            if key in pixmap_cache or key in image_cache:
+                continue
+            # Open the pack on this thread, only the data is read in the pool.
+            MaterialIcon.resource_pack(style, size)
+            loader = functools.partial(
+                MaterialIcon.resource_data, name, style, fill, size
+            )
+            jobs.append((key, loader, qsize, color, dpr))
+        return preload(jobs, SVGIconEngine.rendering, pool)
+
     @staticmethod
+    def glyph_exists(name: str, style: Style) -> bool:
+        """Return whether the variable font of the style has a glyph for the name."""
+
+        return name in codepoints(style.value)
+
+    @staticmethod
+    @instrument('import_resource', lambda style, size: f'icons_{style.value}_{size}')
     def import_resource(style: MaterialIcon.Style, size: int) -> None:
         """
         Imports the resource for Qt, separated by style to not load unneeded SVGs.
@@ -121,6 +284,112 @@ class MaterialIcon(SVGIcon):
 
         importlib.import_module(f'{__package__}.resources.icons_{style.value}_{size}')
 
+    @staticmethod
+    def resource_pack(style: MaterialIcon.Style, size: int) -> IconPack | None:
+        """
+        Return the icon pack for the style and size, icons are read from the pack
+        one at a time instead of importing the whole resource.
+        """
+
+        if MaterialIcon.loading != MaterialIcon.Loading.ICON:
+            return None
+        return open_pack(style, size)
+
+    @staticmethod
+    def register_pack(style: MaterialIcon.Style, size: int) -> bool:
+        """
+        Register the icons of the icon pack for the style and size at their
+        resource paths, so the ':/' paths can be opened without the resource module.
+        Return whether the icons are registered.
+        """
+
+        key = (style, size)
+        if key in _registered:
+            return True
+        pack = open_pack(style, size)
+        if pack is None:
+            return False
+
+        files = {}
+        for filename, data in pack.items():
+            match = FILENAME_PATTERN.match(filename)
+            if match is None:
+                continue
+            name, fill, _ = match.groups()
+            files[MaterialIcon.resource_path(name, style, bool(fill), size)] = data
+        # The data is registered as stored in the pack, it is not compressed again.
+        sections = resource_sections(ResourceTree(files, compress_threshold=None))
+        if not QtCore.qRegisterResourceData(FORMAT_VERSION, *sections):
+            logger.error(f'Could not register icon pack: {pack.path}')
+            return False
+        _registered[key] = sections
+        return True
+
+    @staticmethod
+    def compiled_path_data(path: str) -> bytes | None:
+        """
+        Return the compiled path of the SVG at the resource path from the icon pack
+        or None if the icon has no compiled path.
+        """
+
+        match = RESOURCE_PATTERN.match(path)
+        if match is None:
+            return None
+        style, filename, size = match.groups()
+        try:
+            pack = open_pack(MaterialIcon.Style(style), int(size))
+        except ValueError:
+            return None
+        name = os.path.splitext(filename)[0] + PATH_SUFFIX
+        if pack is None or name not in pack:
+            return None
+        return pack.data(name)
+
+    @staticmethod
+    def resource_manifest(style: Style, size: int) -> frozenset[str] | None:
+        """
+        Return the filenames of the extracted icons for the style and size or None
+        if the resources were not extracted with a manifest.
+        """
+
+        key = (style, size)
+        if key not in _manifests:
+            path = os.path.join(
+                os.path.dirname(__file__),
+                'resources',
+                f'icons_{style.value}_{size}.json',
+            )
+            try:
+                with open(path, 'r') as f:
+                    _manifests[key] = frozenset(json.load(f))
+            except (OSError, ValueError):
+                _manifests[key] = None
+        return _manifests[key]
+
+    @staticmethod
+    def resource_data(name: str, style: Style, fill: bool, size: int) -> bytes | None:
+        """
+        Return the SVG data of the requested icon or None if it doesn't exist.
+        Only the requested icon is read if there is an icon pack for the style and
+        size, otherwise the resource is imported.
+        """
+
+        path = MaterialIcon.resource_path(name, style, fill, size)
+        pack = MaterialIcon.resource_pack(style, size)
+        if pack is not None:
+            try:
+                return pack.data(os.path.basename(path))
+            except KeyError:
+                return None
+
+        MaterialIcon.import_resource(style, size)
+        qfile = QtCore.QFile(path)
+        if not qfile.open(QtCore.QIODevice.OpenModeFlag.ReadOnly):
+            return None
+        data = qfile.readAll().data()
+        qfile.close()
+        return data or None
+
     @staticmethod
     def resource_path(name: str, style: Style, fill: bool, size: int) -> str:
         """Return the resource path."""
@@ -140,4 +409,27 @@ class MaterialIcon(SVGIcon):
         """Return whether the resource for the requested icon exists."""
 
         path = MaterialIcon.resource_path(name, style, fill, size)
+        manifest = MaterialIcon.resource_manifest(style, size)
+        if manifest is not None:
+            return os.path.basename(path) in manifest
+        pack = MaterialIcon.resource_pack(style, size)
+        if pack is not None:
+            return os.path.basename(path) in pack
         return QtCore.QFile(path).exists()
+
+
+def open_pack(style: MaterialIcon.Style, size: int) -> IconPack | None:
+    """Return the icon pack for the style and size, it is opened only once."""
+
+    key = (style, size)
+    if key not in _packs:
+        path = os.path.join(
+            os.path.dirname(__file__),
+            'resources',
+            f'icons_{style.value}_{size}.pack',
+        )
+        _packs[key] = IconPack(path) if os.path.exists(path) else None
+    return _packs[key]
+
+
+add_loader(MaterialIcon.compiled_path_data)
@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+from collections.abc import Sequence
+
+try:
+    from qtpy import QtCore, QtGui
+except ImportError:
+    try:
+        from PySide6 import QtCore, QtGui
+    except ImportError:
+        from PySide2 import QtCore, QtGui
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+MASK_FORMAT = QtGui.QImage.Format.Format_Alpha8
+IMAGE_FORMAT = QtGui.QImage.Format.Format_ARGB32_Premultiplied
+
+
+def tint_images(
+    mask: QtGui.QImage, colors: Sequence[QtGui.QColor]
+) -> list[QtGui.QImage]:
+    """
+    Return an image of the alpha mask for every color. With numpy all colors are
+    computed at once from the mask buffer, otherwise every image is painted.
+    """
+
+    if np is None:
+        return [paint_image(mask, color) for color in colors]
+    return numpy_images(mask, colors)
+
+
+def numpy_images(
+    mask: QtGui.QImage, colors: Sequence[QtGui.QColor]
+) -> list[QtGui.QImage]:
+    """Return the tinted images of the mask computed with numpy."""
+
+    width = mask.width()
+    height = mask.height()
+    alpha = np.frombuffer(mask.constBits(), np.uint8, mask.sizeInBytes())
+    alpha = alpha.reshape(height, mask.bytesPerLine())[:, :width].astype(np.uint32)
+
+    # Premultiplied channels: value * color alpha * mask alpha / 255²
+    argb = np.array(
+        [(c.alpha(), c.red(), c.green(), c.blue()) for c in colors], np.uint32
+    )
+    argb[:, 1:] = (argb[:, 1:] * argb[:, :1] + 127) // 255
+    channels = (alpha[None, :, :, None] * argb[:, None, None, :] + 127) // 255
+    pixels = (
+        (channels[..., 0] << 24)
+        | (channels[..., 1] << 16)
+        | (channels[..., 2] << 8)
+        | channels[..., 3]
+    ).astype(np.uint32)
+
+    images = []
+    for buffer in pixels:
+        buffer = np.ascontiguousarray(buffer)
+        # Copy the image, it would reference the memory of the array otherwise.
+        image = QtGui.QImage(buffer.data, width, height, width * 4, IMAGE_FORMAT).copy()
+        image.setDevicePixelRatio(mask.devicePixelRatio())
+        images.append(image)
+    return images
+
+
+def paint_image(mask: QtGui.QImage, color: QtGui.QColor) -> QtGui.QImage:
+    """Return an image of the mask filled with 'color'."""
+
+    image = QtGui.QImage(mask.size(), IMAGE_FORMAT)
+    image.setDevicePixelRatio(mask.devicePixelRatio())
+    image.fill(color)
+    painter = QtGui.QPainter(image)
+    painter.setCompositionMode(
+        QtGui.QPainter.CompositionMode.CompositionMode_DestinationIn
+    )
+    painter.drawImage(QtCore.QPoint(0, 0), mask)
+    painter.end()
+    return image
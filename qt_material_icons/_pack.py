@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+import mmap
+import struct
+import zlib
+from collections.abc import Iterator
+
+from ._rcc import Compressed, FileData
+
+# An icon pack is a single file that is memory-mapped on load:
+#
+#   header  magic, version, flags, count
+#   table   name offset, name length, data offset, data length and data size for
+#           each icon, sorted by name
+#   names   utf-8 encoded names
+#   data    concatenated SVG blobs, zlib compressed if length != size, entries
+#           of equal blobs share the data
+#
+# Names are looked up with a binary search over the table, so neither the index
+# nor the data is read into memory beyond the pages that are touched.
+MAGIC = b'QMIP'
+VERSION = 2
+HEADER = struct.Struct('<4sHHI')
+ENTRY = struct.Struct('<IHIII')
+
+
+class IconPack:
+    """
+    A read-only pack of SVG blobs. The data of an icon is paged in when it is
+    requested.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, _, count = HEADER.unpack_from(self._mmap)
+        if magic != MAGIC or version != VERSION:
+            self._mmap.close()
+            raise ValueError(f'Unsupported icon pack: {path}')
+        self._count = count
+
+    def __repr__(self) -> str:
+        return f'{self.__class__.__name__}({self.path!r})'
+
+    def __contains__(self, name: str) -> bool:
+        return self._find(name) is not None
+
+    def __iter__(self) -> Iterator[str]:
+        for index in range(self._count):
+            yield self._name(self._entry(index))
+
+    def __len__(self) -> int:
+        return self._count
+
+    def items(self) -> Iterator[tuple[str, FileData]]:
+        """
+        Return the names and the stored data of the icons, compressed data is not
+        decompressed.
+        """
+
+        for index in range(self._count):
+            entry = self._entry(index)
+            _, _, offset, length, size = entry
+            data = self._mmap[offset : offset + length]
+            yield self._name(entry), data if length == size else Compressed(data, size)
+
+    def close(self) -> None:
+        """Close the memory-mapped file."""
+
+        self._mmap.close()
+
+    def data(self, name: str) -> bytes:
+        """Return the SVG data for 'name'."""
+
+        entry = self._find(name)
+        if entry is None:
+            raise KeyError(name)
+        _, _, offset, length, size = entry
+        data = self._mmap[offset : offset + length]
+        if length != size:
+            data = zlib.decompress(data)
+        return data
+
+    def _entry(self, index: int) -> tuple[int, int, int, int, int]:
+        return ENTRY.unpack_from(self._mmap, HEADER.size + index * ENTRY.size)
+
+    def _name(self, entry: tuple[int, int, int, int, int]) -> str:
+        offset, length = entry[:2]
+        return self._mmap[offset : offset + length].decode('utf-8')
+
+    def _find(self, name: str) -> tuple[int, int, int, int, int] | None:
+        key = name.encode('utf-8')
+        low, high = 0, self._count
+        while low < high:
+            middle = (low + high) // 2
+            entry = self._entry(middle)
+            offset, length = entry[:2]
+            current = self._mmap[offset : offset + length]
+            if current == key:
+                return entry
+            if current < key:
+                low = middle + 1
+            else:
+                high = middle
+        return None
+
+
+def write_pack(path: str, blobs: dict[str, bytes], compress: bool = True) -> None:
+    """Write the blobs to an icon pack, equal blobs are stored once."""
+
+    items = sorted((name.encode('utf-8'), blob) for name, blob in blobs.items())
+
+    names_offset = HEADER.size + len(items) * ENTRY.size
+    data_offset = names_offset + sum(len(name) for name, _ in items)
+
+    table = bytearray()
+    names = bytearray()
+    data = bytearray()
+    offsets: dict[bytes, tuple[int, int]] = {}
+    for name, blob in items:
+        size = len(blob)
+        shared = offsets.get(blob)
+        if shared is None:
+            stored = blob
+            if compress:
+                compressed = zlib.compress(blob, 9)
+                if len(compressed) < size:
+                    stored = compressed
+            shared = offsets[blob] = (data_offset + len(data), len(stored))
+            data += stored
+        table += ENTRY.pack(names_offset + len(names), len(name), *shared, size)
+        names += name
+
+    with open(path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, 0, len(items)))
+        f.write(table)
+        f.write(names)
+        f.write(data)
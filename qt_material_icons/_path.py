@@ -0,0 +1,193 @@
+from __future__ import annotations
+
+import array
+import struct
+import sys
+import threading
+from collections.abc import Callable, Sequence
+
+try:
+    from qtpy import QtCore, QtGui
+except ImportError:
+    try:
+        from PySide6 import QtCore, QtGui
+    except ImportError:
+        from PySide2 import QtCore, QtGui
+
+from ._mask import IMAGE_FORMAT, MASK_FORMAT
+from ._stats import instrument, path_key
+
+# A compiled path replaces the SVG of a single color icon:
+#
+#   header  magic, version, flags, verb count, point count and the viewBox
+#   verbs   one byte per verb
+#   points  x and y of the points of the verbs as 32 bit floats
+#
+# Compiled paths are stored in the icon packs next to the SVGs ('.path' instead
+# of '.svg'), drawing them doesn't parse any XML.
+MAGIC = b'QMPP'
+VERSION = 1
+HEADER = struct.Struct('<4sBBIIffff')
+SUFFIX = '.path'
+
+EVEN_ODD = 0x01
+
+MOVE = 0
+LINE = 1
+QUAD = 2
+CUBIC = 3
+CLOSE = 4
+POINT_COUNTS = (1, 1, 2, 3, 0)
+
+_lock = threading.Lock()
+_compiled: dict[str, CompiledPath | None] = {}
+_loaders: list[Callable[[str], bytes | None]] = []
+
+
+class CompiledPath:
+    """A painter path in the coordinates of its viewBox."""
+
+    def __init__(self, path: QtGui.QPainterPath, view_box: QtCore.QRectF) -> None:
+        self.path = path
+        self.view_box = view_box
+
+    def __repr__(self) -> str:
+        return (
+            f'{self.__class__.__name__}('
+            f'elements={self.path.elementCount()}, view_box={self.view_box})'
+        )
+
+    def image(self, size: QtCore.QSize, color: QtGui.QColor) -> QtGui.QImage:
+        """
+        Return an image of the path filled with 'color' at 'size' in device pixels.
+        Images can be rendered in any thread.
+        """
+
+        image = QtGui.QImage(size, IMAGE_FORMAT)
+        image.fill(QtCore.Qt.GlobalColor.transparent)
+        self.paint(image, color)
+        return image
+
+    def mask(self, size: QtCore.QSize) -> QtGui.QImage:
+        """Return the alpha mask of the path at 'size' in device pixels."""
+
+        mask = QtGui.QImage(size, MASK_FORMAT)
+        mask.fill(0)
+        self.paint(mask, QtGui.QColor('black'))
+        return mask
+
+    def paint(self, image: QtGui.QImage, color: QtGui.QColor) -> None:
+        """Fill the path scaled to the whole image."""
+
+        painter = QtGui.QPainter(image)
+        painter.setRenderHint(QtGui.QPainter.RenderHint.Antialiasing)
+        painter.scale(
+            image.width() / self.view_box.width(),
+            image.height() / self.view_box.height(),
+        )
+        painter.translate(-self.view_box.x(), -self.view_box.y())
+        painter.fillPath(self.path, color)
+        painter.end()
+
+
+def encode_path(
+    verbs: Sequence[int],
+    points: Sequence[float],
+    view_box: Sequence[float],
+    even_odd: bool = False,
+) -> bytes:
+    """Return the compiled path of the verbs and the flat x and y of their points."""
+
+    verb_data = bytes(verbs)
+    point_data = array.array('f', points)
+    if sys.byteorder != 'little':
+        point_data.byteswap()
+    header = HEADER.pack(
+        MAGIC,
+        VERSION,
+        EVEN_ODD if even_odd else 0,
+        len(verb_data),
+        len(points) // 2,
+        *view_box,
+    )
+    return header + verb_data + point_data.tobytes()
+
+
+def decode_path(data: bytes) -> CompiledPath:
+    """Return the painter path of compiled path data."""
+
+    magic, version, flags, verb_count, point_count, *view_box = HEADER.unpack_from(data)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError('Unsupported compiled path')
+    offset = HEADER.size + verb_count
+    if len(data) < offset + point_count * 8:
+        raise ValueError('Truncated compiled path')
+
+    verbs = data[HEADER.size : offset]
+    points = array.array('f')
+    points.frombytes(data[offset : offset + point_count * 8])
+    if sys.byteorder != 'little':
+        points.byteswap()
+
+    path = QtGui.QPainterPath()
+    if flags & EVEN_ODD:
+        path.setFillRule(QtCore.Qt.FillRule.OddEvenFill)
+    else:
+        path.setFillRule(QtCore.Qt.FillRule.WindingFill)
+    index = 0
+    for verb in verbs:
+        if verb == MOVE:
+            path.moveTo(points[index], points[index + 1])
+        elif verb == LINE:
+            path.lineTo(points[index], points[index + 1])
+        elif verb == QUAD:
+            path.quadTo(*points[index : index + 4])
+        elif verb == CUBIC:
+            path.cubicTo(*points[index : index + 6])
+        elif verb == CLOSE:
+            path.closeSubpath()
+        else:
+            raise ValueError(f'Invalid verb in compiled path: {verb}')
+        index += POINT_COUNTS[verb] * 2
+    return CompiledPath(path, QtCore.QRectF(*view_box))
+
+
+def add_loader(loader: Callable[[str], bytes | None]) -> None:
+    """
+    Add a function that returns the compiled path data of an SVG path or None if
+    it has no compiled path.
+    """
+
+    _loaders.append(loader)
+
+
+def compiled_path(path: str) -> CompiledPath | None:
+    """Return the compiled path of the SVG at 'path', it is decoded only once."""
+
+    with _lock:
+        if path in _compiled:
+            return _compiled[path]
+
+    compiled = None
+    for loader in _loaders:
+        data = loader(path)
+        if data:
+            compiled = load_path(path, data)
+            break
+    with _lock:
+        _compiled[path] = compiled
+    return compiled
+
+
+@instrument('decode_path', path_key)
+def load_path(path: str, data: bytes) -> CompiledPath:
+    """Return the decoded compiled path of the SVG at 'path'."""
+
+    return decode_path(data)
+
+
+def clear() -> None:
+    """Remove the decoded paths."""
+
+    with _lock:
+        _compiled.clear()
@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+import logging
+import threading
+from collections.abc import Callable, Hashable, Sequence
+from typing import Optional, Tuple
+
+try:
+    from qtpy import QtCore, QtGui
+except ImportError:
+    try:
+        from PySide6 import QtCore, QtGui
+    except ImportError:
+        from PySide2 import QtCore, QtGui
+
+from ._cache import image_cache
+from ._engine import Rendering, render_image
+
+logger = logging.getLogger(__name__)
+
+# An image to preload: cache key, loader of the SVG data, size, color and dpr
+Job = Tuple[Hashable, Callable[[], Optional[bytes]], QtCore.QSize, QtGui.QColor, float]
+
+
+class Preload(QtCore.QObject):
+    """
+    Icons that are rasterized in a thread pool. 'finished' is emitted on the
+    thread of the preload once all images are in the image cache.
+    """
+
+    finished = QtCore.Signal()
+
+    def __init__(self, count: int, parent: QtCore.QObject | None = None) -> None:
+        super().__init__(parent)
+        self._remaining = count
+        self._lock = threading.Lock()
+        self._event = threading.Event()
+        if not count:
+            self._event.set()
+            QtCore.QTimer.singleShot(0, self.finished.emit)
+
+    def __repr__(self) -> str:
+        return f'{self.__class__.__name__}(remaining={self._remaining})'
+
+    def is_finished(self) -> bool:
+        """Return whether all images are rasterized."""
+
+        return self._event.is_set()
+
+    def wait(self, timeout: float | None = None) -> bool:
+        """Block until all images are rasterized and return whether they are."""
+
+        return self._event.wait(timeout)
+
+    def _task_done(self) -> None:
+        with self._lock:
+            self._remaining -= 1
+            finished = not self._remaining
+        if finished:
+            self._event.set()
+            self.finished.emit()
+
+
+class PreloadTask(QtCore.QRunnable):
+    def __init__(self, preload: Preload, job: Job, rendering: Rendering) -> None:
+        super().__init__()
+        self._preload = preload
+        self._job = job
+        self._rendering = rendering
+
+    def run(self) -> None:
+        key, loader, size, color, dpr = self._job
+        try:
+            data = loader()
+            if data:
+                image = render_image(data, size, color, dpr, self._rendering, key[0])
+                image_cache.insert(key, image)
+        except Exception:
+            logger.exception(f'Could not preload icon: {key}')
+        finally:
+            self._preload._task_done()
+
+
+def preload(
+    jobs: Sequence[Job],
+    rendering: Rendering,
+    pool: QtCore.QThreadPool | None = None,
+) -> Preload:
+    """Rasterize the images of the jobs in 'pool' or the global thread pool."""
+
+    if pool is None:
+        pool = QtCore.QThreadPool.globalInstance()
+
+    handle = Preload(len(jobs))
+    for job in jobs:
+        pool.start(PreloadTask(handle, job, rendering))
+    return handle
@@ -0,0 +1,306 @@
+from __future__ import annotations
+
+import io
+import struct
+import zlib
+from collections.abc import Callable, Iterable, Mapping
+from typing import BinaryIO, NamedTuple, TextIO, Union
+
+# Qt's binary resource format as written by rcc:
+#
+#   header  'qres', version, tree offset, data offset, names offset, flags
+#   data    4 byte length and the file data for each file, zlib compressed files
+#           start with the 4 byte uncompressed size
+#   names   2 byte length, 4 byte hash and utf-16 characters for each name
+#   tree    a node for each directory and file, the children of a directory are
+#           stored in a row sorted by the hash of their names
+#
+# All numbers are big-endian, offsets in the tree are relative to the sections.
+MAGIC = b'qres'
+FORMAT_VERSION = 3
+HEADER = struct.Struct('>4sIIIII')
+DIRECTORY_NODE = struct.Struct('>IHIIQ')
+FILE_NODE = struct.Struct('>IHHHIQ')
+
+COMPRESSED = 0x01
+DIRECTORY = 0x02
+
+# rcc only compresses files that become at least 70% smaller.
+COMPRESS_THRESHOLD = 70
+LANGUAGE_C = 1
+ANY_TERRITORY = 0
+
+
+class Compressed(NamedTuple):
+    """File data that is already compressed with zlib and its uncompressed size."""
+
+    data: bytes
+    size: int
+
+
+FileData = Union[bytes, Compressed]
+
+
+class Node:
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.data: FileData | None = None
+        self.children: dict[str, Node] = {}
+        self.name_offset = 0
+        self.data_offset = 0
+        self.child_offset = 0
+        self.flags = 0
+
+
+class ResourceTree:
+    """
+    The files of a resource by resource path (e.g., 'icons/home.svg'). The data
+    is written first, so it can be streamed without keeping a copy of the output.
+    """
+
+    def __init__(
+        self,
+        files: Mapping[str, FileData] | Iterable[tuple[str, FileData]],
+        compress_threshold: int | None = COMPRESS_THRESHOLD,
+    ) -> None:
+        self._root = Node('')
+        self._root.flags = DIRECTORY
+        self._compress_threshold = compress_threshold
+        self._flags = 0
+        self.duplicates = 0
+        self.duplicate_bytes = 0
+        items = files.items() if isinstance(files, Mapping) else files
+        for path, data in items:
+            self.add(path, data)
+
+    def add(self, path: str, data: FileData) -> None:
+        """Add a file at the resource path."""
+
+        node = self._root
+        *directories, filename = path.replace('\\', '/').lstrip(':/').split('/')
+        for directory in directories:
+            if not directory or directory == '.':
+                continue
+            child = node.children.get(directory)
+            if child is None:
+                child = node.children[directory] = Node(directory)
+                child.flags = DIRECTORY
+            node = child
+        child = node.children[filename] = Node(filename)
+        child.data = data
+
+    def nodes(self) -> list[Node]:
+        """Return the nodes in the order of the tree with the child offsets set."""
+
+        nodes = [self._root]
+        for node in nodes:
+            if node.flags & DIRECTORY:
+                node.child_offset = len(nodes)
+                nodes.extend(
+                    sorted(node.children.values(), key=lambda n: qt_hash(n.name))
+                )
+        return nodes
+
+    def write_data(self, write: Callable[[bytes], object]) -> int:
+        """
+        Write the data section and return its length. Files with the same content
+        are written once and share the data.
+        """
+
+        offset = 0
+        offsets: dict[FileData, tuple[int, int, int]] = {}
+        self.duplicates = 0
+        self.duplicate_bytes = 0
+        for node in self.nodes():
+            if node.flags & DIRECTORY:
+                continue
+            shared = offsets.get(node.data)
+            if shared is not None:
+                node.data_offset, flags, length = shared
+                node.flags |= flags
+                self.duplicates += 1
+                self.duplicate_bytes += length
+                continue
+            data, compressed = self._file_data(node.data)
+            if compressed:
+                node.flags |= COMPRESSED
+                self._flags |= COMPRESSED
+            node.data_offset = offset
+            length = 4 + len(data)
+            offsets[node.data] = (offset, node.flags & COMPRESSED, length)
+            write(struct.pack('>I', len(data)))
+            write(data)
+            offset += length
+        return offset
+
+    def names(self) -> bytes:
+        """Return the names section, equal names are stored once."""
+
+        buffer = io.BytesIO()
+        offsets: dict[str, int] = {}
+        for node in self.nodes()[1:]:
+            offset = offsets.get(node.name)
+            if offset is None:
+                offset = offsets[node.name] = buffer.tell()
+                encoded = node.name.encode('utf-16-be')
+                buffer.write(struct.pack('>HI', len(encoded) // 2, qt_hash(node.name)))
+                buffer.write(encoded)
+            node.name_offset = offset
+        return buffer.getvalue()
+
+    def tree(self) -> bytes:
+        """Return the tree section, it is written after the data and names."""
+
+        buffer = io.BytesIO()
+        for node in self.nodes():
+            if node.flags & DIRECTORY:
+                buffer.write(
+                    DIRECTORY_NODE.pack(
+                        node.name_offset,
+                        node.flags,
+                        len(node.children),
+                        node.child_offset,
+                        0,
+                    )
+                )
+            else:
+                buffer.write(
+                    FILE_NODE.pack(
+                        node.name_offset,
+                        node.flags,
+                        ANY_TERRITORY,
+                        LANGUAGE_C,
+                        node.data_offset,
+                        0,
+                    )
+                )
+        return buffer.getvalue()
+
+    def flags(self) -> int:
+        """Return the flags of all files, it is known after the data is written."""
+
+        return self._flags
+
+    def _file_data(self, data: FileData) -> tuple[bytes, bool]:
+        if self._compress_threshold is not None and not isinstance(data, Compressed):
+            data = compress_data(data, self._compress_threshold)
+        if isinstance(data, Compressed):
+            # Compressed data is prefixed with the uncompressed size like qCompress.
+            return struct.pack('>I', data.size) + data.data, True
+        return data, False
+
+
+def compress_data(data: bytes, threshold: int = COMPRESS_THRESHOLD) -> FileData:
+    """
+    Return the data compressed if it becomes at least 'threshold' percent smaller,
+    like rcc does. Files can be compressed in parallel before they are written.
+    """
+
+    if not data:
+        return data
+    compressed = zlib.compress(data)
+    ratio = int(100.0 * (len(data) - len(compressed) - 4) / len(data))
+    if ratio >= threshold:
+        return Compressed(compressed, len(data))
+    return data
+
+
+def qt_hash(name: str) -> int:
+    """Return the hash rcc uses to sort and find names."""
+
+    h = 0
+    encoded = name.encode('utf-16-be')
+    for index in range(0, len(encoded), 2):
+        h = (h << 4) + ((encoded[index] << 8) | encoded[index + 1])
+        h ^= (h & 0xF0000000) >> 23
+        h &= 0x0FFFFFFF
+    return h
+
+
+def write_rcc(f: BinaryIO, tree: ResourceTree) -> None:
+    """Write the resource as a binary rcc file, 'f' needs to be seekable."""
+
+    start = f.tell()
+    f.write(b'\0' * HEADER.size)
+    data_offset = HEADER.size
+    data_length = tree.write_data(f.write)
+    names = tree.names()
+    f.write(names)
+    f.write(tree.tree())
+    end = f.tell()
+
+    names_offset = data_offset + data_length
+    tree_offset = names_offset + len(names)
+    f.seek(start)
+    f.write(
+        HEADER.pack(
+            MAGIC,
+            FORMAT_VERSION,
+            tree_offset,
+            data_offset,
+            names_offset,
+            tree.flags(),
+        )
+    )
+    f.seek(end)
+
+
+def resource_sections(tree: ResourceTree) -> tuple[bytes, bytes, bytes]:
+    """
+    Return the tree, names and data sections of the resource, the arguments of
+    qRegisterResourceData.
+    """
+
+    buffer = io.BytesIO()
+    tree.write_data(buffer.write)
+    names = tree.names()
+    return tree.tree(), names, buffer.getvalue()
+
+
+def write_rcc_module(f: TextIO, tree: ResourceTree) -> None:
+    """Write the resource as a python module that registers it on import."""
+
+    f.write(
+        '# Resource object code (Python 3)\n'
+        '# Created by: qt_material_icons\n'
+        '# WARNING! All changes made in this file will be lost!\n'
+        '\n'
+        'try:\n'
+        '    from qtpy import QtCore\n'
+        'except ImportError:\n'
+        '    try:\n'
+        '        from PySide6 import QtCore\n'
+        '    except ImportError:\n'
+        '        from PySide2 import QtCore\n'
+        '\n'
+    )
+    f.write('qt_resource_data = b"\\\n')
+    tree.write_data(lambda data: write_literal(f, data))
+    f.write('"\n\n')
+    for variable, section in (
+        ('qt_resource_name', tree.names()),
+        ('qt_resource_struct', tree.tree()),
+    ):
+        f.write(f'{variable} = b"\\\n')
+        write_literal(f, section)
+        f.write('"\n\n')
+    f.write(
+        'def qInitResources():\n'
+        f'    QtCore.qRegisterResourceData(0x{FORMAT_VERSION:02x}, '
+        'qt_resource_struct, qt_resource_name, qt_resource_data)\n'
+        '\n'
+        'def qCleanupResources():\n'
+        f'    QtCore.qUnregisterResourceData(0x{FORMAT_VERSION:02x}, '
+        'qt_resource_struct, qt_resource_name, qt_resource_data)\n'
+        '\n'
+        'qInitResources()\n'
+    )
+
+
+def write_literal(f: TextIO, data: bytes, width: int = 16) -> None:
+    """Write the bytes as escaped lines of a bytes literal."""
+
+    for index in range(0, len(data), width):
+        chunk = data[index : index + width]
+        f.write(''.join(f'\\x{byte:02x}' for byte in chunk))
+        f.write('\\\n')
@@ -0,0 +1,185 @@
+from __future__ import annotations
+
+import atexit
+import collections
+import functools
+import os
+import sys
+import threading
+import time
+from collections.abc import Callable
+from typing import Any, TypeVar
+
+try:
+    from qtpy import QtGui
+except ImportError:
+    try:
+        from PySide6 import QtGui
+    except ImportError:
+        from PySide2 import QtGui
+
+from ._cache import image_bytes, pixmap_bytes, pixmap_cache
+
+# Set to 1 to collect stats from the start and print a report at exit.
+ENV_VAR = 'QT_MATERIAL_ICONS_STATS'
+
+F = TypeVar('F', bound=Callable[..., Any])
+
+
+class Stats:
+    """
+    Counters and cumulative timings of the icon pipeline. Stats are only
+    collected while enabled, otherwise instrumented functions are called as is.
+    """
+
+    def __init__(self) -> None:
+        self.enabled = False
+        self._lock = threading.Lock()
+        self.counts: collections.Counter[str] = collections.Counter()
+        self.seconds: collections.defaultdict[str, float] = collections.defaultdict(
+            float
+        )
+        self.keys: collections.defaultdict[str, collections.Counter[str]] = (
+            collections.defaultdict(collections.Counter)
+        )
+        self.imports: collections.defaultdict[str, float] = collections.defaultdict(
+            float
+        )
+        self.bytes = 0
+
+    def __repr__(self) -> str:
+        return (
+            f'{self.__class__.__name__}('
+            f'enabled={self.enabled}, counts={dict(self.counts)})'
+        )
+
+    def enable(self, enabled: bool = True) -> None:
+        """Start or stop collecting stats."""
+
+        self.enabled = enabled
+
+    def reset(self) -> None:
+        """Reset all counters and timings."""
+
+        with self._lock:
+            self.counts.clear()
+            self.seconds.clear()
+            self.keys.clear()
+            self.imports.clear()
+            self.bytes = 0
+
+    def record(
+        self,
+        operation: str,
+        seconds: float,
+        key: str | None = None,
+        result: Any = None,
+    ) -> None:
+        """Record a call of 'operation', 'key' is the icon or resource it used."""
+
+        with self._lock:
+            self.counts[operation] += 1
+            self.seconds[operation] += seconds
+            if key is not None:
+                self.keys[operation][key] += 1
+                if operation == 'import_resource':
+                    self.imports[key] += seconds
+            results = result if isinstance(result, list) else [result]
+            for item in results:
+                if isinstance(item, QtGui.QPixmap):
+                    self.bytes += pixmap_bytes(item)
+                elif isinstance(item, QtGui.QImage):
+                    self.bytes += image_bytes(item)
+
+    def snapshot(self) -> dict[str, Any]:
+        """Return a copy of the stats as plain data."""
+
+        with self._lock:
+            renders: collections.Counter[str] = collections.Counter()
+            for operation, keys in self.keys.items():
+                if operation.startswith('render_'):
+                    renders.update(keys)
+            return {
+                'operations': {
+                    operation: {'count': count, 'seconds': self.seconds[operation]}
+                    for operation, count in self.counts.items()
+                },
+                'renders': dict(renders),
+                'constructions': dict(self.keys['construct']),
+                'imports': dict(self.imports),
+                'bytes': self.bytes,
+                'cache': {'hits': pixmap_cache.hits, 'misses': pixmap_cache.misses},
+            }
+
+    def report(self, limit: int = 10) -> str:
+        """Return a readable report with the icons used most often."""
+
+        data = self.snapshot()
+        lines = [f'{"operation":<24} {"count":>8} {"total ms":>10} {"mean ms":>10}']
+        for operation, values in sorted(data['operations'].items()):
+            count = values['count']
+            milliseconds = values['seconds'] * 1000
+            lines.append(
+                f'{operation:<24} {count:>8} {milliseconds:>10.2f} '
+                f'{milliseconds / count:>10.3f}'
+            )
+        lines.append(f'rasterized bytes: {data["bytes"]}')
+        lines.append(
+            f'pixmap cache: {data["cache"]["hits"]} hits, '
+            f'{data["cache"]["misses"]} misses'
+        )
+        if data['imports']:
+            lines.append('resource imports:')
+            for name, seconds in sorted(data['imports'].items()):
+                lines.append(f'  {name:<40} {seconds * 1000:>10.2f} ms')
+        for title, counts in (
+            ('most rendered icons', data['renders']),
+            ('most constructed icons', data['constructions']),
+        ):
+            if counts:
+                lines.append(f'{title}:')
+                for path, count in collections.Counter(counts).most_common(limit):
+                    lines.append(f'  {count:>8} {path}')
+        return '\n'.join(lines)
+
+    def print_report(self) -> None:
+        """Print the report to stderr."""
+
+        print(self.report(), file=sys.stderr)
+
+
+def path_key(path: str, *args: Any, **kwargs: Any) -> str:
+    """Return the path of an icon that is the first argument of a call."""
+
+    return path
+
+
+def instrument(
+    operation: str, key: Callable[..., str | None] | None = None
+) -> Callable[[F], F]:
+    """
+    Record the calls of the decorated function as 'operation'. 'key' returns the
+    icon or resource of a call from its arguments.
+    """
+
+    def decorator(func: F) -> F:
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            if not stats.enabled:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            result = func(*args, **kwargs)
+            seconds = time.perf_counter() - start
+            stats.record(operation, seconds, key and key(*args, **kwargs), result)
+            return result
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorator
+
+
+stats = Stats()
+
+if os.environ.get(ENV_VAR, '0') not in ('', '0'):
+    stats.enable()
+    atexit.register(stats.print_report)
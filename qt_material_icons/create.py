@@ -1,68 +1,65 @@
+from __future__ import annotations
+
 import logging
-import re
-import subprocess
-from collections.abc import Sequence
+import os
+from collections.abc import Iterable, Mapping
 
 from qt_material_icons import MaterialIcon
+from qt_material_icons._pack import write_pack
+from qt_material_icons._rcc import FileData, ResourceTree, write_rcc, write_rcc_module
 
 logger = logging.getLogger(__name__)
 
 
-def write_qrc_file(path: str, files: Sequence[str]) -> None:
-    """Write the files to a qrc xml file."""
-
-    with open(path, 'w') as f:
-        f.write('<!DOCTYPE RCC>\n<RCC version="1.0">\n')
-        f.write('<qresource>\n')
-        for file in files:
-            file_path = file.replace('\\', '/')
-            f.write(f'<file>{file_path}</file>\n')
-        f.write('</qresource>\n')
-        f.write('</RCC>\n')
-
-
-def create_resource_file(qrc_path: str, resource_path: str) -> None:
-    """Create resource file from a qrc file."""
+def create_resource_file(
+    resource_path: str,
+    files: Mapping[str, FileData] | Iterable[tuple[str, FileData]],
+    header: str = '',
+) -> None:
+    """
+    Create a resource file from the data of the files by resource path. A '.rcc'
+    path creates a binary resource, otherwise a python module that works with all
+    Qt imports. 'header' is written at the top of the module. Files with the same
+    content are stored once.
+    """
 
-    logging.debug(f'Using qrc file: {qrc_path}')
-    logging.info(f'Creating resource file: {qrc_path}')
+    logging.info(f'Creating resource file: {resource_path}')
 
-    # HACK: Disable zstd compression as Windows does not support it. (GH-6)
-    result = subprocess.run(['pyside6-rcc', qrc_path, '-no-zstd', '-o', resource_path])
+    tree = ResourceTree(files)
+    # The file is replaced once it is complete, a partial file is never used.
+    temp_path = f'{resource_path}.tmp'
     try:
-        result.check_returncode()
-    except subprocess.CalledProcessError:
-        logger.debug(result.stderr)
-        logger.error(result.stderr)
-        return
-    patch_imports(resource_path)
-
-
-def patch_imports(path: str) -> None:
-    """Patch resource file to work with all Qt imports."""
-
-    logging.info(f'Patching imports for resource file: {path}')
-
-    with open(path, 'r') as f:
-        content = f.read()
-
-    old = r'from \w+ import QtCore'
-    new = (
-        'try:\n'
-        '    from qtpy import QtCore, QtGui, QtWidgets\n'
-        'except ImportError:\n'
-        '    try:\n'
-        '        from PySide6 import QtCore, QtGui, QtWidgets\n'
-        '    except ImportError:\n'
-        '        from PySide2 import QtCore, QtGui, QtWidgets\n'
-    )
-    content = re.sub(old, new, content, count=1)
-
-    with open(path, 'w') as f:
-        f.write(content)
-
-
-def qrc_file(style: MaterialIcon.Style, size: int) -> str:
-    """Return the qrc filename for a style and size."""
-
-    return f'material_design_icons_{style.value}_{size}.qrc'
+        if os.path.splitext(resource_path)[1] == '.rcc':
+            with open(temp_path, 'wb') as f:
+                write_rcc(f, tree)
+        else:
+            with open(temp_path, 'w') as f:
+                f.write(header)
+                write_rcc_module(f, tree)
+        os.replace(temp_path, resource_path)
+    except OSError:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    if tree.duplicates:
+        logging.info(
+            f'Shared the data of {tree.duplicates} duplicate files '
+            f'({tree.duplicate_bytes} bytes): {resource_path}'
+        )
+
+
+def create_pack_file(
+    pack_path: str, files: Mapping[str, bytes], compress: bool = True
+) -> None:
+    """Create an icon pack from the data of the files, stored by their filename."""
+
+    logging.info(f'Creating pack file: {pack_path}')
+
+    blobs = {os.path.basename(path): data for path, data in files.items()}
+    write_pack(pack_path, blobs, compress=compress)
+
+
+def pack_file(style: MaterialIcon.Style, size: int) -> str:
+    """Return the pack filename for a style and size."""
+
+    return f'icons_{style.value}_{size}.pack'
@@ -1,23 +1,22 @@
+from __future__ import annotations
+
+import concurrent.futures
+import hashlib
 import importlib.util
+import json
 import logging
 import os
 import shutil
-import tempfile
-from collections.abc import Sequence
-
-try:
-    from qtpy import QtCore
-except ImportError:
-    try:
-        from PySide6 import QtCore
-    except ImportError:
-        from PySide2 import QtCore
+from collections.abc import Collection, Iterable, Mapping, Sequence
 
-from qt_material_icons import MaterialIcon
-from qt_material_icons.create import create_resource_file, qrc_file, write_qrc_file
+from qt_material_icons import MaterialIcon, __version__
+from qt_material_icons._rcc import compress_data
+from qt_material_icons.create import create_resource_file
 
 logger = logging.getLogger(__name__)
 
+SOURCE_HASH_PREFIX = '# source-hash: '
+
 
 def extract_icon(
     name: str,
@@ -30,17 +29,42 @@ def extract_icon(
 
     resource_path = MaterialIcon.resource_path(name, style, fill, size)
 
-    qfile = QtCore.QFile(resource_path)
-    if not qfile.open(QtCore.QIODevice.OpenModeFlag.ReadOnly):
-        logger.error(f'Could not open source resource file: {resource_path}')
+    # Only the requested icon is read if the resource is available as an icon pack.
+    svg_data = MaterialIcon.resource_data(name, style, fill, size)
+    if not svg_data:
+        logger.error(f'Could not read source resource: {resource_path}')
         raise OSError
 
-    svg_data = qfile.readAll()
-    qfile.close()
+    return write_icon(resource_path, svg_data, output)
 
-    if svg_data.isEmpty():
-        logger.error(f'Source resource is empty at {resource_path}')
-        raise OSError
+
+def read_icons(
+    names: Sequence[str],
+    style: MaterialIcon.Style,
+    size: int,
+    fills: Mapping[str, Collection[bool]] | None = None,
+) -> dict[str, bytes]:
+    """
+    Return the svg data of the icons matching the names by resource path. 'fills'
+    are the fill variants of the names, by default both variants are read.
+    """
+
+    icons = {}
+    for name in names:
+        for fill in (True, False):
+            if fills is not None and fill not in fills.get(name, ()):
+                continue
+            resource_path = MaterialIcon.resource_path(name, style, fill, size)
+            svg_data = MaterialIcon.resource_data(name, style, fill, size)
+            if not svg_data:
+                logger.error(f'Could not read source resource: {resource_path}')
+                continue
+            icons[resource_path] = svg_data
+    return icons
+
+
+def write_icon(resource_path: str, svg_data: bytes, output: str) -> str:
+    """Write the svg data and return the filename relative to the root."""
 
     # Match the same directory structure to preserve qrc paths
     icon_path = resource_path[2:]
@@ -48,56 +72,110 @@ def extract_icon(
     os.makedirs(os.path.dirname(output_file), exist_ok=True)
 
     with open(output_file, 'wb') as f:
-        f.write(svg_data.data())
+        f.write(svg_data)
 
     return icon_path
 
 
+def hash_icons(icons: dict[str, bytes]) -> str:
+    """Return a hash of the resource paths and svg data of the icons."""
+
+    digest = hashlib.sha256(__version__.encode('utf-8'))
+    for resource_path in sorted(icons):
+        digest.update(resource_path.encode('utf-8'))
+        digest.update(icons[resource_path])
+    return digest.hexdigest()
+
+
+def read_source_hash(resource_path: str) -> str | None:
+    """Return the source hash stored in the first line of the resource file."""
+
+    try:
+        with open(resource_path, 'r') as f:
+            line = f.readline()
+    except OSError:
+        return None
+    if line.startswith(SOURCE_HASH_PREFIX):
+        return line[len(SOURCE_HASH_PREFIX) :].strip()
+    return None
+
+
+def write_manifest(resource_path: str, icons: Collection[str]) -> None:
+    """Write the filenames of the icons in the resource file next to it."""
+
+    with open(manifest_path(resource_path), 'w') as f:
+        json.dump(sorted(os.path.basename(path) for path in icons), f, indent=0)
+
+
+def manifest_path(resource_path: str) -> str:
+    """Return the path of the manifest of a resource file."""
+
+    return f'{os.path.splitext(resource_path)[0]}.json'
+
+
 def extract_icons(
     output: str,
     names: Sequence[str],
     style: MaterialIcon.Style = MaterialIcon.Style.OUTLINED,
     size: int = 20,
+    force: bool = False,
+    jobs: int | None = None,
+    fills: Mapping[str, Collection[bool]] | None = None,
+    executor: concurrent.futures.Executor | None = None,
 ) -> None:
     """
     Extract the icons matching the names for the given style and size and create a
-    resource file in the output directory.
+    resource file in the output directory. 'fills' are the fill variants of the
+    names, by default both variants are extracted. The resource file is skipped if
+    it was created from the same icons. A manifest of the icons is saved next to
+    the resource file. The icons are compressed in 'executor' or by 'jobs' threads.
     """
 
-    MaterialIcon.import_resource(style, size)
-
-    with tempfile.TemporaryDirectory() as temp_dir:
-        filenames = []
-
-        for name in names:
-            for fill in (True, False):
-                try:
-                    filename = extract_icon(
-                        name=name,
-                        style=style,
-                        fill=fill,
-                        size=size,
-                        output=temp_dir,
-                    )
-                    filenames.append(filename)
-                except IOError as e:
-                    logger.error(e)
-                    continue
-
-        if not filenames:
-            logger.error('No files extracted.')
-            return
-
-        qrc_path = os.path.join(temp_dir, qrc_file(style, size))
-        write_qrc_file(qrc_path, filenames)
-
-        package_name = __package__
-        resource_dir = os.path.join(output, package_name, 'resources')
-        resource_path = os.path.join(resource_dir, f'icons_{style.value}_{size}.py')
-
-        os.makedirs(resource_dir, exist_ok=True)
+    package_name = __package__
+    resource_dir = os.path.join(output, package_name, 'resources')
+    resource_path = os.path.join(resource_dir, f'icons_{style.value}_{size}.py')
+
+    icons = read_icons(names, style, size, fills)
+    if not icons:
+        logger.error('No files extracted.')
+        return
+
+    digest = hash_icons(icons)
+    if not force and read_source_hash(resource_path) == digest:
+        logger.info(f'Resource file is up to date: {resource_path}')
+        if not os.path.exists(manifest_path(resource_path)):
+            write_manifest(resource_path, icons)
+        return
+
+    if executor is None:
+        with concurrent.futures.ThreadPoolExecutor(max_workers=jobs) as executor:
+            files = compress_icons(icons, executor)
+    else:
+        files = compress_icons(icons, executor)
+
+    os.makedirs(resource_dir, exist_ok=True)
+    try:
+        create_resource_file(
+            resource_path, files, header=f'{SOURCE_HASH_PREFIX}{digest}\n'
+        )
+    except OSError as e:
+        logger.error(f'Could not create resource file: {resource_path}: {e}')
+        return
+    write_manifest(resource_path, icons)
+
+
+def compress_icons(
+    icons: dict[str, bytes], executor: concurrent.futures.Executor
+) -> dict[str, bytes]:
+    """
+    Return the compressed svg data of the icons by resource path. Equal icons are
+    compressed once and share the data in the resource file, zlib releases the
+    GIL so the icons are compressed in parallel.
+    """
 
-        create_resource_file(qrc_path=qrc_path, resource_path=resource_path)
+    blobs = list(dict.fromkeys(icons.values()))
+    compressed = dict(zip(blobs, executor.map(compress_data, blobs)))
+    return {path: compressed[svg_data] for path, svg_data in icons.items()}
 
 
 def extract_icons_multi(
@@ -105,29 +183,132 @@ def extract_icons_multi(
     styles: Sequence[MaterialIcon.Style] = (MaterialIcon.Style.OUTLINED,),
     sizes: Sequence[int] = (20,),
     output: str = '.',
+    force: bool = False,
+    jobs: int | None = None,
 ) -> None:
     """
     Extract the icons matching the names for all styles and sizes and create
-    resource files in the output directory.
+    resource files in the output directory. The icons of all styles and sizes are
+    compressed by the same 'jobs' threads.
+    """
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=jobs) as executor:
+        for style in styles:
+            for size in sizes:
+                extract_icons(
+                    output=output,
+                    names=names,
+                    style=style,
+                    size=size,
+                    force=force,
+                    executor=executor,
+                )
+
+
+def extract_variants(
+    variants: Iterable[tuple[str, MaterialIcon.Style, bool, int]],
+    output: str = '.',
+    force: bool = False,
+    jobs: int | None = None,
+) -> None:
+    """
+    Extract the icons of the variants, a tuple of name, style, fill and size, and
+    create a resource file for every style and size that is used. Only the fill
+    variants that are listed are extracted. The icons are compressed by the same
+    'jobs' threads.
     """
 
-    for style in styles:
-        for size in sizes:
-            extract_icons(output=output, names=names, style=style, size=size)
+    fills: dict[tuple[MaterialIcon.Style, int], dict[str, set[bool]]] = {}
+    for name, style, fill, size in variants:
+        fills.setdefault((style, size), {}).setdefault(name, set()).add(fill)
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=jobs) as executor:
+        for (style, size), names in fills.items():
+            extract_icons(
+                output=output,
+                names=sorted(names),
+                style=style,
+                size=size,
+                force=force,
+                fills=names,
+                executor=executor,
+            )
+
+
+def parse_spec(spec: str) -> tuple[str, MaterialIcon.Style, bool, int]:
+    """
+    Return the name, style, fill and size of a spec like 'home:rounded:fill:24'.
+    The style, fill and size are optional and default to outlined, no fill and 20.
+    """
+
+    name, *options = spec.strip().split(':')
+    if not name:
+        raise ValueError(f'Invalid icon spec: {spec}')
+
+    style = MaterialIcon.Style.OUTLINED
+    fill = False
+    size = 20
+    for option in options:
+        option = option.strip().lower()
+        if option in ('fill', 'fill1'):
+            fill = True
+        elif option == 'fill0':
+            fill = False
+        elif option in ('20', '24', '40', '48'):
+            size = int(option)
+        else:
+            try:
+                style = MaterialIcon.Style(option)
+            except ValueError:
+                raise ValueError(f'Invalid icon spec: {spec}') from None
+    return name, style, fill, size
+
+
+def read_spec_file(path: str) -> list[tuple[str, MaterialIcon.Style, bool, int]]:
+    """Return the variants of a file with one spec per line and # comments."""
+
+    variants = []
+    with open(path, 'r') as f:
+        for line in f:
+            line = line.partition('#')[0].strip()
+            if line:
+                variants.append(parse_spec(line))
+    return variants
+
+
+def package_dir(output: str) -> str:
+    """Return the directory of the package extracted to 'output'."""
+
+    return os.path.join(output, __package__)
 
 
 def extract_package(output: str) -> None:
     """Extract the qt-material-icons package and move it into a directory."""
 
     package_name = __package__
-    files = ['__init__.py', '_icon.py']
+    files = [
+        '__init__.py',
+        '_atlas.py',
+        '_cache.py',
+        '_catalog.py',
+        '_disk.py',
+        '_engine.py',
+        '_font.py',
+        '_icon.py',
+        '_mask.py',
+        '_pack.py',
+        '_path.py',
+        '_preload.py',
+        '_rcc.py',
+        '_stats.py',
+    ]
 
     spec = importlib.util.find_spec(package_name)
     if spec is None or spec.origin is None:
         logger.error(f'Could not find installed package: {package_name}.')
         raise RuntimeError
 
-    target_dir = os.path.join(output, package_name)
+    target_dir = package_dir(output)
     os.makedirs(target_dir, exist_ok=True)
 
     for filename in files:
@@ -0,0 +1,461 @@
+from __future__ import annotations
+
+import logging
+import re
+import xml.etree.ElementTree as ElementTree
+from collections.abc import Mapping, Sequence
+from typing import List, Tuple
+
+try:
+    from qtpy import QtCore, QtGui, QtSvg
+except ImportError:
+    try:
+        from PySide6 import QtCore, QtGui, QtSvg
+    except ImportError:
+        from PySide2 import QtCore, QtGui, QtSvg
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+logger = logging.getLogger(__name__)
+
+# A path segment: the command and its arguments, repeated commands are split
+Segment = Tuple[str, List[float]]
+
+SVG_NAMESPACE = 'http://www.w3.org/2000/svg'
+XLINK_NAMESPACE = 'http://www.w3.org/1999/xlink'
+
+# Decimal places of path coordinates, Material Symbols use a 960 unit viewBox.
+PRECISION = 2
+# The largest difference of a color channel between the renderings.
+DIFF_THRESHOLD = 8
+# The version of the optimization, resources are optimized again when it changes.
+VERSION = 1
+
+ARGUMENT_COUNTS = {
+    'M': 2,
+    'L': 2,
+    'H': 1,
+    'V': 1,
+    'C': 6,
+    'S': 4,
+    'Q': 4,
+    'T': 2,
+    'A': 7,
+    'Z': 0,
+}
+# Elements and attributes that don't change the rendering.
+REMOVED_ELEMENTS = {'metadata', 'title', 'desc'}
+REMOVED_ATTRIBUTES = {
+    'id',
+    'class',
+    'version',
+    'baseProfile',
+    'enable-background',
+    'xml:space',
+}
+
+PATH_TOKEN = re.compile(
+    r'([MmLlHhVvCcSsQqTtAaZz])|([-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?)'
+)
+FLAG_TOKEN = re.compile(r'[\s,]*([01])')
+SEPARATOR = re.compile(r'[\s,]*')
+REFERENCE = re.compile(r'#([^\s)"\']+)')
+
+
+class OptimizeReport:
+    """The bytes saved by optimizing the SVG files of a resource."""
+
+    def __init__(self) -> None:
+        self.files = 0
+        self.original_bytes = 0
+        self.optimized_bytes = 0
+        self.rejected: list[str] = []
+
+    def __repr__(self) -> str:
+        return (
+            f'{self.__class__.__name__}('
+            f'files={self.files}, saved={self.saved}, rejected={len(self.rejected)})'
+        )
+
+    @property
+    def saved(self) -> int:
+        """Return the number of bytes saved."""
+
+        return self.original_bytes - self.optimized_bytes
+
+    def to_dict(self) -> dict:
+        """Return the report as plain data."""
+
+        return {
+            'files': self.files,
+            'original_bytes': self.original_bytes,
+            'optimized_bytes': self.optimized_bytes,
+            'saved_bytes': self.saved,
+            'rejected': sorted(self.rejected),
+        }
+
+
+def parse_path(d: str) -> list[Segment]:
+    """
+    Return the segments of path data. Implicit repetitions of a command are split
+    into separate segments, repeated moves become lines.
+    """
+
+    segments: list[Segment] = []
+    position = 0
+    command = None
+    first = True
+    length = len(d)
+    while True:
+        position = SEPARATOR.match(d, position).end()
+        if position >= length:
+            break
+        match = PATH_TOKEN.match(d, position)
+        if match is None:
+            raise ValueError(f'Invalid path data at {position}: {d[position:][:20]}')
+        if match.group(1):
+            command = match.group(1)
+            position = match.end()
+            first = True
+            if command in 'Zz':
+                segments.append((command, []))
+                continue
+        elif command is None or command in 'Zz':
+            raise ValueError(f'Missing path command at {position}: {d[:40]}')
+        elif not first and command in 'Mm':
+            command = 'L' if command == 'M' else 'l'
+
+        arguments: list[float] = []
+        for index in range(ARGUMENT_COUNTS[command.upper()]):
+            position = SEPARATOR.match(d, position).end()
+            # Arc flags are single digits that may not be separated (e.g., '011').
+            token = FLAG_TOKEN if command in 'Aa' and index in (3, 4) else PATH_TOKEN
+            match = token.match(d, position)
+            if match is None or (token is PATH_TOKEN and match.group(1)):
+                raise ValueError(f'Invalid path arguments at {position}: {d[:40]}')
+            arguments.append(float(match.group(match.lastindex)))
+            position = match.end()
+        segments.append((command, arguments))
+        first = False
+    return segments
+
+
+def format_path(segments: list[Segment], precision: int = PRECISION) -> str:
+    """
+    Return the shortest path data of the segments with coordinates rounded to
+    'precision' decimals. Every segment is written absolute or relative, whichever
+    is shorter. The coordinates are rounded before relative values are computed,
+    so rounding errors don't accumulate.
+    """
+
+    scale = 10**precision
+    x = y = 0
+    start_x = start_y = 0
+    parts: list[str] = []
+    previous = ''
+    for command, arguments in segments:
+        upper = command.upper()
+        relative = command != upper
+        if upper == 'Z':
+            x, y = start_x, start_y
+            if previous != 'z':
+                parts.append('z')
+            previous = 'z'
+            continue
+
+        # Quantized absolute coordinates and other values
+        values = [round(value * scale) for value in arguments]
+        if relative:
+            if upper == 'H':
+                values[0] += x
+            elif upper == 'V':
+                values[0] += y
+            else:
+                for index in coordinate_indexes(upper):
+                    values[index] += x
+                    values[index + 1] += y
+        if upper == 'A':
+            values[3:5] = (int(arguments[3] != 0), int(arguments[4] != 0))
+
+        offsets = [x] if upper == 'H' else [y] if upper == 'V' else None
+        candidates = []
+        # Relative values are preferred, they repeat more often and compress better.
+        for letter in (upper.lower(), upper):
+            numbers = list(values)
+            if letter.islower():
+                if offsets is not None:
+                    numbers[0] -= offsets[0]
+                else:
+                    for index in coordinate_indexes(upper):
+                        numbers[index] -= x
+                        numbers[index + 1] -= y
+            texts = [
+                (
+                    str(number)
+                    if upper == 'A' and index in (3, 4)
+                    else format_number(number, scale)
+                )
+                for index, number in enumerate(numbers)
+            ]
+            # A repeated command can be left out, a move is repeated as a line.
+            repeat = (
+                letter == previous
+                and letter not in 'Mm'
+                or (previous, letter) in (('M', 'L'), ('m', 'l'))
+            )
+            candidates.append((join_numbers(texts, '' if repeat else letter), letter))
+        text, letter = min(candidates, key=lambda c: len(c[0]))
+        parts.append(text)
+        previous = letter
+
+        if upper == 'H':
+            x = values[0]
+        elif upper == 'V':
+            y = values[0]
+        else:
+            x, y = values[-2], values[-1]
+        if upper == 'M':
+            start_x, start_y = x, y
+
+    return join_parts(parts)
+
+
+def coordinate_indexes(command: str) -> range:
+    """Return the indexes of the x coordinates of a command's arguments."""
+
+    if command == 'A':
+        return range(5, 6)
+    return range(0, ARGUMENT_COUNTS[command], 2)
+
+
+def format_number(value: int, scale: int) -> str:
+    """Return the shortest text of a quantized number (e.g., 50 -> '.5')."""
+
+    sign = '-' if value < 0 else ''
+    integer, fraction = divmod(abs(value), scale)
+    text = str(integer) if integer else ''
+    if fraction:
+        digits = str(fraction).rjust(len(str(scale)) - 1, '0').rstrip('0')
+        text = f'{text}.{digits}'
+    return f'{sign}{text}' if text else '0'
+
+
+def join_numbers(texts: list[str], prefix: str) -> str:
+    """Return the numbers joined with the fewest separators."""
+
+    text = prefix
+    for number in texts:
+        text = join_parts([text, number]) if text else number
+    return text
+
+
+def join_parts(parts: list[str]) -> str:
+    """Join path parts and add a space only where a number would merge."""
+
+    text = ''
+    for part in parts:
+        if text and part and needs_separator(text, part):
+            text += ' '
+        text += part
+    return text
+
+
+def needs_separator(left: str, right: str) -> bool:
+    """Return whether a space is needed between two parts of path data."""
+
+    if not right[0].isdigit() and right[0] != '.':
+        return False
+    if not (left[-1].isdigit() or left[-1] == '.'):
+        return False
+    if right[0] == '.':
+        # '.5' continues a number without a decimal point (e.g., '1.5').
+        number = re.search(r'[-+]?[\d.]*$', left).group()
+        return '.' not in number
+    return True
+
+
+def optimize_svg(data: bytes, precision: int = PRECISION) -> bytes:
+    """
+    Return the SVG data in a minimal canonical form: elements and attributes that
+    don't render are removed, path data is rounded and shortened and whitespace
+    between elements is dropped.
+    """
+
+    root = ElementTree.fromstring(data)
+    if root.tag not in ('svg', f'{{{SVG_NAMESPACE}}}svg'):
+        raise ValueError(f'Unsupported root element: {root.tag}')
+
+    # Ids that are referenced and classes used by stylesheets are kept.
+    kept = set()
+    for element in root.iter():
+        if local_name(element.tag) == 'style':
+            kept.add('class')
+        for value in element.attrib.values():
+            kept.update(REFERENCE.findall(value))
+    return serialize(root, precision, kept, True).encode('utf-8')
+
+
+def serialize(
+    element: ElementTree.Element, precision: int, kept: set[str], root: bool
+) -> str:
+    """Return the optimized markup of an element and its children."""
+
+    tag = local_name(element.tag)
+    attributes = []
+    if root:
+        attributes.append(('xmlns', SVG_NAMESPACE))
+        if any(
+            key.startswith(f'{{{XLINK_NAMESPACE}}}')
+            for e in element.iter()
+            for key in e.attrib
+        ):
+            attributes.append(('xmlns:xlink', XLINK_NAMESPACE))
+    for key, value in element.attrib.items():
+        name = attribute_name(key)
+        if name is None:
+            continue
+        if name in REMOVED_ATTRIBUTES and not (
+            name == 'id' and value in kept or name == 'class' and 'class' in kept
+        ):
+            continue
+        value = ' '.join(value.split())
+        if name == 'd':
+            value = format_path(parse_path(value), precision)
+        elif name == 'style' and not value:
+            continue
+        attributes.append((name, value))
+
+    children = ''
+    for child in element:
+        # Elements of editors are in other namespaces.
+        namespace = child.tag[1:].partition('}')[0] if child.tag[0] == '{' else None
+        if (
+            namespace in (None, SVG_NAMESPACE)
+            and local_name(child.tag) not in REMOVED_ELEMENTS
+        ):
+            children += serialize(child, precision, kept, False)
+        if child.tail and child.tail.strip():
+            children += escape(child.tail, False)
+    text = element.text or ''
+    text = escape(text, False) if text.strip() else ''
+
+    # Groups without attributes are replaced by their children.
+    if tag == 'g' and not attributes and not text:
+        return children
+
+    markup = ''.join(f' {name}="{escape(value, True)}"' for name, value in attributes)
+    if not children and not text:
+        return f'<{tag}{markup}/>'
+    return f'<{tag}{markup}>{text}{children}</{tag}>'
+
+
+def local_name(tag: str) -> str:
+    """Return the tag without the namespace."""
+
+    return tag.rpartition('}')[2]
+
+
+def attribute_name(key: str) -> str | None:
+    """Return the name of an attribute or None if it is from an editor namespace."""
+
+    if not key.startswith('{'):
+        return key
+    namespace, _, name = key[1:].partition('}')
+    if namespace == XLINK_NAMESPACE:
+        return f'xlink:{name}'
+    if namespace == 'http://www.w3.org/XML/1998/namespace':
+        return f'xml:{name}'
+    return None
+
+
+def escape(text: str, attribute: bool) -> str:
+    """Return the text escaped for xml."""
+
+    text = text.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
+    if attribute:
+        text = text.replace('"', '&quot;')
+    return text
+
+
+def render_svg(data: bytes, size: int) -> QtGui.QImage:
+    """Return the SVG rendered at 'size' on a transparent image."""
+
+    renderer = QtSvg.QSvgRenderer(QtCore.QByteArray(data))
+    image = QtGui.QImage(size, size, QtGui.QImage.Format.Format_ARGB32_Premultiplied)
+    image.fill(QtCore.Qt.GlobalColor.transparent)
+    painter = QtGui.QPainter(image)
+    renderer.render(painter)
+    painter.end()
+    return image
+
+
+def image_difference(image: QtGui.QImage, other: QtGui.QImage) -> int:
+    """
+    Return the largest difference of a color channel between two images. With
+    numpy the pixel buffers are compared at once.
+    """
+
+    if image.size() != other.size():
+        return 255
+    size = image.sizeInBytes()
+    if np is not None:
+        pixels = np.frombuffer(image.constBits(), np.uint8, size).astype(np.int16)
+        other_pixels = np.frombuffer(other.constBits(), np.uint8, size)
+        return int(np.abs(pixels - other_pixels).max())
+    pixels = bytes(image.constBits())[:size]
+    other_pixels = bytes(other.constBits())[:size]
+    if pixels == other_pixels:
+        return 0
+    return max(abs(a - b) for a, b in zip(pixels, other_pixels))
+
+
+def svg_difference(data: bytes, optimized: bytes, sizes: Sequence[int]) -> int:
+    """Return the largest difference of the renderings of the SVGs at 'sizes'."""
+
+    return max(
+        image_difference(render_svg(data, size), render_svg(optimized, size))
+        for size in sizes
+    )
+
+
+def optimize_files(
+    files: Mapping[str, bytes],
+    size: int,
+    precision: int = PRECISION,
+    threshold: int = DIFF_THRESHOLD,
+) -> tuple[dict[str, bytes], OptimizeReport]:
+    """
+    Return the optimized SVG data of the files and a report of the bytes saved.
+    The original and optimized SVGs are rendered at 'size' and twice the size, an
+    optimization that changes a channel by more than 'threshold' is rejected and
+    the original data is kept. A QGuiApplication needs to exist.
+    """
+
+    report = OptimizeReport()
+    optimized_files = {}
+    for path, data in files.items():
+        optimized = data
+        try:
+            candidate = optimize_svg(data, precision)
+        except (ElementTree.ParseError, ValueError) as e:
+            logger.warning(f'Could not optimize svg: {path}: {e}')
+            report.rejected.append(path)
+        else:
+            if len(candidate) < len(data):
+                difference = svg_difference(data, candidate, (size, size * 2))
+                if difference > threshold:
+                    logger.warning(
+                        f'Optimized svg differs by {difference}, '
+                        f'keeping original: {path}'
+                    )
+                    report.rejected.append(path)
+                else:
+                    optimized = candidate
+        optimized_files[path] = optimized
+        report.files += 1
+        report.original_bytes += len(data)
+        report.optimized_bytes += len(optimized)
+    return optimized_files, report
@@ -0,0 +1,293 @@
+from __future__ import annotations
+
+import logging
+import math
+import os
+import re
+import xml.etree.ElementTree as ElementTree
+from collections.abc import Mapping, Sequence
+
+try:
+    from qtpy import QtCore, QtGui
+except ImportError:
+    try:
+        from PySide6 import QtCore, QtGui
+    except ImportError:
+        from PySide2 import QtCore, QtGui
+
+from qt_material_icons._path import (
+    CLOSE,
+    CUBIC,
+    LINE,
+    MOVE,
+    QUAD,
+    SUFFIX,
+    decode_path,
+    encode_path,
+)
+from qt_material_icons.optimize import (
+    DIFF_THRESHOLD,
+    SVG_NAMESPACE,
+    Segment,
+    coordinate_indexes,
+    image_difference,
+    local_name,
+    parse_path,
+    render_svg,
+)
+
+logger = logging.getLogger(__name__)
+
+# Attributes that don't change how a single color path is filled.
+IGNORED_ATTRIBUTES = {'width', 'height', 'viewBox', 'version', 'id', 'class'}
+
+
+def compile_svg(data: bytes) -> bytes | None:
+    """
+    Return the compiled path of an SVG or None if it is not a single color shape
+    of paths. The paths are joined into one, all paths need the same fill rule.
+    """
+
+    root = ElementTree.fromstring(data)
+    if root.tag not in ('svg', f'{{{SVG_NAMESPACE}}}svg'):
+        return None
+    if any(key not in IGNORED_ATTRIBUTES for key in root.attrib):
+        return None
+    view_box = svg_view_box(root)
+    if view_box is None:
+        return None
+
+    segments: list[Segment] = []
+    fill_rules = set()
+    for element in root.iter():
+        if element is root or local_name(element.tag) in ('title', 'desc'):
+            continue
+        if local_name(element.tag) != 'path':
+            return None
+        attributes = set(element.attrib) - {'d', 'id', 'class'}
+        if attributes - {'fill-rule'}:
+            return None
+        fill_rules.add(element.get('fill-rule', 'nonzero'))
+        segments.extend(parse_path(element.get('d', '')))
+    if not segments or len(fill_rules) != 1:
+        return None
+
+    verbs, points = path_elements(segments)
+    return encode_path(verbs, points, view_box, fill_rules == {'evenodd'})
+
+
+def svg_view_box(root: ElementTree.Element) -> tuple[float, ...] | None:
+    """Return the viewBox of the SVG, it defaults to the width and height."""
+
+    try:
+        if 'viewBox' in root.attrib:
+            view_box = tuple(
+                float(v) for v in re.split(r'[\s,]+', root.get('viewBox').strip())
+            )
+        else:
+            view_box = (0.0, 0.0, float(root.get('width')), float(root.get('height')))
+    except (TypeError, ValueError):
+        return None
+    if len(view_box) != 4 or view_box[2] <= 0 or view_box[3] <= 0:
+        return None
+    return view_box
+
+
+def path_elements(segments: Sequence[Segment]) -> tuple[list[int], list[float]]:
+    """
+    Return the verbs and the points of the segments in absolute coordinates.
+    Smooth curves are expanded and arcs are approximated with cubic curves.
+    """
+
+    verbs: list[int] = []
+    points: list[float] = []
+    x = y = 0.0
+    start_x = start_y = 0.0
+    # The last control point of a curve, smooth curves reflect it.
+    control = None
+    previous = ''
+    for command, arguments in segments:
+        upper = command.upper()
+        if upper == 'Z':
+            verbs.append(CLOSE)
+            x, y = start_x, start_y
+            previous = upper
+            continue
+
+        values = list(arguments)
+        if command != upper:
+            if upper == 'H':
+                values[0] += x
+            elif upper == 'V':
+                values[0] += y
+            else:
+                for index in coordinate_indexes(upper):
+                    values[index] += x
+                    values[index + 1] += y
+
+        if upper == 'M':
+            verbs.append(MOVE)
+            points.extend(values)
+            start_x, start_y = values
+        elif upper in 'LHV':
+            if upper == 'H':
+                values = [values[0], y]
+            elif upper == 'V':
+                values = [x, values[0]]
+            verbs.append(LINE)
+            points.extend(values)
+        elif upper in 'CS':
+            if upper == 'S':
+                if previous in ('C', 'S'):
+                    values = [2 * x - control[0], 2 * y - control[1]] + values
+                else:
+                    values = [x, y] + values
+            verbs.append(CUBIC)
+            points.extend(values)
+            control = values[2:4]
+        elif upper in 'QT':
+            if upper == 'T':
+                if previous in ('Q', 'T'):
+                    values = [2 * x - control[0], 2 * y - control[1]] + values
+                else:
+                    values = [x, y] + values
+            verbs.append(QUAD)
+            points.extend(values)
+            control = values[0:2]
+        else:
+            cubics = arc_cubics(x, y, *values)
+            if cubics is None:
+                verbs.append(LINE)
+                points.extend(values[5:7])
+            for cubic in cubics or ():
+                verbs.append(CUBIC)
+                points.extend(cubic)
+        x, y = points[-2], points[-1]
+        previous = upper
+    return verbs, points
+
+
+def arc_cubics(
+    x1: float,
+    y1: float,
+    rx: float,
+    ry: float,
+    angle: float,
+    large_arc: float,
+    sweep: float,
+    x2: float,
+    y2: float,
+) -> list[list[float]] | None:
+    """
+    Return the cubic curves of an elliptical arc with the control points and end
+    point of each curve. Return None if the arc is a line because a radius is 0.
+    """
+
+    if x1 == x2 and y1 == y2:
+        return []
+    rx, ry = abs(rx), abs(ry)
+    if rx == 0 or ry == 0:
+        return None
+
+    # The center parameterization of the arc (SVG 1.1, F.6.5)
+    phi = math.radians(angle % 360)
+    cos_phi, sin_phi = math.cos(phi), math.sin(phi)
+    dx, dy = (x1 - x2) / 2, (y1 - y2) / 2
+    x1p = cos_phi * dx + sin_phi * dy
+    y1p = -sin_phi * dx + cos_phi * dy
+    scale = x1p**2 / rx**2 + y1p**2 / ry**2
+    if scale > 1:
+        rx, ry = rx * math.sqrt(scale), ry * math.sqrt(scale)
+    numerator = rx**2 * ry**2 - rx**2 * y1p**2 - ry**2 * x1p**2
+    denominator = rx**2 * y1p**2 + ry**2 * x1p**2
+    factor = math.sqrt(max(0.0, numerator / denominator))
+    if bool(large_arc) == bool(sweep):
+        factor = -factor
+    cxp = factor * rx * y1p / ry
+    cyp = -factor * ry * x1p / rx
+    cx = cos_phi * cxp - sin_phi * cyp + (x1 + x2) / 2
+    cy = sin_phi * cxp + cos_phi * cyp + (y1 + y2) / 2
+
+    start = vector_angle(1, 0, (x1p - cxp) / rx, (y1p - cyp) / ry)
+    sweep_angle = vector_angle(
+        (x1p - cxp) / rx, (y1p - cyp) / ry, (-x1p - cxp) / rx, (-y1p - cyp) / ry
+    )
+    if not sweep and sweep_angle > 0:
+        sweep_angle -= 2 * math.pi
+    elif sweep and sweep_angle < 0:
+        sweep_angle += 2 * math.pi
+
+    # Curves of at most 90 degrees on the unit circle mapped onto the ellipse
+    count = max(1, math.ceil(abs(sweep_angle) / (math.pi / 2) - 1e-9))
+    delta = sweep_angle / count
+    k = 4 / 3 * math.tan(delta / 4)
+
+    def point(u: float, v: float) -> list[float]:
+        return [
+            cx + rx * u * cos_phi - ry * v * sin_phi,
+            cy + rx * u * sin_phi + ry * v * cos_phi,
+        ]
+
+    cubics = []
+    theta = start
+    for _ in range(count):
+        cos1, sin1 = math.cos(theta), math.sin(theta)
+        theta += delta
+        cos2, sin2 = math.cos(theta), math.sin(theta)
+        cubics.append(
+            point(cos1 - k * sin1, sin1 + k * cos1)
+            + point(cos2 + k * sin2, sin2 - k * cos2)
+            + point(cos2, sin2)
+        )
+    # End exactly on the end point of the arc.
+    cubics[-1][4:6] = [x2, y2]
+    return cubics
+
+
+def vector_angle(ux: float, uy: float, vx: float, vy: float) -> float:
+    """Return the signed angle from vector u to vector v."""
+
+    return math.atan2(ux * vy - uy * vx, ux * vx + uy * vy)
+
+
+def path_difference(data: bytes, compiled: bytes, sizes: Sequence[int]) -> int:
+    """Return the largest difference of the SVG and the compiled path at 'sizes'."""
+
+    path = decode_path(compiled)
+    black = QtGui.QColor('black')
+    return max(
+        image_difference(
+            render_svg(data, size), path.image(QtCore.QSize(size, size), black)
+        )
+        for size in sizes
+    )
+
+
+def compile_files(
+    files: Mapping[str, bytes], size: int, threshold: int = DIFF_THRESHOLD
+) -> tuple[dict[str, bytes], list[str]]:
+    """
+    Return the compiled paths of the SVG files by path with the '.path' suffix
+    and the files that could not be compiled. The compiled paths are rendered at
+    'size' and twice the size next to the SVG, a path that changes a channel by
+    more than 'threshold' is rejected. A QGuiApplication needs to exist.
+    """
+
+    paths = {}
+    rejected = []
+    for path, data in files.items():
+        try:
+            compiled = compile_svg(data)
+        except (ElementTree.ParseError, ValueError) as e:
+            logger.warning(f'Could not compile svg: {path}: {e}')
+            compiled = None
+        if compiled is not None:
+            difference = path_difference(data, compiled, (size, size * 2))
+            if difference > threshold:
+                logger.warning(f'Compiled path differs by {difference}: {path}')
+                compiled = None
+        if compiled is None:
+            rejected.append(path)
+            continue
+        paths[os.path.splitext(path)[0] + SUFFIX] = compiled
+    return paths, rejected
@@ -0,0 +1,322 @@
+from __future__ import annotations
+
+import concurrent.futures
+import hashlib
+import json
+import logging
+import os
+import struct
+from collections.abc import Sequence
+from typing import Tuple
+
+try:
+    from qtpy import QtCore, QtGui
+except ImportError:
+    try:
+        from PySide6 import QtCore, QtGui
+    except ImportError:
+        from PySide2 import QtCore, QtGui
+
+from qt_material_icons import IconAtlas, MaterialIcon, __version__
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_FILENAME = '.manifest.json'
+FORMATS = ('png', 'ico')
+
+# A group of outputs rendered by one worker: name, style, fill and color
+Group = Tuple[str, MaterialIcon.Style, bool, str]
+
+_application: QtGui.QGuiApplication | None = None
+
+
+def init_worker() -> None:
+    """Create the application of a worker process on the offscreen platform."""
+
+    global _application
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    if QtGui.QGuiApplication.instance() is None:
+        _application = QtGui.QGuiApplication([])
+
+
+def color_name(color: str) -> str:
+    """Return the color as hex digits used in filenames (e.g., ff000000)."""
+
+    qcolor = QtGui.QColor(color)
+    if not qcolor.isValid():
+        raise ValueError(f'Invalid color: {color}')
+    return qcolor.name(QtGui.QColor.NameFormat.HexArgb)[1:]
+
+
+def output_filename(
+    name: str,
+    style: MaterialIcon.Style,
+    fill: bool,
+    color: str,
+    size: int | None = None,
+    dpr: float = 1.0,
+    extension: str = 'png',
+) -> str:
+    """Return the filename of a rendered icon, an icon without size holds all sizes."""
+
+    filename = name
+    if fill:
+        filename += '_fill1'
+    filename += f'_{style.value}'
+    if size is not None:
+        filename += f'_{size}px'
+    filename += f'_{color_name(color)}'
+    if dpr != 1:
+        filename += f'@{dpr:g}x'
+    return f'{filename}.{extension}'
+
+
+def source_digest(sources: Sequence[bytes], *values: object) -> str:
+    """Return a hash of the svg data and the render values of an output."""
+
+    digest = hashlib.sha256(__version__.encode('utf-8'))
+    for data in sources:
+        digest.update(data)
+    digest.update(repr(values).encode('utf-8'))
+    return digest.hexdigest()
+
+
+def read_manifest(output: str) -> dict[str, str]:
+    """Return the hashes of the outputs by filename."""
+
+    try:
+        with open(os.path.join(output, MANIFEST_FILENAME), 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def write_manifest(output: str, manifest: dict[str, str]) -> None:
+    """Write the hashes of the outputs by filename."""
+
+    with open(os.path.join(output, MANIFEST_FILENAME), 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+
+
+def render_image(
+    name: str,
+    style: MaterialIcon.Style,
+    fill: bool,
+    size: int,
+    color: str,
+    dpr: float = 1.0,
+) -> QtGui.QImage:
+    """Return an image of the icon at 'size' scaled by 'dpr'."""
+
+    icon = MaterialIcon(name, style, fill, size)
+    pixmap = icon.pixmap(size, color=QtGui.QColor(color), dpr=dpr)
+    return pixmap.toImage()
+
+
+def png_data(image: QtGui.QImage) -> bytes:
+    """Return the image encoded as png."""
+
+    array = QtCore.QByteArray()
+    buffer = QtCore.QBuffer(array)
+    buffer.open(QtCore.QIODevice.OpenModeFlag.WriteOnly)
+    image.save(buffer, 'PNG')
+    buffer.close()
+    return array.data()
+
+
+def write_ico(path: str, images: Sequence[QtGui.QImage]) -> None:
+    """Write the images to an ico file with png encoded entries."""
+
+    # ICONDIR followed by one ICONDIRENTRY per image, 0 means 256 pixels.
+    entries = [png_data(image) for image in images]
+    offset = 6 + 16 * len(entries)
+    with open(path, 'wb') as f:
+        f.write(struct.pack('<HHH', 0, 1, len(entries)))
+        for image, data in zip(images, entries):
+            width = image.width() if image.width() < 256 else 0
+            height = image.height() if image.height() < 256 else 0
+            f.write(
+                struct.pack('<BBBBHHII', width, height, 0, 0, 1, 32, len(data), offset)
+            )
+            offset += len(data)
+        for data in entries:
+            f.write(data)
+
+
+def render_group(
+    group: Group,
+    sizes: Sequence[int],
+    dprs: Sequence[float],
+    formats: Sequence[str],
+    output: str,
+    filenames: Sequence[str],
+) -> list[str]:
+    """Render the outputs of a group that are listed in 'filenames'."""
+
+    name, style, fill, color = group
+    filenames = set(filenames)
+    written = []
+
+    ico_images = {}
+    for size in sizes:
+        for dpr in dprs:
+            image = render_image(name, style, fill, size, color, dpr)
+            ico_images.setdefault(image.width(), image)
+            if 'png' not in formats:
+                continue
+            filename = output_filename(name, style, fill, color, size, dpr)
+            if filename in filenames:
+                if not image.save(os.path.join(output, filename), 'PNG'):
+                    logger.error(f'Could not save image: {filename}')
+                    continue
+                written.append(filename)
+
+    if 'ico' in formats:
+        filename = output_filename(name, style, fill, color, extension='ico')
+        if filename in filenames:
+            images = [ico_images[width] for width in sorted(ico_images)]
+            write_ico(os.path.join(output, filename), images)
+            written.append(filename)
+
+    return written
+
+
+def read_sources(
+    name: str, style: MaterialIcon.Style, fill: bool, sizes: Sequence[int]
+) -> dict[int, bytes]:
+    """Return the svg data of the icon by size."""
+
+    sources = {}
+    for size in sizes:
+        data = MaterialIcon.resource_data(name, style, fill, size)
+        if data is None:
+            path = MaterialIcon.resource_path(name, style, fill, size)
+            logger.error(f'Could not read source resource: {path}')
+            continue
+        sources[size] = data
+    return sources
+
+
+def output_digests(
+    group: Group,
+    sources: dict[int, bytes],
+    dprs: Sequence[float],
+    formats: Sequence[str],
+) -> dict[str, str]:
+    """Return the hashes of the outputs of a group by filename."""
+
+    name, style, fill, color = group
+    digests = {}
+    if 'png' in formats:
+        for size, data in sources.items():
+            for dpr in dprs:
+                filename = output_filename(name, style, fill, color, size, dpr)
+                digests[filename] = source_digest((data,))
+    if 'ico' in formats and sources:
+        filename = output_filename(name, style, fill, color, extension='ico')
+        digests[filename] = source_digest(list(sources.values()), sorted(dprs))
+    return digests
+
+
+def render_icons(
+    output: str,
+    names: Sequence[str],
+    styles: Sequence[MaterialIcon.Style] = (MaterialIcon.Style.OUTLINED,),
+    fills: Sequence[bool] = (False,),
+    sizes: Sequence[int] = (24,),
+    colors: Sequence[str] = ('#000000',),
+    dprs: Sequence[float] = (1.0,),
+    formats: Sequence[str] = ('png',),
+    atlas: str | None = None,
+    force: bool = False,
+    jobs: int | None = None,
+) -> list[str]:
+    """
+    Render every combination of the icons to images in the output directory and
+    return the filenames that were written. The icons are rendered headless by
+    'jobs' processes, a single job renders in this process. Outputs created from
+    the same svg data are skipped.
+    """
+
+    os.makedirs(output, exist_ok=True)
+    manifest = {} if force else read_manifest(output)
+    digests = {}
+
+    # Hash the sources in this process, only changed groups are rendered.
+    groups = {}
+    atlas_sources = []
+    for style in styles:
+        for fill in fills:
+            for name in names:
+                sources = read_sources(name, style, fill, sizes)
+                atlas_sources.extend(sources.values())
+                for color in colors:
+                    group = (name, style, fill, color)
+                    group_digests = output_digests(group, sources, dprs, formats)
+                    digests.update(group_digests)
+                    changed = [
+                        filename
+                        for filename, digest in group_digests.items()
+                        if manifest.get(filename) != digest
+                        or not os.path.exists(os.path.join(output, filename))
+                    ]
+                    if changed:
+                        groups[group] = (sorted(sources), changed)
+
+    skipped = len(digests) - sum(len(changed) for _, changed in groups.values())
+    if skipped:
+        logger.info(f'Skipped {skipped} outputs that are up to date.')
+
+    written = []
+    if groups and jobs == 1:
+        # A single job renders in this process without starting a worker.
+        init_worker()
+        for group, (group_sizes, changed) in groups.items():
+            written.extend(
+                render_group(group, group_sizes, dprs, formats, output, changed)
+            )
+    elif groups:
+        with concurrent.futures.ProcessPoolExecutor(
+            max_workers=jobs, initializer=init_worker
+        ) as executor:
+            futures = [
+                executor.submit(
+                    render_group, group, group_sizes, dprs, formats, output, changed
+                )
+                for group, (group_sizes, changed) in groups.items()
+            ]
+            for future in futures:
+                written.extend(future.result())
+
+    if atlas:
+        specs = [
+            (name, style, fill, size, QtGui.QColor(color))
+            for style in styles
+            for fill in fills
+            for name in names
+            for size in sizes
+            for color in colors
+        ]
+        init_worker()
+        for dpr in dprs:
+            suffix = '' if dpr == 1 else f'@{dpr:g}x'
+            filename = f'{atlas}{suffix}.png'
+            digests[filename] = source_digest(atlas_sources, specs_key(specs), dpr)
+            path = os.path.join(output, filename)
+            if manifest.get(filename) == digests[filename] and os.path.exists(path):
+                continue
+            IconAtlas.build(specs, dpr=dpr).save(path)
+            written.append(filename)
+
+    for filename in written:
+        manifest[filename] = digests[filename]
+    write_manifest(output, manifest)
+
+    logger.info(f'Rendered {len(written)} outputs: {output}')
+    return written
+
+
+def specs_key(specs: Sequence[tuple]) -> list[tuple]:
+    """Return the specs of an atlas with the colors as rgba to hash them."""
+
+    return [spec[:4] + (spec[4].rgba(),) for spec in specs]
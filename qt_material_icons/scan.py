@@ -0,0 +1,471 @@
+from __future__ import annotations
+
+import ast
+import concurrent.futures
+import hashlib
+import json
+import logging
+import os
+from collections.abc import Iterable, Sequence
+from typing import Tuple
+
+try:
+    from qtpy import QtCore
+except ImportError:
+    try:
+        from PySide6 import QtCore
+    except ImportError:
+        from PySide2 import QtCore
+
+from qt_material_icons import MaterialIcon
+
+logger = logging.getLogger(__name__)
+
+# An icon used in the code: name, style, fill and size
+Variant = Tuple[str, MaterialIcon.Style, bool, int]
+
+CACHE_VERSION = 2
+STYLES = {style.name: style for style in MaterialIcon.Style}
+SIZES = (20, 24, 40, 48)
+ARGUMENTS = ('name', 'style', 'fill', 'size')
+DEFAULTS = (None, MaterialIcon.Style.OUTLINED, False, 20)
+EXCLUDED_DIRS = {'.git', '.hg', '.svn', '.tox', '.venv', 'venv', '__pycache__'}
+
+
+class Scope:
+    """
+    The names bound in a module, class or function and the tables of names among
+    them. 'parent' is the enclosing scope whose names are visible in the scope.
+    """
+
+    def __init__(
+        self,
+        parent: Scope | None = None,
+        owner: Scope | None = None,
+        is_class: bool = False,
+    ) -> None:
+        self.parent = parent
+        # The class scope of a method, attributes of self and cls are looked up there.
+        self.owner = owner
+        self.is_class = is_class
+        self.bindings: set[str] = set()
+        self.declared: set[str] = set()
+        self.tables: dict[str, list[str]] = {}
+        self.loops: dict[str, list[ast.AST]] = {}
+
+
+class Scanner(ast.NodeVisitor):
+    """
+    Collects the variants of MaterialIcon calls in a module. Names that aren't
+    literals are resolved from constants and tables of names in the scope of the
+    call, arguments that can't be resolved use all their values.
+    """
+
+    def __init__(self, filename: str = '<unknown>') -> None:
+        self.filename = filename
+        self.module = Scope()
+        self.scope = self.module
+        self.classes: dict[str, Scope] = {}
+        self.calls: list[tuple[ast.Call, Scope]] = []
+        self.unresolved: list[str] = []
+
+    def scan(self, tree: ast.AST) -> set[Variant]:
+        """Return the variants used in the module."""
+
+        self.visit(tree)
+        variants = set()
+        for call, scope in self.calls:
+            variants.update(self.call_variants(call, scope))
+        return variants
+
+    def visit_FunctionDef(self, node: ast.FunctionDef) -> None:
+        self.bind(node.name)
+        for child in node.decorator_list + node.args.defaults:
+            self.visit(child)
+        for child in node.args.kw_defaults:
+            if child is not None:
+                self.visit(child)
+        self.visit_function(node.args, node.body)
+
+    visit_AsyncFunctionDef = visit_FunctionDef
+
+    def visit_Lambda(self, node: ast.Lambda) -> None:
+        for child in node.args.defaults:
+            self.visit(child)
+        self.visit_function(node.args, [node.body])
+
+    def visit_function(self, arguments: ast.arguments, body: list[ast.AST]) -> None:
+        # Names in a class body are not visible in its methods.
+        parent = self.scope
+        owner = None
+        if parent.is_class:
+            owner = parent
+            parent = parent.parent
+        scope = Scope(parent, owner)
+        args = (
+            getattr(arguments, 'posonlyargs', [])
+            + arguments.args
+            + arguments.kwonlyargs
+            + [arguments.vararg, arguments.kwarg]
+        )
+        scope.bindings.update(arg.arg for arg in args if arg is not None)
+        self.visit_scope(scope, body)
+
+    def visit_ClassDef(self, node: ast.ClassDef) -> None:
+        self.bind(node.name)
+        for child in node.decorator_list + node.bases + node.keywords:
+            self.visit(child)
+        scope = Scope(self.scope, is_class=True)
+        self.classes[node.name] = scope
+        self.visit_scope(scope, node.body)
+
+    def visit_scope(self, scope: Scope, body: list[ast.AST]) -> None:
+        parent = self.scope
+        self.scope = scope
+        for child in body:
+            self.visit(child)
+        self.scope = parent
+
+    def visit_Global(self, node: ast.Global) -> None:
+        self.scope.declared.update(node.names)
+
+    def visit_Import(self, node: ast.Import) -> None:
+        for alias in node.names:
+            self.bind((alias.asname or alias.name).split('.')[0])
+
+    visit_ImportFrom = visit_Import
+
+    def visit_Assign(self, node: ast.Assign) -> None:
+        names = string_values(node.value)
+        for target in node.targets:
+            self.bind_target(target, names)
+        self.generic_visit(node)
+
+    def visit_AnnAssign(self, node: ast.AnnAssign) -> None:
+        names = string_values(node.value) if node.value else None
+        self.bind_target(node.target, names)
+        self.generic_visit(node)
+
+    def visit_AugAssign(self, node: ast.AugAssign) -> None:
+        self.bind_target(node.target, None)
+        self.generic_visit(node)
+
+    def visit_NamedExpr(self, node: ast.AST) -> None:
+        self.bind_target(node.target, string_values(node.value))
+        self.generic_visit(node)
+
+    def visit_For(self, node: ast.For) -> None:
+        self.add_loop(node.target, node.iter)
+        self.generic_visit(node)
+
+    visit_AsyncFor = visit_For
+
+    def visit_comprehension(self, node: ast.comprehension) -> None:
+        self.add_loop(node.target, node.iter)
+        self.generic_visit(node)
+
+    def visit_Call(self, node: ast.Call) -> None:
+        if is_icon_call(node):
+            self.calls.append((node, self.scope))
+        self.generic_visit(node)
+
+    def binding_scope(self, name: str) -> Scope:
+        return self.module if name in self.scope.declared else self.scope
+
+    def bind(self, name: str) -> None:
+        self.binding_scope(name).bindings.add(name)
+
+    def bind_target(self, target: ast.AST, names: list[str] | None) -> None:
+        if isinstance(target, ast.Name):
+            self.bind(target.id)
+            if names:
+                self.binding_scope(target.id).tables.setdefault(target.id, []).extend(
+                    names
+                )
+        elif isinstance(target, (ast.Tuple, ast.List)):
+            for element in target.elts:
+                self.bind_target(element, None)
+        elif isinstance(target, ast.Starred):
+            self.bind_target(target.value, None)
+
+    def add_loop(self, target: ast.AST, iterable: ast.AST) -> None:
+        names = string_values(iterable)
+        self.bind_target(target, names)
+        if not names and isinstance(target, ast.Name):
+            # The table may be assigned later, it is resolved with the calls.
+            scope = self.binding_scope(target.id)
+            scope.loops.setdefault(target.id, []).append(iterable)
+
+    def resolve_names(
+        self, node: ast.AST, scope: Scope, seen: set | None = None
+    ) -> list[str] | None:
+        if seen is None:
+            seen = set()
+        if isinstance(node, ast.Constant) and isinstance(node.value, str):
+            return [node.value]
+        if isinstance(node, ast.Subscript):
+            node = node.value
+        if isinstance(node, ast.Name):
+            return self.table(scope, node.id, seen)
+        if isinstance(node, ast.Attribute):
+            owner = self.attribute_scope(node.value, scope)
+            if owner is not None and node.attr in owner.bindings:
+                return self.table(owner, node.attr, seen)
+        return None
+
+    def attribute_scope(self, node: ast.AST, scope: Scope) -> Scope | None:
+        """Return the class scope of an attribute of a class, self or cls."""
+
+        if not isinstance(node, ast.Name):
+            return None
+        if node.id in ('self', 'cls'):
+            while scope is not None and scope.owner is None:
+                scope = scope.parent
+            return None if scope is None else scope.owner
+        return self.classes.get(node.id)
+
+    def table(self, scope: Scope | None, key: str, seen: set) -> list[str] | None:
+        # The names of the scope that binds the key, like Python resolves it.
+        while scope is not None and key not in scope.bindings:
+            scope = scope.parent
+        if scope is None or (scope, key) in seen:
+            return None
+        seen.add((scope, key))
+        names = list(scope.tables.get(key, ()))
+        for iterable in scope.loops.get(key, ()):
+            names.extend(self.resolve_names(iterable, scope, seen) or ())
+        return names or None
+
+    def call_variants(self, call: ast.Call, scope: Scope) -> set[Variant]:
+        arguments = dict(zip(ARGUMENTS, call.args))
+        for keyword in call.keywords:
+            if keyword.arg in ARGUMENTS:
+                arguments[keyword.arg] = keyword.value
+
+        location = f'{self.filename}:{call.lineno}'
+        if 'name' not in arguments:
+            return set()
+        names = self.resolve_names(arguments['name'], scope)
+        if names is None:
+            self.unresolved.append(location)
+            return set()
+
+        values = []
+        for argument, default in zip(ARGUMENTS[1:], DEFAULTS[1:]):
+            node = arguments.get(argument)
+            if node is None:
+                values.append((default,))
+                continue
+            value = resolve_argument(argument, node)
+            if value is None:
+                logger.debug(f'Using all values of {argument}: {location}')
+                value = all_values(argument)
+            values.append(value)
+
+        styles, fills, sizes = values
+        return {
+            (name, style, fill, size)
+            for name in names
+            for style in styles
+            for fill in fills
+            for size in sizes
+        }
+
+
+def is_icon_call(call: ast.Call) -> bool:
+    """Return whether the call creates a MaterialIcon or gets a shared one."""
+
+    func = call.func
+    if isinstance(func, ast.Attribute) and func.attr == 'get':
+        func = func.value
+    if isinstance(func, ast.Name):
+        return func.id == 'MaterialIcon'
+    if isinstance(func, ast.Attribute):
+        return func.attr == 'MaterialIcon'
+    return False
+
+
+def string_values(node: ast.AST) -> list[str] | None:
+    """Return the strings of a literal string, collection or dict values."""
+
+    if isinstance(node, ast.Constant) and isinstance(node.value, str):
+        return [node.value]
+    if isinstance(node, (ast.List, ast.Tuple, ast.Set)):
+        elements = node.elts
+    elif isinstance(node, ast.Dict):
+        elements = node.values
+    else:
+        return None
+    if elements and all(
+        isinstance(e, ast.Constant) and isinstance(e.value, str) for e in elements
+    ):
+        return [e.value for e in elements]
+    return None
+
+
+def resolve_argument(argument: str, node: ast.AST) -> tuple | None:
+    """Return the values of a style, fill or size argument if they are literal."""
+
+    if argument == 'style':
+        if isinstance(node, ast.Attribute) and node.attr in STYLES:
+            return (STYLES[node.attr],)
+    elif argument == 'fill':
+        if isinstance(node, ast.Constant) and node.value in (True, False):
+            return (bool(node.value),)
+    elif argument == 'size':
+        if isinstance(node, ast.Constant) and node.value in SIZES:
+            return (node.value,)
+    return None
+
+
+def all_values(argument: str) -> tuple:
+    """Return all values of a style, fill or size argument."""
+
+    if argument == 'style':
+        return tuple(MaterialIcon.Style)
+    if argument == 'fill':
+        return (False, True)
+    return SIZES
+
+
+def scan_source(
+    source: str | bytes, filename: str = '<unknown>'
+) -> tuple[set[Variant], list[str]]:
+    """Return the variants used in the source and the calls that can't be resolved."""
+
+    tree = ast.parse(source, filename)
+    scanner = Scanner(filename)
+    return scanner.scan(tree), scanner.unresolved
+
+
+def scan_file(path: str) -> tuple[list[tuple], list[str]]:
+    """Return the variants used in a file as plain values and the unresolved calls."""
+
+    with open(path, 'rb') as f:
+        source = f.read()
+    try:
+        variants, unresolved = scan_source(source, path)
+    except (SyntaxError, ValueError) as e:
+        logger.warning(f'Could not parse file: {path}: {e}')
+        return [], []
+    return [variant_values(v) for v in variants], unresolved
+
+
+def source_files(paths: Iterable[str], excluded: Iterable[str] = ()) -> list[str]:
+    """Return the python files in the paths, skipping the 'excluded' directories."""
+
+    excluded = {os.path.abspath(path) for path in excluded}
+    files = []
+    for path in paths:
+        if os.path.isfile(path):
+            files.append(path)
+            continue
+        for root, dirs, filenames in os.walk(path):
+            dirs[:] = sorted(
+                d
+                for d in dirs
+                if d not in EXCLUDED_DIRS
+                and os.path.abspath(os.path.join(root, d)) not in excluded
+            )
+            files.extend(
+                os.path.join(root, f) for f in sorted(filenames) if f.endswith('.py')
+            )
+    return files
+
+
+def file_hash(path: str) -> str:
+    """Return the hash of a file."""
+
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def read_cache(path: str | None) -> dict[str, dict]:
+    """Return the scanned files of the cache by path."""
+
+    if path is None:
+        return {}
+    try:
+        with open(path, 'r') as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if data.get('version') != CACHE_VERSION:
+        return {}
+    return data['files']
+
+
+def write_cache(path: str, files: dict[str, dict]) -> None:
+    """Write the scanned files to the cache."""
+
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump({'version': CACHE_VERSION, 'files': files}, f)
+
+
+def default_cache_path(output: str) -> str:
+    """
+    Return the path of the cache of the files scanned for 'output' in the cache
+    location of the user, so nothing is written into the scanned code.
+    """
+
+    location = QtCore.QStandardPaths.writableLocation(
+        QtCore.QStandardPaths.StandardLocation.GenericCacheLocation
+    )
+    digest = hashlib.sha256(os.path.abspath(output).encode('utf-8')).hexdigest()
+    return os.path.join(location, 'qt_material_icons', f'scan-{digest[:16]}.json')
+
+
+def scan_paths(
+    paths: Sequence[str],
+    cache_path: str | None = None,
+    jobs: int | None = None,
+    excluded: Sequence[str] = (),
+) -> set[Variant]:
+    """
+    Return the variants used in the python files of the paths. Files are parsed
+    by 'jobs' processes, files with the same hash as in the cache aren't parsed.
+    The 'excluded' directories, like an extracted package, are not scanned.
+    """
+
+    cache = read_cache(cache_path)
+    files = {}
+    pending = []
+    for path in source_files(paths, excluded):
+        key = os.path.abspath(path)
+        digest = file_hash(path)
+        entry = cache.get(key)
+        if entry is not None and entry['hash'] == digest:
+            files[key] = entry
+        else:
+            files[key] = {'hash': digest, 'variants': [], 'unresolved': []}
+            pending.append(key)
+
+    if pending:
+        logger.info(f'Scanning {len(pending)} of {len(files)} files.')
+        with concurrent.futures.ProcessPoolExecutor(max_workers=jobs) as executor:
+            for key, (variants, unresolved) in zip(
+                pending, executor.map(scan_file, pending, chunksize=16)
+            ):
+                files[key]['variants'] = variants
+                files[key]['unresolved'] = unresolved
+
+    if cache_path is not None:
+        write_cache(cache_path, files)
+
+    variants = set()
+    for entry in files.values():
+        for location in entry['unresolved']:
+            logger.warning(f'Could not resolve icon name: {location}')
+        variants.update(
+            (name, MaterialIcon.Style(style), fill, size)
+            for name, style, fill, size in entry['variants']
+        )
+    return variants
+
+
+def variant_values(variant: Variant) -> tuple[str, str, bool, int]:
+    """Return the variant with the style as a string."""
+
+    name, style, fill, size = variant
+    return name, style.value, fill, size
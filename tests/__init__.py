@@ -1,12 +1,13 @@
 import contextlib
 import sys
 
-import qt_themes
 from PySide6 import QtWidgets
 
 
 @contextlib.contextmanager
 def application() -> QtWidgets.QApplication:
+    import qt_themes
+
     theme = 'one_dark_two'
     if app := QtWidgets.QApplication.instance():
         qt_themes.set_theme(theme)
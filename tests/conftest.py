@@ -0,0 +1,79 @@
+import os
+
+import pytest
+
+# The tests render icons without a display.
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from PySide6 import QtGui, QtWidgets
+
+from qt_material_icons import MaterialIcon, _engine, _path
+from qt_material_icons._cache import image_cache, mask_cache, pixmap_cache
+
+
+@pytest.fixture(scope='session')
+def app() -> QtWidgets.QApplication:
+    return QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+
+
+@pytest.fixture
+def palette(app: QtWidgets.QApplication) -> QtGui.QPalette:
+    palette = QtGui.QGuiApplication.palette()
+    yield palette
+    QtGui.QGuiApplication.setPalette(palette)
+
+
+FIXTURE_DIR = os.path.join(os.path.dirname(__file__), 'fixtures')
+
+
+def read_fixtures(directory: str) -> dict[str, bytes]:
+    files = {}
+    root = os.path.join(FIXTURE_DIR, directory)
+    for dirpath, _, filenames in os.walk(root):
+        for filename in sorted(filenames):
+            path = os.path.join(dirpath, filename)
+            with open(path, 'rb') as f:
+                files[os.path.relpath(path, root).replace('\\', '/')] = f.read()
+    return dict(sorted(files.items()))
+
+
+@pytest.fixture(scope='session')
+def symbol_files() -> dict[str, bytes]:
+    """Material Symbols SVGs in the layout of the source repo."""
+
+    return read_fixtures(os.path.join('material-design-icons', 'symbols', 'web'))
+
+
+@pytest.fixture(scope='session')
+def arc_files() -> dict[str, bytes]:
+    """SVGs with elliptical arcs, Material Symbols don't use them."""
+
+    return read_fixtures('arcs')
+
+
+@pytest.fixture
+def sources(app, symbol_files: dict[str, bytes], monkeypatch) -> None:
+    """
+    Read the icons from the fixture instead of the resources of the package, the
+    caches start empty.
+    """
+
+    def resource_data(
+        name: str, style: MaterialIcon.Style, fill: bool, size: int
+    ) -> bytes | None:
+        suffix = '_fill1' if fill else ''
+        path = f'{name}/materialsymbols{style.value}/{name}{suffix}_{size}px.svg'
+        return symbol_files.get(path)
+
+    monkeypatch.setattr(MaterialIcon, 'resource_data', staticmethod(resource_data))
+    clear_caches()
+    yield
+    clear_caches()
+
+
+def clear_caches() -> None:
+    pixmap_cache.clear()
+    image_cache.clear()
+    mask_cache.clear()
+    _engine._renderers.clear()
+    _path.clear()
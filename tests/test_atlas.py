@@ -0,0 +1,91 @@
+import pytest
+from PySide6 import QtCore, QtGui
+
+from qt_material_icons import IconAtlas, MaterialIcon
+
+HOME = ('home', MaterialIcon.OUTLINED, False, 20, None)
+SEARCH = ('search', MaterialIcon.OUTLINED, True, 24, QtGui.QColor('red'))
+
+
+def alpha(image: QtGui.QImage, rect: QtCore.QRect) -> int:
+    return sum(
+        image.pixelColor(x, y).alpha()
+        for y in range(rect.top(), rect.bottom() + 1)
+        for x in range(rect.left(), rect.right() + 1)
+    )
+
+
+def opaque_colors(image: QtGui.QImage, rect: QtCore.QRect) -> set[str]:
+    return {
+        image.pixelColor(x, y).name()
+        for y in range(rect.top(), rect.bottom() + 1)
+        for x in range(rect.left(), rect.right() + 1)
+        if image.pixelColor(x, y).alpha() == 255
+    }
+
+
+def test_build(sources) -> None:
+    atlas = IconAtlas.build([HOME, SEARCH, HOME], dpr=1.5)
+    assert len(atlas) == 2
+    assert HOME in atlas
+    assert ('home', MaterialIcon.OUTLINED, False, 24, None) not in atlas
+    assert atlas.image().devicePixelRatio() == 1.5
+
+    # Icons are packed by height in device pixels.
+    assert atlas.rect(SEARCH) == QtCore.QRect(0, 0, 36, 36)
+    assert atlas.rect(HOME) == QtCore.QRect(36, 0, 30, 30)
+    image = atlas.image()
+    assert opaque_colors(image, atlas.rect(SEARCH)) == {'#ff0000'}
+    assert alpha(image, atlas.rect(HOME)) > 0
+
+    # Icons that don't fit start a new shelf.
+    atlas = IconAtlas.build([HOME, SEARCH], dpr=1.0, max_width=40)
+    assert atlas.rect(SEARCH) == QtCore.QRect(0, 0, 24, 24)
+    assert atlas.rect(HOME) == QtCore.QRect(0, 24, 20, 20)
+    assert atlas.image().size() == QtCore.QSize(24, 44)
+
+
+def test_save_load(sources, tmp_path) -> None:
+    atlas = IconAtlas.build([HOME, SEARCH], dpr=2.0)
+    path = str(tmp_path / 'icons.png')
+    atlas.save(path)
+    assert (tmp_path / 'icons.json').exists()
+
+    loaded = IconAtlas.load(path)
+    assert len(loaded) == len(atlas)
+    for spec in (HOME, SEARCH):
+        assert loaded.rect(spec) == atlas.rect(spec)
+    assert loaded.image().devicePixelRatio() == 2.0
+    assert loaded.image().convertToFormat(atlas.image().format()) == atlas.image()
+
+    with pytest.raises(OSError):
+        IconAtlas.load(str(tmp_path / 'missing.png'))
+
+
+def test_draw_many(sources) -> None:
+    atlas = IconAtlas.build([HOME, SEARCH], dpr=2.0)
+    targets = [(QtCore.QPoint(4, 4), HOME), (QtCore.QRect(32, 0, 24, 24), SEARCH)]
+
+    images = []
+    for draw in ('draw_many', 'draw'):
+        image = QtGui.QImage(128, 64, QtGui.QImage.Format.Format_ARGB32_Premultiplied)
+        image.setDevicePixelRatio(2.0)
+        image.fill(QtCore.Qt.GlobalColor.transparent)
+        painter = QtGui.QPainter(image)
+        if draw == 'draw_many':
+            atlas.draw_many(painter, targets)
+        else:
+            for target, spec in targets:
+                atlas.draw(painter, target, spec)
+        painter.end()
+        images.append(image)
+    image = images[0]
+    # The fragments are drawn like single icons.
+    assert image == images[1]
+
+    # Only the targets are covered, at the pixel ratio of the device.
+    covered = alpha(image, QtCore.QRect(8, 8, 40, 40))
+    covered += alpha(image, QtCore.QRect(64, 0, 48, 48))
+    assert covered > 0
+    assert covered == alpha(image, image.rect())
+    assert opaque_colors(image, QtCore.QRect(64, 0, 48, 48)) == {'#ff0000'}
@@ -0,0 +1,60 @@
+import gc
+
+from PySide6 import QtGui
+
+from qt_material_icons import MaterialIcon, _icon
+from qt_material_icons._cache import IconRegistry, ImageCache, PixmapCache
+from qt_material_icons._mask import IMAGE_FORMAT, MASK_FORMAT
+
+
+def test_masks_share_budget(app) -> None:
+    masks = ImageCache()
+    cache = PixmapCache(64 * 64 * 4 * 4, masks)
+    assert masks.bytes == 0
+
+    for index in range(4):
+        masks.insert(index, QtGui.QImage(64, 64, MASK_FORMAT))
+        cache.insert(index, QtGui.QPixmap.fromImage(QtGui.QImage(64, 64, IMAGE_FORMAT)))
+    # Four masks use a whole pixmap of the budget.
+    assert len(masks) == 4
+    assert len(cache) == 3
+    assert cache.bytes + masks.bytes <= cache.max_bytes
+
+
+def test_mask_budget(app) -> None:
+    masks = ImageCache()
+    cache = PixmapCache(64 * 64 * 4, masks)
+    for index in range(4):
+        masks.insert(index, QtGui.QImage(64, 64, MASK_FORMAT))
+    assert len(masks) == 1
+
+    cache.set_max_bytes(64 * 64 * 8)
+    masks.insert(4, QtGui.QImage(64, 64, MASK_FORMAT))
+    assert len(masks) == 2
+
+
+def test_icon_registry(sources, monkeypatch) -> None:
+    registry = IconRegistry()
+    monkeypatch.setattr(_icon, 'icon_registry', registry)
+
+    icon = MaterialIcon.get('home')
+    assert MaterialIcon.get('home') is icon
+    assert MaterialIcon.get('home', fill=True) is not icon
+    red = MaterialIcon.get('home', color=QtGui.QColor('red'))
+    assert red is not icon
+    assert MaterialIcon.get('home', color=QtGui.QColor(255, 0, 0)) is red
+    assert red.pixmap(20, dpr=1.0).toImage().pixelColor(10, 4).name() == '#ff0000'
+    assert registry.hits == 2
+    assert registry.misses == 3
+    assert registry.bytes_saved > 0
+
+    # Icons that are no longer referenced are dropped.
+    assert len(registry) == 2
+    del red
+    gc.collect()
+    assert len(registry) == 1
+    del icon
+    gc.collect()
+    assert len(registry) == 0
+    MaterialIcon.get('home')
+    assert registry.misses == 4
@@ -0,0 +1,129 @@
+import json
+import os
+
+import pytest
+
+import compile_icons
+from qt_material_icons._catalog import Catalog, variant_bit
+
+STYLES = ['outlined', 'rounded', 'sharp']
+SIZES = [20, 24, 40, 48]
+
+
+def mask(*variants: tuple[str, bool, int]) -> int:
+    bits = 0
+    for style, fill, size in variants:
+        bits |= variant_bit(STYLES, SIZES, style, fill, size)
+    return bits
+
+
+@pytest.fixture
+def catalog() -> Catalog:
+    icons = {
+        'home': (mask(('outlined', False, 20), ('sharp', True, 48)), 'house place'),
+        'home_app_logo': (mask(('rounded', False, 24)), ''),
+        'search': (mask(('outlined', False, 20)), 'find magnify'),
+        'add': (mask(('outlined', True, 20)), 'plus new'),
+    }
+    return Catalog(icons, STYLES, SIZES)
+
+
+def test_variant_bit() -> None:
+    bits = {
+        variant_bit(STYLES, SIZES, style, fill, size)
+        for style in STYLES
+        for size in SIZES
+        for fill in (False, True)
+    }
+    assert len(bits) == len(STYLES) * len(SIZES) * 2
+    assert min(bits) == 1
+    assert max(bits) == 1 << (len(bits) - 1)
+    assert variant_bit(STYLES, SIZES, 'rounded', True, 24) == 1 << 11
+    with pytest.raises(ValueError):
+        variant_bit(STYLES, SIZES, 'filled', False, 20)
+
+
+def test_catalog_variants(catalog: Catalog) -> None:
+    assert len(catalog) == 4
+    assert list(catalog) == ['add', 'home', 'home_app_logo', 'search']
+    assert 'home' in catalog
+    assert 'house' not in catalog
+    assert catalog.variants('home') == [('outlined', False, 20), ('sharp', True, 48)]
+    assert catalog.exists('home', 'sharp', True, 48)
+    assert not catalog.exists('home', 'sharp', False, 48)
+    assert not catalog.exists('home', 'outlined', False, 24)
+    # Unknown names, styles and sizes don't exist.
+    assert not catalog.exists('house', 'outlined', False, 20)
+    assert not catalog.exists('home', 'filled', False, 20)
+    assert not catalog.exists('home', 'outlined', False, 32)
+    assert catalog.tags('search') == ['find', 'magnify']
+    assert catalog.tags('home_app_logo') == []
+    with pytest.raises(KeyError):
+        catalog.variants('house')
+
+
+def test_catalog_search(catalog: Catalog) -> None:
+    assert catalog.prefix('home') == ['home', 'home_app_logo']
+    assert catalog.prefix('hom') == ['home', 'home_app_logo']
+    assert catalog.prefix('x') == []
+    assert catalog.prefix('') == list(catalog)
+
+    # Prefix matches come first, then names and tags containing the query.
+    assert catalog.search('app') == ['home_app_logo']
+    # Spaces match underscores, close matches come last.
+    assert catalog.search('Home App') == ['home_app_logo', 'home']
+    assert catalog.search('magnify') == ['search']
+    assert catalog.search('new', limit=2) == ['add']
+    assert catalog.search('e', limit=2) == ['add', 'home']
+    assert catalog.search('serch') == ['search']
+    assert catalog.search('xyz') == []
+    assert catalog.validate(['home', 'serch', 'xyz']) == {
+        'serch': ['search'],
+        'xyz': [],
+    }
+
+
+def test_catalog_save_load(catalog: Catalog, tmp_path) -> None:
+    path = str(tmp_path / 'catalog.json')
+    catalog.save(path)
+    loaded = Catalog.load(path)
+    assert list(loaded) == list(catalog)
+    for name in catalog:
+        assert loaded.variants(name) == catalog.variants(name)
+        assert loaded.tags(name) == catalog.tags(name)
+
+    with pytest.raises(OSError):
+        Catalog.load(str(tmp_path / 'missing.json'))
+    with open(path, 'w') as f:
+        f.write('{"icons": {}')
+    with pytest.raises(ValueError):
+        Catalog.load(path)
+    with open(path, 'w') as f:
+        json.dump({'icons': {}}, f)
+    with pytest.raises(KeyError):
+        Catalog.load(path)
+
+
+def test_create_catalog(tmp_path, monkeypatch) -> None:
+    source_dir = os.path.join(
+        os.path.dirname(__file__), 'fixtures', 'material-design-icons', 'symbols', 'web'
+    )
+    monkeypatch.setattr(compile_icons, 'SOURCE_DIR', source_dir)
+    monkeypatch.setattr(compile_icons, 'RESOURCE_DIR', str(tmp_path))
+    monkeypatch.setattr(compile_icons, 'BUILD_DIR', str(tmp_path))
+    monkeypatch.setattr(compile_icons, 'TAGS_PATH', str(tmp_path / 'tags.json'))
+    monkeypatch.setattr(compile_icons, 'fetch_tags', lambda: {'home': 'house'})
+
+    compile_icons.create_catalog(compile_icons.scan_sources())
+    catalog = Catalog.load(str(tmp_path / 'catalog.json'))
+    assert list(catalog) == ['add', 'circle', 'home', 'search']
+    assert catalog.tags('home') == ['house']
+    # The fixture has the outlined and rounded styles at 20 and 24.
+    assert catalog.variants('add') == [
+        (style, fill, size)
+        for style in ('outlined', 'rounded')
+        for size in (20, 24)
+        for fill in (False, True)
+    ]
+    assert not catalog.exists('add', 'sharp', False, 20)
+    assert not catalog.exists('add', 'outlined', False, 40)
@@ -0,0 +1,130 @@
+import json
+import os
+
+import pytest
+
+import compile_icons
+
+SOURCE_DIR = os.path.join(
+    os.path.dirname(__file__), 'fixtures', 'material-design-icons', 'symbols', 'web'
+)
+
+
+@pytest.fixture
+def build(tmp_path, monkeypatch) -> list[int]:
+    """Build into a temporary directory and count the fetches of the tags."""
+
+    fetches = []
+
+    def fetch_tags() -> dict[str, str]:
+        fetches.append(1)
+        return {'home': 'house'}
+
+    monkeypatch.setattr(compile_icons, 'SOURCE_DIR', SOURCE_DIR)
+    monkeypatch.setattr(compile_icons, 'FONT_DIR', str(tmp_path / 'fonts'))
+    monkeypatch.setattr(compile_icons, 'RESOURCE_DIR', str(tmp_path / 'resources'))
+    monkeypatch.setattr(compile_icons, 'BUILD_DIR', str(tmp_path / 'build'))
+    monkeypatch.setattr(compile_icons, 'TAGS_PATH', str(tmp_path / 'build/tags.json'))
+    manifest_path = str(tmp_path / 'build/manifest.json')
+    monkeypatch.setattr(compile_icons, 'MANIFEST_PATH', manifest_path)
+    monkeypatch.setattr(compile_icons, 'fetch_tags', fetch_tags)
+    os.makedirs(tmp_path / 'resources')
+    return fetches
+
+
+def test_read_tags(build: list[int]) -> None:
+    assert compile_icons.read_tags() == {}
+    assert compile_icons.read_tags(fetch=True) == {'home': 'house'}
+    assert compile_icons.read_tags() == {'home': 'house'}
+    assert len(build) == 1
+
+
+def test_read_tags_failed(build: list[int], monkeypatch) -> None:
+    compile_icons.read_tags(fetch=True)
+    # The cached tags are kept if they can't be fetched.
+    monkeypatch.setattr(compile_icons, 'fetch_tags', lambda: {})
+    assert compile_icons.read_tags(fetch=True) == {'home': 'house'}
+
+
+def test_create_catalog_unchanged(build: list[int]) -> None:
+    sources = compile_icons.scan_sources()
+    catalog_path = os.path.join(compile_icons.RESOURCE_DIR, 'catalog.json')
+
+    # The tags are fetched once when the catalog is created.
+    digest = compile_icons.create_catalog(sources)
+    assert len(build) == 1
+    modified = os.path.getmtime(catalog_path)
+    assert compile_icons.create_catalog(sources, digest) == digest
+    assert os.path.getmtime(catalog_path) == modified
+    assert len(build) == 1
+
+    # Changed sources, a missing catalog and 'force' create it again.
+    sources['add']['outlined'].discard('add_fill1_20px.svg')
+    changed = compile_icons.create_catalog(sources, digest)
+    assert changed != digest
+    os.remove(catalog_path)
+    assert compile_icons.create_catalog(sources, changed) == changed
+    assert os.path.exists(catalog_path)
+    os.utime(catalog_path, (0, 0))
+    compile_icons.create_catalog(sources, changed, force=True)
+    assert os.path.getmtime(catalog_path) != 0
+    assert len(build) == 1
+
+    compile_icons.create_catalog(sources, changed, fetch=True)
+    assert len(build) == 2
+
+
+def test_copy_fonts_unchanged(build: list[int], tmp_path) -> None:
+    os.makedirs(compile_icons.FONT_DIR)
+    source = os.path.join(
+        compile_icons.FONT_DIR, 'MaterialSymbolsOutlined[FILL,GRAD,opsz,wght]'
+    )
+    for extension in ('.ttf', '.codepoints'):
+        with open(source + extension, 'w') as f:
+            f.write(extension)
+    target = os.path.join(compile_icons.RESOURCE_DIR, 'MaterialSymbolsOutlined.ttf')
+
+    digest = compile_icons.copy_fonts()
+    assert os.path.exists(target)
+    os.utime(target, (0, 0))
+    assert compile_icons.copy_fonts(digest) == digest
+    assert os.path.getmtime(target) == 0
+
+    with open(source + '.ttf', 'w') as f:
+        f.write('changed')
+    assert compile_icons.copy_fonts(digest) != digest
+    with open(target) as f:
+        assert f.read() == 'changed'
+
+
+def test_main_manifest(build: list[int], monkeypatch) -> None:
+    calls = []
+    monkeypatch.setattr(compile_icons, 'clone_repo', lambda pull: calls.append(pull))
+    monkeypatch.setattr(compile_icons, 'create_resources', lambda *a, **k: None)
+    monkeypatch.setattr('sys.argv', ['compile_icons.py', '--no-pull'])
+    os.makedirs(compile_icons.BUILD_DIR)
+    compile_icons.main()
+    compile_icons.main()
+
+    assert calls == [False, False]
+    assert len(build) == 1
+    with open(compile_icons.MANIFEST_PATH) as f:
+        manifest = json.load(f)
+    assert set(manifest) == {'catalog', 'fonts'}
+
+
+def test_build_resources_options(build: list[int], monkeypatch) -> None:
+    style = compile_icons.MaterialIcon.Style.ROUNDED
+    files = compile_icons.collect_files(compile_icons.scan_sources(), style, 20)
+    digest, report = compile_icons.build_resources(style, 20, files, None)
+    assert report is not None
+    assert compile_icons.build_resources(style, 20, files, digest) == (digest, None)
+
+    # Resources are optimized again when the options of the optimization change.
+    digests = {digest}
+    for name, value in (('DIFF_THRESHOLD', 4), ('OPTIMIZE_VERSION', 0)):
+        monkeypatch.setattr(compile_icons, name, value)
+        digest, report = compile_icons.build_resources(style, 20, files, digest)
+        assert report is not None
+        assert digest not in digests
+        digests.add(digest)
@@ -0,0 +1,61 @@
+import logging
+import os
+
+from PySide6 import QtCore
+
+import compile_icons
+from qt_material_icons import MaterialIcon, _icon
+from qt_material_icons._pack import IconPack
+
+FIXTURE_DIR = os.path.join(os.path.dirname(__file__), 'fixtures')
+STYLE = MaterialIcon.Style.OUTLINED
+
+
+def read(path: str) -> bytes | None:
+    qfile = QtCore.QFile(path)
+    if not qfile.open(QtCore.QIODevice.OpenModeFlag.ReadOnly):
+        return None
+    data = qfile.readAll().data()
+    qfile.close()
+    return data
+
+
+def test_build_shares_duplicates(app, tmp_path, monkeypatch, caplog) -> None:
+    # The sources are read relative to the root like a build of the source repo.
+    monkeypatch.chdir(FIXTURE_DIR)
+    monkeypatch.setattr(compile_icons, 'RESOURCE_DIR', str(tmp_path))
+    files = compile_icons.collect_files(compile_icons.scan_sources(), STYLE, 24)
+    assert len(files) == 8
+
+    with caplog.at_level(logging.INFO):
+        result = compile_icons.build_resources(STYLE, 24, files, None)
+    assert result is not None
+    # Only the fill variants of home differ in the outlined style.
+    assert 'Shared the data of 3 duplicate files' in caplog.text
+
+    pack = IconPack(str(tmp_path / 'icons_outlined_24.pack'))
+    try:
+        # Entries of equal blobs point at the same data.
+        for name in ('add', 'circle', 'search'):
+            for suffix in ('.svg', '.path'):
+                entry = pack._find(f'{name}_24px{suffix}')
+                shared = pack._find(f'{name}_fill1_24px{suffix}')
+                assert shared[2:] == entry[2:]
+        home = pack._find('home_24px.svg')
+        assert pack._find('home_fill1_24px.svg')[2] != home[2]
+        icons = {name: pack.data(name) for name in pack if name.endswith('.svg')}
+    finally:
+        pack.close()
+
+    # Every icon reads its own data from the shared resource.
+    namespace = {}
+    with open(tmp_path / 'icons_outlined_24.py') as f:
+        exec(f.read(), namespace)
+    try:
+        for filename, data in icons.items():
+            name, fill, _ = _icon.FILENAME_PATTERN.match(filename).groups()
+            path = MaterialIcon.resource_path(name, STYLE, bool(fill), 24)
+            assert read(path) == data, path
+    finally:
+        namespace['qCleanupResources']()
+    assert len(set(icons.values())) == 5
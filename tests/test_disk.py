@@ -0,0 +1,69 @@
+import pytest
+from PySide6 import QtCore, QtGui
+
+from qt_material_icons import SVGIcon, _engine
+from qt_material_icons._cache import image_cache, mask_cache, pixmap_cache
+from qt_material_icons._disk import DiskCache, disk_cache
+
+SQUARE = b'<svg viewBox="0 0 4 4"><path d="M0 0h4v4H0z"/></svg>'
+HALF = b'<svg viewBox="0 0 4 4"><path d="M0 0h2v4H0z"/></svg>'
+
+
+@pytest.fixture
+def cache(app, tmp_path):
+    disk_cache.enable(str(tmp_path))
+    yield disk_cache
+    disk_cache.disable()
+
+
+def clear_memory() -> None:
+    pixmap_cache.clear()
+    image_cache.clear()
+    mask_cache.clear()
+    _engine._renderers.clear()
+
+
+def test_disk_cache(app, tmp_path) -> None:
+    cache = DiskCache()
+    cache.enable(str(tmp_path), max_bytes=1024 * 1024)
+    image = QtGui.QImage(8, 8, QtGui.QImage.Format.Format_ARGB32_Premultiplied)
+    image.fill(QtGui.QColor('red'))
+    image.setDevicePixelRatio(2.0)
+    cache.insert(('icon', 8), image)
+
+    cached = cache.get(('icon', 8))
+    assert cached == image
+    assert cached.devicePixelRatio() == 2.0
+    assert cache.get(('icon', 16)) is None
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    # Images that don't fit the budget are evicted.
+    cache.set_max_bytes(0)
+    assert cache.get(('icon', 8)) is None
+
+
+def test_changed_file(cache, tmp_path) -> None:
+    path = str(tmp_path / 'icon.svg')
+    color = QtGui.QColor('red')
+    pixels = []
+    for data in (SQUARE, HALF, SQUARE):
+        with open(path, 'wb') as f:
+            f.write(data)
+        # Every run starts with empty memory caches.
+        clear_memory()
+        image = SVGIcon(path).pixmap(QtCore.QSize(8, 8), color=color).toImage()
+        pixels.append(image.pixelColor(6, 4).alpha())
+    assert pixels == [255, 0, 255]
+    # The first content is read from the disk the second time.
+    assert cache.hits == 1
+
+
+def test_changed_data(cache) -> None:
+    color = QtGui.QColor('red')
+    pixels = []
+    for data in (SQUARE, HALF):
+        clear_memory()
+        icon = SVGIcon(':/icon.svg', data=data)
+        image = icon.pixmap(QtCore.QSize(8, 8), color=color).toImage()
+        pixels.append(image.pixelColor(6, 4).alpha())
+    assert pixels == [255, 0]
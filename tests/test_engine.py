@@ -0,0 +1,136 @@
+import collections
+import xml.etree.ElementTree as ElementTree
+
+import pytest
+from PySide6 import QtCore, QtGui
+
+from qt_material_icons import MaterialIcon, _engine
+from qt_material_icons._cache import mask_cache, pixmap_cache
+
+ColorRole = QtGui.QPalette.ColorRole
+
+
+def test_palette_generation(palette: QtGui.QPalette) -> None:
+    generation = _engine.palette_generation()
+    assert _engine.palette_generation() == generation
+
+    red = QtGui.QPalette(QtGui.QColor('red'))
+    QtGui.QGuiApplication.setPalette(red)
+    assert _engine.palette_generation() == generation + 1
+    QtGui.QGuiApplication.setPalette(red)
+    assert _engine.palette_generation() == generation + 1
+
+
+def test_color_follows_palette(palette: QtGui.QPalette) -> None:
+    engine = _engine.SVGIconEngine(':/icon.svg')
+    engine.set_color(ColorRole.WindowText)
+
+    for name in ('red', 'blue'):
+        changed = QtGui.QPalette(palette)
+        changed.setColor(ColorRole.WindowText, QtGui.QColor(name))
+        QtGui.QGuiApplication.setPalette(changed)
+        assert engine.color() == QtGui.QColor(name)
+
+
+@pytest.mark.parametrize(
+    'svg',
+    (
+        b'<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 2 2">',
+        b'<svg fill="none" viewBox="0 0 2 2" fill-opacity=\'0.5\'>',
+        b'<?xml version="1.0"?>\n<svg\n  fill = "#000"\n  data-x="a>b">',
+    ),
+)
+def test_fill_svg(svg: bytes) -> None:
+    data = svg + b'<path fill-rule="evenodd" d="M0 0h1v1z"/></svg>'
+    filled = _engine.fill_svg(data, QtGui.QColor(255, 0, 0, 128))
+    root = ElementTree.fromstring(filled)
+    assert root.get('fill') == '#ff0000'
+    assert root.get('fill-opacity') == '0.502'
+    assert root[0].get('fill-rule') == 'evenodd'
+    assert _engine.fill_svg(b'<path/>', QtGui.QColor('red')) == b'<path/>'
+
+
+def test_svg_renderer_per_color(app, monkeypatch) -> None:
+    monkeypatch.setattr(_engine, '_renderers', collections.OrderedDict())
+    data = b'<svg viewBox="0 0 2 2"><path d="M0 0h2v2H0z"/></svg>'
+    size = QtCore.QSize(4, 4)
+    for name in ('red', 'blue', 'red'):
+        color = QtGui.QColor(name)
+        pixmap = _engine.render_svg(':/square.svg', size, color, data)
+        assert pixmap.toImage().pixelColor(2, 2) == color
+        image = _engine.render_data(':/square.svg', data, size, color)
+        assert image.pixelColor(2, 2) == color
+    # The SVG is parsed once per color with the color as its fill.
+    assert len(_engine._renderers) == 2
+
+    # Other data of the same path is parsed again.
+    half = b'<svg viewBox="0 0 2 2"><path d="M0 0h1v2H0z"/></svg>'
+    pixmap = _engine.render_svg(':/square.svg', size, QtGui.QColor('red'), half)
+    assert pixmap.toImage().pixelColor(3, 2).alpha() == 0
+    assert len(_engine._renderers) == 3
+    # Missing files don't reuse the renderer of the data.
+    pixmap = _engine.render_svg(':/square.svg', size, QtGui.QColor('red'))
+    assert pixmap.toImage().pixelColor(0, 2).alpha() == 0
+
+
+def test_lazy_rendering(sources, monkeypatch) -> None:
+    monkeypatch.setattr(_engine.SVGIconEngine, 'rendering', _engine.Rendering.MASK)
+    rendered = []
+    svg_mask = _engine.svg_mask
+
+    def counted(path: str, data: bytes, size: QtCore.QSize, *args) -> QtGui.QImage:
+        rendered.append(size.width())
+        return svg_mask(path, data, size, *args)
+
+    monkeypatch.setattr(_engine, 'svg_mask', counted)
+
+    # Creating icons doesn't rasterize anything.
+    icons = [MaterialIcon(name, size=24) for name in ('home', 'search')]
+    assert not rendered
+    assert len(pixmap_cache) == 0
+    assert len(mask_cache) == 0
+
+    # Only the painted size and mode is rasterized, once.
+    image = QtGui.QImage(32, 32, QtGui.QImage.Format.Format_ARGB32_Premultiplied)
+    painter = QtGui.QPainter(image)
+    for _ in range(2):
+        icons[0].paint(painter, QtCore.QRect(0, 0, 16, 16))
+    painter.end()
+    assert rendered == [16]
+    assert len(pixmap_cache) == 1
+
+    # Other modes are tinted from the same mask.
+    icons[0].pixmap(16, QtGui.QIcon.Mode.Disabled, dpr=1.0)
+    assert rendered == [16]
+    assert len(pixmap_cache) == 2
+
+
+def test_device_pixel_ratio(sources) -> None:
+    size = QtCore.QSize(21, 21)
+    assert _engine.physical_size(size, 1.5) == QtCore.QSize(32, 32)
+    assert _engine.physical_size(QtCore.QSize(20, 10), 1.25) == QtCore.QSize(25, 13)
+
+    icon = MaterialIcon('home', size=24)
+    color = icon._engine.color()
+    pixmaps = {}
+    for dpr in (1.0, 1.5, 2.0):
+        pixmap = icon.pixmap(size, dpr=dpr)
+        # Fractional sizes are rounded up to whole device pixels.
+        assert pixmap.size() == _engine.physical_size(size, dpr)
+        assert pixmap.devicePixelRatio() == dpr
+        path = icon._engine.path()
+        assert _engine.pixmap_key(path, size, dpr, color) in pixmap_cache
+        pixmaps[dpr] = pixmap
+
+    # Every ratio is cached on its own, so screens reuse their pixmaps.
+    assert len(pixmap_cache) == 3
+    for dpr, pixmap in pixmaps.items():
+        assert icon.pixmap(size, dpr=dpr).cacheKey() == pixmap.cacheKey()
+
+    # Painting uses the ratio of the device.
+    image = QtGui.QImage(32, 32, QtGui.QImage.Format.Format_ARGB32_Premultiplied)
+    image.setDevicePixelRatio(1.5)
+    painter = QtGui.QPainter(image)
+    icon.paint(painter, QtCore.QRect(QtCore.QPoint(0, 0), size))
+    painter.end()
+    assert len(pixmap_cache) == 3
@@ -0,0 +1,151 @@
+import concurrent.futures
+import json
+import logging
+import os
+
+import pytest
+
+from qt_material_icons import MaterialIcon, _icon, extract
+
+Style = MaterialIcon.Style
+
+
+@pytest.mark.parametrize(
+    ('spec', 'variant'),
+    (
+        ('home', ('home', Style.OUTLINED, False, 20)),
+        ('home:rounded:fill:24', ('home', Style.ROUNDED, True, 24)),
+        (' home:48:FILL1:sharp ', ('home', Style.SHARP, True, 48)),
+        ('home:fill:fill0', ('home', Style.OUTLINED, False, 20)),
+    ),
+)
+def test_parse_spec(spec: str, variant: tuple) -> None:
+    assert extract.parse_spec(spec) == variant
+
+
+@pytest.mark.parametrize(
+    'spec', ('', ':rounded', 'home:filled', 'home:32', 'home::24', 'home:fill2')
+)
+def test_parse_spec_invalid(spec: str) -> None:
+    with pytest.raises(ValueError, match='Invalid icon spec'):
+        extract.parse_spec(spec)
+
+
+def test_read_spec_file(tmp_path) -> None:
+    path = tmp_path / 'icons.txt'
+    path.write_text('# icons\nhome:fill\n\n  search:24  # toolbar\n')
+    assert extract.read_spec_file(str(path)) == [
+        ('home', Style.OUTLINED, True, 20),
+        ('search', Style.OUTLINED, False, 24),
+    ]
+    path.write_text('home\nhome:huge\n')
+    with pytest.raises(ValueError):
+        extract.read_spec_file(str(path))
+    with pytest.raises(OSError):
+        extract.read_spec_file(str(tmp_path / 'missing.txt'))
+
+
+def test_extract_fills(sources, tmp_path) -> None:
+    output = str(tmp_path)
+    fills = {'home': {True}, 'add': {False, True}, 'search': {False}}
+    extract.extract_icons(output, sorted(fills), Style.ROUNDED, 24, fills=fills)
+
+    resource_path = os.path.join(
+        extract.package_dir(output), 'resources', 'icons_rounded_24.py'
+    )
+    with open(extract.manifest_path(resource_path)) as f:
+        assert json.load(f) == [
+            'add_24px.svg',
+            'add_fill1_24px.svg',
+            'home_fill1_24px.svg',
+            'search_24px.svg',
+        ]
+    assert extract.read_source_hash(resource_path)
+
+
+def test_extract_manifest(sources, tmp_path, caplog) -> None:
+    output = str(tmp_path)
+    resource_path = os.path.join(
+        extract.package_dir(output), 'resources', 'icons_outlined_20.py'
+    )
+    manifest = extract.manifest_path(resource_path)
+    assert manifest == resource_path[:-3] + '.json'
+
+    # Missing icons are logged and left out of the resource and the manifest.
+    with caplog.at_level(logging.ERROR, logger=extract.__name__):
+        extract.extract_icons(output, ['home', 'missing'])
+    assert 'missing_20px.svg' in caplog.text
+    with open(manifest) as f:
+        assert json.load(f) == ['home_20px.svg', 'home_fill1_20px.svg']
+
+    # An up-to-date resource is skipped but its manifest is written again.
+    modified = os.path.getmtime(resource_path)
+    os.remove(manifest)
+    with caplog.at_level(logging.INFO, logger=extract.__name__):
+        extract.extract_icons(output, ['home', 'missing'])
+    assert 'Resource file is up to date' in caplog.text
+    assert os.path.getmtime(resource_path) == modified
+    assert os.path.exists(manifest)
+
+    # Nothing is written without icons.
+    caplog.clear()
+    with caplog.at_level(logging.ERROR, logger=extract.__name__):
+        extract.extract_icons(output, ['missing'], size=48)
+    assert 'No files extracted' in caplog.text
+    assert not os.path.exists(resource_path.replace('_20', '_48'))
+
+
+def test_resource_manifest(tmp_path, monkeypatch) -> None:
+    resource_dir = tmp_path / 'resources'
+    resource_dir.mkdir()
+    (resource_dir / 'icons_outlined_20.json').write_text('["home_20px.svg"]')
+    (resource_dir / 'icons_rounded_20.json').write_text('["home_20px.svg"')
+    monkeypatch.setattr(_icon, '__file__', str(tmp_path / '_icon.py'))
+    monkeypatch.setattr(_icon, '_manifests', {})
+
+    manifest = MaterialIcon.resource_manifest(Style.OUTLINED, 20)
+    assert manifest == frozenset(['home_20px.svg'])
+    assert MaterialIcon.resource_exists('home', Style.OUTLINED, False, 20)
+    assert not MaterialIcon.resource_exists('home', Style.OUTLINED, True, 20)
+    # Resources without a valid manifest have none.
+    assert MaterialIcon.resource_manifest(Style.ROUNDED, 20) is None
+    assert MaterialIcon.resource_manifest(Style.SHARP, 20) is None
+
+
+def test_not_extracted_warning(app, sources, monkeypatch, caplog) -> None:
+    monkeypatch.setattr(
+        _icon, '_manifests', {(Style.OUTLINED, 20): frozenset(['home_20px.svg'])}
+    )
+    with caplog.at_level(logging.WARNING, logger=_icon.__name__):
+        MaterialIcon('home')
+        assert not caplog.text
+        MaterialIcon('home', fill=True)
+    assert 'Icon was not extracted: home:outlined:fill:20' in caplog.text
+
+
+def test_extract_variants_share_pool(sources, tmp_path, monkeypatch) -> None:
+    pools = []
+    executor = concurrent.futures.ThreadPoolExecutor
+
+    def counted(*args, **kwargs) -> concurrent.futures.ThreadPoolExecutor:
+        pools.append(kwargs.get('max_workers'))
+        return executor(*args, **kwargs)
+
+    monkeypatch.setattr(concurrent.futures, 'ThreadPoolExecutor', counted)
+    variants = [
+        ('home', Style.OUTLINED, True, 20),
+        ('add', Style.ROUNDED, False, 24),
+        ('search', Style.OUTLINED, False, 24),
+    ]
+    extract.extract_variants(variants, str(tmp_path), jobs=2)
+    # The styles and sizes are compressed by the threads of a single pool.
+    assert pools == [2]
+    resource_dir = os.path.join(extract.package_dir(str(tmp_path)), 'resources')
+    assert sorted(os.listdir(resource_dir)) == [
+        'icons_outlined_20.json',
+        'icons_outlined_20.py',
+        'icons_outlined_24.json',
+        'icons_outlined_24.py',
+        'icons_rounded_24.json',
+        'icons_rounded_24.py',
+    ]
@@ -0,0 +1,257 @@
+import math
+import struct
+
+import pytest
+from PySide6 import QtCore, QtGui
+
+from qt_material_icons import MaterialIcon, _font, _path
+from qt_material_icons.optimize import parse_path, render_svg
+from qt_material_icons.precompile import path_elements
+
+STYLE = 'outlined'
+NAMES = ('add', 'circle', 'home', 'search')
+# Font units per SVG unit, the SVGs have half units.
+SCALE = 2
+UNITS_PER_EM = 960 * SCALE
+# The line box of the font isn't centered on the em square.
+ASCENDER = 1100 * SCALE
+DESCENDER = -160 * SCALE
+
+
+def alpha_bounds(image: QtGui.QImage) -> tuple[int, int, int, int]:
+    """Return the left, top, right and bottom pixels that are more than half opaque."""
+
+    image = image.convertToFormat(QtGui.QImage.Format.Format_ARGB32)
+    xs, ys = [], []
+    for y in range(image.height()):
+        for x in range(image.width()):
+            if image.pixelColor(x, y).alpha() > 127:
+                xs.append(x)
+                ys.append(y)
+    return min(xs), min(ys), max(xs), max(ys)
+
+
+def glyph_contours(data: bytes) -> list[list[tuple[int, int, bool]]]:
+    """Return the contours of the SVG path in font units, flagged when on-curve."""
+
+    d = data.decode().split(' d="')[1].split('"')[0]
+    verbs, points = path_elements(parse_path(d))
+    coordinates = [
+        (round(x * SCALE), round(-y * SCALE)) for x, y in zip(points[::2], points[1::2])
+    ]
+    contours = []
+    index = 0
+    for verb in verbs:
+        if verb == _path.MOVE:
+            contours.append([(*coordinates[index], True)])
+        elif verb == _path.CLOSE:
+            # Contours are closed implicitly.
+            if len(contours[-1]) > 1 and contours[-1][-1] == contours[-1][0]:
+                contours[-1].pop()
+            continue
+        elif verb == _path.QUAD:
+            contours[-1].append((*coordinates[index], False))
+            index += 1
+            contours[-1].append((*coordinates[index], True))
+        else:
+            contours[-1].append((*coordinates[index], True))
+        index += 1
+    return contours
+
+
+def glyph_data(contours: list[list[tuple[int, int, bool]]]) -> bytes:
+    """Return the simple glyph of the contours with int16 coordinates."""
+
+    if not contours:
+        return b''
+    points = [point for contour in contours for point in contour]
+    xs = [x for x, _, _ in points]
+    ys = [y for _, y, _ in points]
+    ends = []
+    for contour in contours:
+        ends.append((ends[-1] if ends else -1) + len(contour))
+
+    data = struct.pack('>hhhhh', len(contours), min(xs), min(ys), max(xs), max(ys))
+    data += struct.pack(f'>{len(ends)}HH', *ends, 0)
+    data += bytes(int(on_curve) for _, _, on_curve in points)
+    deltas_x = [x - previous for x, previous in zip(xs, [0] + xs)]
+    deltas_y = [y - previous for y, previous in zip(ys, [0] + ys)]
+    data += struct.pack(f'>{len(points)}h', *deltas_x)
+    data += struct.pack(f'>{len(points)}h', *deltas_y)
+    return data + bytes(-len(data) % 4)
+
+
+def font_data(family: str, glyphs: list[bytes], first_codepoint: int) -> bytes:
+    """Return a TrueType font of the glyphs at sequential codepoints."""
+
+    glyphs = [b''] + glyphs
+    count = len(glyphs)
+    offsets = [0]
+    for glyph in glyphs:
+        offsets.append(offsets[-1] + len(glyph))
+
+    codepoints = range(first_codepoint, first_codepoint + count - 1)
+    segments = [(c, c, (gid - c) % 0x10000) for gid, c in enumerate(codepoints, 1)]
+    segments.append((0xFFFF, 0xFFFF, 1))
+    seg_count = len(segments)
+    power = 2 ** int(math.log2(seg_count))
+    subtable = struct.pack(
+        '>HHHHHHH',
+        4,
+        16 + 8 * seg_count,
+        0,
+        seg_count * 2,
+        power * 2,
+        int(math.log2(power)),
+        (seg_count - power) * 2,
+    )
+    subtable += struct.pack(f'>{seg_count}H', *(end for _, end, _ in segments))
+    subtable += struct.pack(f'>H{seg_count}H', 0, *(s for s, _, _ in segments))
+    subtable += struct.pack(f'>{seg_count}H', *(d for _, _, d in segments))
+    subtable += bytes(2 * seg_count)
+
+    names = {1: family, 2: 'Regular', 4: family, 6: family.replace(' ', '')}
+    strings = b''
+    records = b''
+    for name_id, value in names.items():
+        encoded = value.encode('utf-16-be')
+        records += struct.pack('>6H', 3, 1, 0x409, name_id, len(encoded), len(strings))
+        strings += encoded
+
+    em = UNITS_PER_EM
+    tables = {
+        b'OS/2': struct.pack(
+            '>HhHHH11h10s4I4sHHHhhhHHIIhhHHH',
+            *(4, em, 400, 5, 0),
+            *([0] * 11),
+            bytes(10),
+            *(0, 0, 0, 0),
+            b'TEST',
+            *(0x40, first_codepoint, first_codepoint + count - 2),
+            *(ASCENDER, DESCENDER, 0, ASCENDER, -DESCENDER, 1, 0, 0, 0, 0, 0, 0),
+        ),
+        b'cmap': struct.pack('>HHHHI', 0, 1, 3, 1, 12) + subtable,
+        b'glyf': b''.join(glyphs),
+        b'head': struct.pack(
+            '>IIIIHHqqhhhhHHhhh',
+            *(0x10000, 0x10000, 0, 0x5F0F3CF5, 3, em, 0, 0),
+            *(0, -em, em, em, 0, 8, 2, 1, 0),
+        ),
+        b'hhea': struct.pack(
+            '>IhhhHhhhhhhhhhhhH',
+            *(0x10000, ASCENDER, DESCENDER, 0, em, 0, 0, em),
+            *(1, 0, 0, 0, 0, 0, 0, 0, count),
+        ),
+        # The left side bearings are the left edges of the glyphs.
+        b'hmtx': b''.join(
+            struct.pack(
+                '>Hh', em, struct.unpack_from('>h', glyph, 2)[0] if glyph else 0
+            )
+            for glyph in glyphs
+        ),
+        b'loca': struct.pack(f'>{len(offsets)}I', *offsets),
+        b'maxp': struct.pack('>IHHHHHHHHHHHHHH', 0x10000, count, 1024, 64, *[0] * 11),
+        b'name': struct.pack('>HHH', 0, len(names), 6 + 12 * len(names))
+        + records
+        + strings,
+        b'post': struct.pack('>IIhhIIIII', 0x30000, 0, 0, 0, 0, 0, 0, 0, 0),
+    }
+
+    power = 2 ** int(math.log2(len(tables)))
+    header = struct.pack(
+        '>IHHHH',
+        0x10000,
+        len(tables),
+        power * 16,
+        int(math.log2(power)),
+        (len(tables) - power) * 16,
+    )
+    offset = len(header) + 16 * len(tables)
+    directory = b''
+    content = b''
+    for tag in sorted(tables):
+        table = tables[tag]
+        padded = table + bytes(-len(table) % 4)
+        checksum = sum(struct.unpack(f'>{len(padded) // 4}I', padded)) % 2**32
+        directory += struct.pack('>4sIII', tag, checksum, offset, len(table))
+        content += padded
+        offset += len(padded)
+    return header + directory + content
+
+
+@pytest.fixture(scope='session')
+def subset_dir(symbol_files: dict[str, bytes], tmp_path_factory) -> str:
+    """A font of the outlined glyphs of the fixture with the layout of the real one."""
+
+    directory = tmp_path_factory.mktemp('fonts')
+    glyphs = []
+    for name in NAMES:
+        data = symbol_files[f'{name}/materialsymbols{STYLE}/{name}_24px.svg']
+        glyphs.append(glyph_data(glyph_contours(data)))
+    filename = _font.font_filename(STYLE)
+    font = font_data('Material Symbols Outlined Subset', glyphs, 0xE000)
+    (directory / f'{filename}.ttf').write_bytes(font)
+    lines = [f'{name} {0xE000 + index:x}\n' for index, name in enumerate(NAMES)]
+    (directory / f'{filename}.codepoints').write_text(''.join(lines))
+    return str(directory)
+
+
+@pytest.fixture(params=('subset', 'compiled'))
+def family(app, request, monkeypatch) -> str:
+    """The subset font of the fixture or the font compiled into the package."""
+
+    if request.param == 'subset':
+        resource_dir = request.getfixturevalue('subset_dir')
+        monkeypatch.setattr(_font, 'RESOURCE_DIR', resource_dir)
+    monkeypatch.setattr(_font, '_families', {})
+    monkeypatch.setattr(_font, '_codepoints', {})
+    family = _font.font_family(STYLE)
+    if family is None or not family.startswith('Material Symbols'):
+        pytest.skip('Material Symbols font is not compiled')
+    return family
+
+
+@pytest.mark.parametrize('name', NAMES)
+def test_glyph_matches_svg(family, symbol_files: dict[str, bytes], name) -> None:
+    data = symbol_files[f'{name}/materialsymbols{STYLE}/{name}_24px.svg']
+    assert MaterialIcon.glyph_exists(name, MaterialIcon.Style(STYLE))
+    path = _font.glyph_path(name, STYLE, False, 24)
+
+    black = QtGui.QColor('black')
+    for size in (24, 48):
+        expected = alpha_bounds(render_svg(data, size))
+        glyph = _font.render_glyph(path, QtCore.QSize(size, size), black)
+        bounds = alpha_bounds(glyph.toImage())
+        # Hinting may move the edges of the glyph by a pixel.
+        for edge, expected_edge in zip(bounds, expected):
+            assert abs(edge - expected_edge) <= 1, (size, bounds, expected)
+
+    # Wide pixmaps center the em square.
+    glyph = _font.render_glyph(path, QtCore.QSize(48, 24), black)
+    left, top, right, bottom = alpha_bounds(glyph.toImage())
+    bounds = (left - 12, top, right - 12, bottom)
+    for edge, expected_edge in zip(bounds, alpha_bounds(render_svg(data, 24))):
+        assert abs(edge - expected_edge) <= 1, bounds
+
+
+def test_font_backend(family, sources, monkeypatch) -> None:
+    monkeypatch.setattr(MaterialIcon, 'backend', MaterialIcon.Backend.FONT)
+    style = MaterialIcon.Style(STYLE)
+    assert not MaterialIcon.glyph_exists('missing', style)
+
+    icon = MaterialIcon('home', size=24)
+    assert _font.is_glyph_path(icon._engine.path())
+    pixmap = icon.pixmap(24, color=QtGui.QColor('red'), dpr=2.0)
+    assert pixmap.size() == QtCore.QSize(48, 48)
+    assert pixmap.devicePixelRatio() == 2.0
+    image = pixmap.toImage()
+    assert image.pixelColor(24, 8).name() == '#ff0000'
+    # Other colors are tinted from the mask of the glyph.
+    images = icon.images(24, colors=[QtGui.QColor('blue')], dpr=2.0)
+    assert alpha_bounds(images[0]) == alpha_bounds(image)
+
+    # Missing glyphs are empty.
+    pixmap = MaterialIcon('missing', size=24).pixmap(24, dpr=1.0)
+    assert not any(
+        pixmap.toImage().pixelColor(x, y).alpha() for x in range(24) for y in range(24)
+    )
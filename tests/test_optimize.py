@@ -0,0 +1,155 @@
+import logging
+
+import pytest
+from PySide6 import QtGui
+
+from qt_material_icons import optimize
+from qt_material_icons.precompile import path_elements
+
+
+def test_parse_path() -> None:
+    assert optimize.parse_path('M10 20 30 40l5-5 5,5z') == [
+        ('M', [10.0, 20.0]),
+        ('L', [30.0, 40.0]),
+        ('l', [5.0, -5.0]),
+        ('l', [5.0, 5.0]),
+        ('z', []),
+    ]
+    assert optimize.parse_path('m1 2 3 4') == [('m', [1.0, 2.0]), ('l', [3.0, 4.0])]
+    assert optimize.parse_path('M.5.5-1e1-.5') == [
+        ('M', [0.5, 0.5]),
+        ('L', [-10.0, -0.5]),
+    ]
+    # Arc flags don't need to be separated from the following number.
+    assert optimize.parse_path('M0 0a1 1 0 011 1 1 1 0 1,0-1-1') == [
+        ('M', [0.0, 0.0]),
+        ('a', [1.0, 1.0, 0.0, 0.0, 1.0, 1.0, 1.0]),
+        ('a', [1.0, 1.0, 0.0, 1.0, 0.0, -1.0, -1.0]),
+    ]
+
+
+@pytest.mark.parametrize(
+    'd', ('10 10', 'Mx', 'M10', 'M0 0Z 10', 'M0 0A1 1 0 2 1 3 3', 'M0 0L1 1 2')
+)
+def test_parse_path_invalid(d: str) -> None:
+    with pytest.raises(ValueError):
+        optimize.parse_path(d)
+
+
+def test_format_path() -> None:
+    segments = optimize.parse_path('M 10 20 L 30.004 40 L 40 50 Z')
+    assert optimize.format_path(segments) == 'm10 20 20 20 10 10z'
+    segments = optimize.parse_path('M100 100 L 100.5 100 L 200 200')
+    assert optimize.format_path(segments) == 'm100 100 .5 0 99.5 100'
+    segments = optimize.parse_path('M0 0A5 5 0 0 1 10 10')
+    assert optimize.format_path(segments) == 'm0 0a5 5 0 0 1 10 10'
+    assert optimize.format_path(optimize.parse_path('M1.234 0'), 1) == 'm1.2 0'
+
+
+@pytest.mark.parametrize('precision', (0, 1, 2))
+def test_format_path_round_trip(
+    symbol_files: dict[str, bytes], arc_files: dict[str, bytes], precision: int
+) -> None:
+    # Rounding errors don't accumulate over the relative coordinates. The
+    # reflected control point of a smooth curve adds the errors of two points.
+    tolerance = 1.5 / 10**precision + 1e-9
+    paths = [
+        ' Z'.join(d.split('Z'))
+        for d in ('M1 1h2.345v2.345H1z', 'M.25.75q1.5 2 3 0t3 0')
+    ]
+    for data in (*symbol_files.values(), *arc_files.values()):
+        paths.append(data.decode().split(' d="')[1].split('"')[0])
+    for d in paths:
+        segments = optimize.parse_path(d)
+        formatted = optimize.parse_path(optimize.format_path(segments, precision))
+        verbs, points = path_elements(segments)
+        formatted_verbs, formatted_points = path_elements(formatted)
+        assert formatted_verbs == verbs, d
+        for point, formatted_point in zip(points, formatted_points):
+            assert formatted_point == pytest.approx(point, abs=tolerance), d
+
+
+def test_optimize_svg() -> None:
+    data = (
+        b'<?xml version="1.0"?>\n'
+        b'<svg xmlns="http://www.w3.org/2000/svg" xmlns:i="http://example.com/i"'
+        b' version="1.1" id="icon" viewBox="0 0 24 24" i:editor="1">\n'
+        b'  <title>icon</title>\n'
+        b'  <g>\n'
+        b'    <path id="p" d="M 1.0 2.0 L 3.0 4.0 Z"/>\n'
+        b'  </g>\n'
+        b'  <i:meta/>\n'
+        b'</svg>\n'
+    )
+    assert optimize.optimize_svg(data) == (
+        b'<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 24 24">'
+        b'<path d="m1 2 2 2z"/></svg>'
+    )
+
+
+def test_optimize_svg_keeps_references() -> None:
+    data = (
+        b'<svg xmlns="http://www.w3.org/2000/svg"'
+        b' xmlns:xlink="http://www.w3.org/1999/xlink">'
+        b'<defs><path id="p" d="M0 0h1v1z"/></defs><use xlink:href="#p"/></svg>'
+    )
+    optimized = optimize.optimize_svg(data)
+    assert b'id="p"' in optimized
+    assert b'xlink:href="#p"' in optimized
+
+
+def test_optimize_svg_unsupported() -> None:
+    with pytest.raises(ValueError):
+        optimize.optimize_svg(b'<html/>')
+
+
+def test_optimized_renders_equal(
+    app, symbol_files: dict[str, bytes], arc_files: dict[str, bytes]
+) -> None:
+    for path, data in {**symbol_files, **arc_files}.items():
+        optimized = optimize.optimize_svg(data)
+        difference = optimize.svg_difference(data, optimized, (20, 24, 48))
+        assert difference <= optimize.DIFF_THRESHOLD, path
+
+
+def test_image_difference(app) -> None:
+    image = optimize.render_svg(
+        b'<svg viewBox="0 0 2 2"><path d="M0 0h1v1z"/></svg>', 8
+    )
+    assert optimize.image_difference(image, image.copy()) == 0
+
+    other = image.copy()
+    other.setPixelColor(7, 7, QtGui.QColor(0, 0, 0, 10))
+    assert optimize.image_difference(image, other) == 10
+    assert optimize.image_difference(image, image.scaled(4, 4)) == 255
+
+
+def test_optimize_files(app, symbol_files: dict[str, bytes]) -> None:
+    # The Material Symbols are minified already, an editor adds markup.
+    path = 'home/materialsymbolsoutlined/home_24px.svg'
+    exported = b'<?xml version="1.0"?>\n' + symbol_files[path].replace(
+        b'<path', b'\n  <title>home</title>\n  <path id="path1"'
+    )
+    sources = {**symbol_files, 'exported.svg': exported}
+    files, report = optimize.optimize_files(sources, 24)
+    assert files.keys() == sources.keys()
+    assert report.files == len(sources)
+    assert report.rejected == []
+    assert report.original_bytes == sum(map(len, sources.values()))
+    assert report.optimized_bytes == sum(map(len, files.values()))
+    # Files are only replaced by shorter data.
+    assert all(len(files[p]) <= len(data) for p, data in sources.items())
+    assert len(files['exported.svg']) <= len(symbol_files[path])
+    assert report.saved >= len(exported) - len(symbol_files[path])
+
+
+def test_optimize_files_rejected(app, arc_files: dict[str, bytes], caplog) -> None:
+    # Rounding to hundreds of units moves the points of a 24 unit viewBox.
+    files = {'circle.svg': arc_files['circle.svg'], 'broken.svg': b'<svg'}
+    with caplog.at_level(logging.WARNING, logger=optimize.__name__):
+        optimized, report = optimize.optimize_files(files, 24, precision=-2)
+    assert optimized == files
+    assert sorted(report.rejected) == ['broken.svg', 'circle.svg']
+    assert report.saved == 0
+    assert 'keeping original: circle.svg' in caplog.text
+    assert 'Could not optimize svg: broken.svg' in caplog.text
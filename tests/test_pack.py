@@ -0,0 +1,103 @@
+import pytest
+from PySide6 import QtCore
+
+from qt_material_icons import MaterialIcon, _icon
+from qt_material_icons._pack import IconPack, write_pack
+from qt_material_icons._rcc import Compressed, FORMAT_VERSION
+
+STYLE = MaterialIcon.Style.OUTLINED
+BLOBS = {
+    'home_20px.svg': b'<svg>' + b'<path d="M0 0h20v20H0z"/>' * 20,
+    'home_fill1_20px.svg': b'<svg>' + b'<path d="M0 0h20v20H0z"/>' * 20,
+    'add_20px.svg': b'<svg/>',
+    'home_20px.path': b'QMPP',
+}
+
+
+@pytest.fixture
+def pack(tmp_path):
+    path = str(tmp_path / 'icons.pack')
+    write_pack(path, BLOBS)
+    pack = IconPack(path)
+    yield pack
+    pack.close()
+
+
+def test_pack_data(pack) -> None:
+    assert len(pack) == len(BLOBS)
+    assert sorted(pack) == sorted(BLOBS)
+    for name, data in BLOBS.items():
+        assert name in pack
+        assert pack.data(name) == data
+    assert 'search_20px.svg' not in pack
+    with pytest.raises(KeyError):
+        pack.data('search_20px.svg')
+
+
+def test_pack_lookup(tmp_path) -> None:
+    # Enough names that the binary search visits both halves of the table.
+    blobs = {f'icon_{index:03}_20px.svg': b'%d' % index for index in range(1, 200, 2)}
+    blobs['bär_20px.svg'] = b'utf-8'
+    path = str(tmp_path / 'icons.pack')
+    write_pack(path, blobs, compress=False)
+    pack = IconPack(path)
+    try:
+        for name, data in blobs.items():
+            assert pack.data(name) == data
+        for name in ('icon_000_20px.svg', 'icon_100_20px.svg', 'icon_200_20px.svg'):
+            assert name not in pack
+        assert '' not in pack
+        assert 'zzz' not in pack
+    finally:
+        pack.close()
+
+
+def test_pack_unsupported(tmp_path) -> None:
+    path = tmp_path / 'icons.pack'
+    path.write_bytes(b'QMIP\x01\x00\x00\x00\x00\x00\x00\x00')
+    with pytest.raises(ValueError):
+        IconPack(str(path))
+
+
+def test_resource_data(pack, monkeypatch) -> None:
+    monkeypatch.setattr(_icon, 'open_pack', lambda style, size: pack)
+    monkeypatch.setattr(_icon, '_manifests', {(STYLE, 20): None})
+    data = MaterialIcon.resource_data('home', STYLE, True, 20)
+    assert data == BLOBS['home_fill1_20px.svg']
+    assert MaterialIcon.resource_data('search', STYLE, False, 20) is None
+    assert MaterialIcon.resource_exists('add', STYLE, False, 20)
+    assert not MaterialIcon.resource_exists('add', STYLE, True, 20)
+    # Compiled paths are found next to the SVG.
+    path = MaterialIcon.resource_path('home', STYLE, False, 20)
+    assert MaterialIcon.compiled_path_data(path) == b'QMPP'
+    assert MaterialIcon.compiled_path_data(path.replace('home_', 'add_')) is None
+
+
+def test_pack_items(pack) -> None:
+    items = dict(pack.items())
+    assert isinstance(items['home_20px.svg'], Compressed)
+    assert items['add_20px.svg'] == b'<svg/>'
+    # Equal blobs share the data.
+    assert items['home_20px.svg'] == items['home_fill1_20px.svg']
+
+
+def test_register_pack(pack, monkeypatch) -> None:
+    monkeypatch.setattr(_icon, 'open_pack', lambda style, size: pack)
+    monkeypatch.setattr(_icon, '_registered', {})
+    assert MaterialIcon.register_pack(STYLE, 20)
+    try:
+        for name, fill in (('home', False), ('home', True), ('add', False)):
+            path = MaterialIcon.resource_path(name, STYLE, fill, 20)
+            qfile = QtCore.QFile(path)
+            assert qfile.open(QtCore.QIODevice.OpenModeFlag.ReadOnly)
+            assert qfile.readAll().data() == pack.data(path.split('/')[-1])
+            qfile.close()
+    finally:
+        sections = _icon._registered[(STYLE, 20)]
+        QtCore.qUnregisterResourceData(FORMAT_VERSION, *sections)
+
+
+def test_register_missing_pack(monkeypatch) -> None:
+    monkeypatch.setattr(_icon, 'open_pack', lambda style, size: None)
+    monkeypatch.setattr(_icon, '_registered', {})
+    assert not MaterialIcon.register_pack(STYLE, 20)
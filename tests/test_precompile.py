@@ -0,0 +1,161 @@
+import math
+import struct
+
+import pytest
+from PySide6 import QtCore, QtGui
+
+from qt_material_icons import _engine, _path
+from qt_material_icons.optimize import DIFF_THRESHOLD, image_difference, render_svg
+from qt_material_icons.precompile import (
+    arc_cubics,
+    compile_files,
+    compile_svg,
+    path_difference,
+)
+
+# The largest distance of a cubic curve of 90 degrees from the circle.
+CUBIC_ERROR = 2.8e-4
+
+
+def cubic_point(x: float, y: float, cubic: list[float], t: float) -> tuple:
+    points = [(x, y), tuple(cubic[0:2]), tuple(cubic[2:4]), tuple(cubic[4:6])]
+    weights = ((1 - t) ** 3, 3 * (1 - t) ** 2 * t, 3 * (1 - t) * t**2, t**3)
+    return (
+        sum(w * p[0] for w, p in zip(weights, points)),
+        sum(w * p[1] for w, p in zip(weights, points)),
+    )
+
+
+def check_circle(x: float, y: float, cubics: list, cx: float, cy: float, r: float):
+    for cubic in cubics:
+        for t in (0.25, 0.5, 0.75, 1.0):
+            px, py = cubic_point(x, y, cubic, t)
+            assert math.hypot(px - cx, py - cy) == pytest.approx(r, abs=r * CUBIC_ERROR)
+        x, y = cubic[4:6]
+
+
+def test_arc_cubics_quarter() -> None:
+    (cubic,) = arc_cubics(10, 0, 10, 10, 0, 0, 1, 0, 10)
+    k = 4 / 3 * (math.sqrt(2) - 1) * 10
+    assert cubic == pytest.approx([10, k, k, 10, 0, 10])
+
+
+@pytest.mark.parametrize(
+    ('large_arc', 'sweep', 'count', 'center'),
+    ((0, 0, 1, (0, 10)), (0, 1, 1, (10, 0)), (1, 0, 3, (10, 0)), (1, 1, 3, (0, 10))),
+)
+def test_arc_cubics_flags(
+    large_arc: int, sweep: int, count: int, center: tuple[float, float]
+) -> None:
+    cubics = arc_cubics(10, 10, 10, 10, 0, large_arc, sweep, 0, 0)
+    assert len(cubics) == count
+    assert cubics[-1][4:6] == [0, 0]
+    check_circle(10, 10, cubics, *center, 10)
+
+
+def test_arc_cubics_scaled_radii() -> None:
+    # Radii that are too small are scaled up to a half circle.
+    cubics = arc_cubics(4, 4, 1, 1, 0, 0, 1, 20, 20)
+    assert len(cubics) == 2
+    check_circle(4, 4, cubics, 12, 12, math.hypot(8, 8))
+
+
+def test_arc_cubics_rotated() -> None:
+    # The end points are opposite on an ellipse around the origin rotated by 30°.
+    angle = math.radians(30)
+    x, y = 20 * math.cos(angle), 20 * math.sin(angle)
+    cubics = arc_cubics(x, y, 20, 5, 30, 0, 1, -x, -y)
+    assert len(cubics) == 2
+    for cubic in cubics:
+        for t in (0.25, 0.5, 0.75, 1.0):
+            px, py = cubic_point(x, y, cubic, t)
+            u = px * math.cos(angle) + py * math.sin(angle)
+            v = -px * math.sin(angle) + py * math.cos(angle)
+            assert math.hypot(u / 20, v / 5) == pytest.approx(1, abs=CUBIC_ERROR)
+        x, y = cubic[4:6]
+
+
+def test_arc_cubics_degenerate() -> None:
+    assert arc_cubics(1, 1, 5, 5, 0, 0, 1, 1, 1) == []
+    assert arc_cubics(1, 1, 0, 5, 0, 0, 1, 3, 3) is None
+
+
+def test_encode_decode_path() -> None:
+    verbs = [_path.MOVE, _path.LINE, _path.QUAD, _path.CUBIC, _path.CLOSE]
+    points = [0, 0, 24, 0, 24, 12, 12, 24, 8, 24, 4, 20, 0, 12]
+    for even_odd in (False, True):
+        data = _path.encode_path(verbs, points, (0, -24, 24, 24), even_odd)
+        compiled = _path.decode_path(data)
+        assert compiled.view_box == QtCore.QRectF(0, -24, 24, 24)
+        fill_rule = compiled.path.fillRule()
+        assert (fill_rule == QtCore.Qt.FillRule.OddEvenFill) == even_odd
+
+        # Qt stores quads as cubics and closes a subpath with a line to its start.
+        path = compiled.path
+        elements = [path.elementAt(i) for i in range(path.elementCount())]
+        coordinates = [(e.x, e.y) for e in elements]
+        assert coordinates == [
+            (0, 0),
+            (24, 0),
+            (24, 8),
+            (20, 16),
+            (12, 24),
+            (8, 24),
+            (4, 20),
+            (0, 12),
+            (0, 0),
+        ]
+        assert elements[0].isMoveTo()
+        assert elements[1].isLineTo()
+        assert elements[2].isCurveTo()
+
+
+@pytest.mark.parametrize(
+    ('data', 'message'),
+    (
+        (b'XXXX' + bytes(_path.HEADER.size), 'Unsupported'),
+        (_path.HEADER.pack(_path.MAGIC, 2, 0, 0, 0, 0, 0, 1, 1), 'Unsupported'),
+        (_path.encode_path([_path.MOVE], [0, 0], (0, 0, 1, 1))[:-1], 'Truncated'),
+        (_path.encode_path([7], [], (0, 0, 1, 1)), 'Invalid verb'),
+    ),
+)
+def test_decode_path_invalid(data: bytes, message: str) -> None:
+    with pytest.raises((ValueError, struct.error), match=message):
+        _path.decode_path(data)
+
+
+def test_compile_svg_unsupported() -> None:
+    svg = '<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 24 24"{}>{}</svg>'
+    for attributes, content in (
+        (' fill="red"', '<path d="M0 0h1v1z"/>'),
+        ('', '<circle r="5"/>'),
+        ('', '<path fill="red" d="M0 0h1v1z"/>'),
+        ('', '<path d="M0 0h1v1z"/><path fill-rule="evenodd" d="M0 0h1v1z"/>'),
+        ('', ''),
+    ):
+        assert compile_svg(svg.format(attributes, content).encode()) is None
+
+
+def test_compiled_renders_equal(
+    app, symbol_files: dict[str, bytes], arc_files: dict[str, bytes]
+) -> None:
+    for path, data in {**symbol_files, **arc_files}.items():
+        compiled = compile_svg(data)
+        assert compiled is not None, path
+        assert path_difference(data, compiled, (20, 24, 48, 96)) <= DIFF_THRESHOLD
+
+        # The PATH rendering of the engine at fractional scales
+        decoded = _path.decode_path(compiled)
+        black = QtGui.QColor('black')
+        for dpr in (1.0, 1.5):
+            image = _engine.render_path(path, decoded, QtCore.QSize(24, 24), black, dpr)
+            expected = render_svg(data, round(24 * dpr))
+            image.setDevicePixelRatio(1.0)
+            assert image_difference(expected, image) <= DIFF_THRESHOLD, path
+
+
+def test_compile_files(app, arc_files: dict[str, bytes]) -> None:
+    files = {**arc_files, 'text.svg': b'<svg><text>a</text></svg>'}
+    paths, rejected = compile_files(files, 24)
+    assert rejected == ['text.svg']
+    assert sorted(paths) == sorted(p.replace('.svg', '.path') for p in arc_files)
@@ -0,0 +1,85 @@
+import pytest
+from PySide6 import QtCore, QtGui
+
+from qt_material_icons import MaterialIcon, Preload, _engine, _path
+from qt_material_icons._cache import image_cache, pixmap_cache
+from qt_material_icons._engine import Rendering, SVGIconEngine, pixmap_key
+from qt_material_icons.precompile import compile_svg
+
+RESOURCE_DIR = ':/material-design-icons/symbols/web/'
+COLOR = QtGui.QColor('red')
+SPECS = [
+    ('home', MaterialIcon.OUTLINED, False, 24, None),
+    ('search', MaterialIcon.OUTLINED, True, 20, COLOR),
+]
+
+
+@pytest.fixture
+def compiled_paths(symbol_files: dict[str, bytes], monkeypatch) -> None:
+    """Compile the paths of the fixture instead of reading them from the packs."""
+
+    def loader(path: str) -> bytes | None:
+        data = symbol_files.get(path.removeprefix(RESOURCE_DIR))
+        return None if data is None else compile_svg(data)
+
+    monkeypatch.setattr(_path, '_loaders', [loader])
+
+
+def wait_finished(preload: Preload) -> bool:
+    """Run an event loop until the images are rasterized."""
+
+    loop = QtCore.QEventLoop()
+    preload.finished.connect(loop.quit)
+    QtCore.QTimer.singleShot(5000, loop.quit)
+    # The images of the pool may be finished already.
+    if not preload.is_finished():
+        loop.exec()
+    return preload.is_finished()
+
+
+@pytest.mark.parametrize('rendering', list(Rendering))
+def test_preload(sources, compiled_paths, monkeypatch, rendering) -> None:
+    monkeypatch.setattr(SVGIconEngine, 'rendering', rendering)
+    preload = MaterialIcon.preload(SPECS, dpr=1.5)
+    assert wait_finished(preload)
+
+    # Icons that are cached already are not preloaded again.
+    cached = MaterialIcon.preload(SPECS, dpr=1.5)
+    assert cached.is_finished()
+    QtCore.QCoreApplication.processEvents()
+
+    # The first pixmap takes the preloaded image instead of rendering the SVG.
+    for name in ('svg_renderer', 'render_mask', 'render_path', 'render_pixmap'):
+        monkeypatch.setattr(_engine, name, None)
+    for name, style, fill, size, color in SPECS:
+        icon = MaterialIcon(name, style, fill, size)
+        if color is None:
+            color = icon._engine.color()
+        path = MaterialIcon.resource_path(name, style, fill, size)
+        key = pixmap_key(path, QtCore.QSize(size, size), 1.5, color)
+        image = image_cache.get(key)
+        assert image is not None
+        assert image.size() == _engine.physical_size(QtCore.QSize(size, size), 1.5)
+        opaque = {
+            image.pixelColor(x, y).rgba()
+            for y in range(image.height())
+            for x in range(image.width())
+            if image.pixelColor(x, y).alpha() == 255
+        }
+        assert opaque == {color.rgba()}
+
+        pixmap = icon.pixmap(size, color=color, dpr=1.5)
+        assert key not in image_cache
+        assert key in pixmap_cache
+        assert pixmap.devicePixelRatio() == 1.5
+        assert pixmap.toImage().convertToFormat(image.format()) == image
+
+
+def test_preload_empty(sources) -> None:
+    preload = MaterialIcon.preload([])
+    assert preload.is_finished()
+    # 'finished' is emitted from the event loop after it could be connected.
+    emitted = []
+    preload.finished.connect(lambda: emitted.append(True))
+    QtCore.QCoreApplication.processEvents()
+    assert emitted == [True]
@@ -0,0 +1,121 @@
+import io
+import os
+import zlib
+
+import pytest
+from PySide6 import QtCore
+
+from qt_material_icons import _rcc
+
+FILES = {
+    'icons/outlined/home_20px.svg': b'<svg>' + b'<path d="M0 0h20v20H0z"/>' * 40,
+    'icons/outlined/home_fill1_20px.svg': b'<svg>' + b'<path d="M0 0h20v20H0z"/>' * 40,
+    'icons/outlined/x.svg': b'<svg/>',
+    'icons/rounded/empty.svg': b'',
+    'icons/rounded/bär.svg': os.urandom(256),
+    'catalog.json': b'{}',
+}
+# Enough names in one directory that the order of the hashes matters.
+FILES.update({f'many/icon_{index}.svg': os.urandom(index + 1) for index in range(64)})
+
+
+def read(path: str) -> bytes | None:
+    qfile = QtCore.QFile(path)
+    if not qfile.open(QtCore.QIODevice.OpenModeFlag.ReadOnly):
+        return None
+    data = qfile.readAll().data()
+    qfile.close()
+    return data
+
+
+def check_files(root: str, files: dict) -> None:
+    for path, data in files.items():
+        if isinstance(data, _rcc.Compressed):
+            data = zlib.decompress(data.data)
+        assert read(f':{root}/{path}') == data, path
+
+
+@pytest.fixture
+def registered(tmp_path):
+    registrations = []
+
+    def register(tree: _rcc.ResourceTree, root: str) -> None:
+        path = str(tmp_path / f'{len(registrations)}.rcc')
+        with open(path, 'wb') as f:
+            _rcc.write_rcc(f, tree)
+        assert QtCore.QResource.registerResource(path, root)
+        registrations.append((path, root))
+
+    yield register
+    for path, root in registrations:
+        QtCore.QResource.unregisterResource(path, root)
+
+
+def test_rcc_round_trip(registered) -> None:
+    registered(_rcc.ResourceTree(FILES), '/rcc_round_trip')
+    check_files('/rcc_round_trip', FILES)
+
+    directory = QtCore.QDir(':/rcc_round_trip/many')
+    assert len(directory.entryList()) == 64
+
+
+def test_rcc_compression(registered) -> None:
+    tree = _rcc.ResourceTree(FILES)
+    registered(tree, '/rcc_compression')
+    assert tree.flags() & _rcc.COMPRESSED
+
+    compressed = QtCore.QResource(':/rcc_compression/icons/outlined/home_20px.svg')
+    assert compressed.compressionAlgorithm() == QtCore.QResource.ZlibCompression
+    stored = QtCore.QResource(':/rcc_compression/icons/outlined/x.svg')
+    assert stored.compressionAlgorithm() == QtCore.QResource.NoCompression
+
+
+def test_rcc_uncompressed(registered) -> None:
+    tree = _rcc.ResourceTree(FILES, compress_threshold=None)
+    registered(tree, '/rcc_uncompressed')
+    assert not tree.flags() & _rcc.COMPRESSED
+    check_files('/rcc_uncompressed', FILES)
+
+
+def test_rcc_precompressed(registered) -> None:
+    data = b'<svg>' + b'<g/>' * 200
+    files = {'a.svg': _rcc.compress_data(data), 'b.svg': data}
+    assert isinstance(files['a.svg'], _rcc.Compressed)
+    registered(_rcc.ResourceTree(files), '/rcc_precompressed')
+    check_files('/rcc_precompressed', files)
+
+
+def test_rcc_duplicates() -> None:
+    tree = _rcc.ResourceTree(FILES)
+    _rcc.write_rcc(io.BytesIO(), tree)
+    assert tree.duplicates == 1
+    assert tree.duplicate_bytes > 0
+
+
+def test_rcc_module() -> None:
+    files = {f'rcc_module/{path}': data for path, data in FILES.items()}
+    buffer = io.StringIO()
+    _rcc.write_rcc_module(buffer, _rcc.ResourceTree(files))
+    namespace = {}
+    exec(buffer.getvalue(), namespace)
+    try:
+        check_files('', files)
+    finally:
+        namespace['qCleanupResources']()
+    assert read(':/rcc_module/catalog.json') is None
+
+
+def test_resource_sections() -> None:
+    files = {f'rcc_sections/{path}': data for path, data in FILES.items()}
+    sections = _rcc.resource_sections(_rcc.ResourceTree(files))
+    assert QtCore.qRegisterResourceData(_rcc.FORMAT_VERSION, *sections)
+    try:
+        check_files('', files)
+    finally:
+        QtCore.qUnregisterResourceData(_rcc.FORMAT_VERSION, *sections)
+
+
+def test_qt_hash() -> None:
+    assert _rcc.qt_hash('') == 0
+    assert _rcc.qt_hash('a') == ord('a')
+    assert _rcc.qt_hash('ab') == (ord('a') << 4) + ord('b')
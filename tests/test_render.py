@@ -0,0 +1,69 @@
+import json
+import logging
+import os
+import struct
+
+from PySide6 import QtGui
+
+from qt_material_icons import IconAtlas, MaterialIcon
+from qt_material_icons.__main__ import main_render
+
+ARGV = [
+    '--names',
+    'home',
+    'search',
+    '--colors',
+    'red',
+    '--dprs',
+    '1',
+    '2',
+    '--formats',
+    'png',
+    'ico',
+    '--atlas',
+    'icons',
+    # Render in this process, so the icons are read from the fixture.
+    '--jobs',
+    '1',
+]
+
+
+def test_main_render(sources, tmp_path, caplog) -> None:
+    output = str(tmp_path)
+    main_render(ARGV + ['-o', output])
+
+    pngs = [
+        f'{name}_outlined_24px_ffff0000{suffix}.png'
+        for name in ('home', 'search')
+        for suffix in ('', '@2x')
+    ]
+    icos = ['home_outlined_ffff0000.ico', 'search_outlined_ffff0000.ico']
+    atlases = ['icons.png', 'icons@2x.png']
+    with open(tmp_path / '.manifest.json') as f:
+        manifest = json.load(f)
+    assert sorted(manifest) == sorted(pngs + icos + atlases)
+    for filename in pngs + icos + atlases:
+        assert os.path.exists(tmp_path / filename), filename
+
+    image = QtGui.QImage(str(tmp_path / pngs[1]))
+    assert image.width() == 48
+    assert image.pixelColor(24, 8).name() == '#ff0000'
+    with open(tmp_path / icos[0], 'rb') as f:
+        assert struct.unpack('<HHH', f.read(6)) == (0, 1, 2)
+    atlas = IconAtlas.load(str(tmp_path / 'icons@2x.png'))
+    spec = ('home', MaterialIcon.OUTLINED, False, 24, QtGui.QColor('red'))
+    assert atlas.rect(spec).width() == 48
+
+    # A second run doesn't render the outputs again.
+    modified = {name: os.path.getmtime(tmp_path / name) for name in manifest}
+    with caplog.at_level(logging.INFO):
+        main_render(ARGV + ['-o', output])
+    assert 'Skipped 6 outputs that are up to date.' in caplog.text
+    assert 'Rendered 0 outputs' in caplog.text
+    assert all(os.path.getmtime(tmp_path / n) == t for n, t in modified.items())
+
+    # Forced outputs are rendered again.
+    caplog.clear()
+    with caplog.at_level(logging.INFO):
+        main_render(ARGV + ['-o', output, '--force'])
+    assert 'Rendered 8 outputs' in caplog.text
@@ -0,0 +1,81 @@
+import os
+
+from qt_material_icons import MaterialIcon, scan
+
+
+def write(path: str, source: str) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w') as f:
+        f.write(source)
+
+
+def test_excluded_package(tmp_path) -> None:
+    write(str(tmp_path / 'app' / 'main.py'), '')
+    write(str(tmp_path / 'qt_material_icons' / '_icon.py'), '')
+    write(str(tmp_path / '.venv' / 'lib.py'), '')
+
+    files = scan.source_files([str(tmp_path)], [str(tmp_path / 'qt_material_icons')])
+    assert files == [str(tmp_path / 'app' / 'main.py')]
+
+
+def test_default_cache_path(tmp_path) -> None:
+    path = scan.default_cache_path(str(tmp_path))
+    assert not path.startswith(str(tmp_path))
+    assert path == scan.default_cache_path(str(tmp_path))
+
+
+def names(source: str) -> tuple[set[str], list[str]]:
+    variants, unresolved = scan.scan_source(source, 'module.py')
+    return {variant[0] for variant in variants}, unresolved
+
+
+def test_literal_variants() -> None:
+    variants, unresolved = scan.scan_source(
+        'MaterialIcon("home", MaterialIcon.Style.ROUNDED, fill=True, size=24)'
+    )
+    assert variants == {('home', MaterialIcon.Style.ROUNDED, True, 24)}
+    assert unresolved == []
+
+
+def test_tables() -> None:
+    source = '''
+ICONS = {'save': 'save', 'open': 'folder_open'}
+def build():
+    MaterialIcon(ICONS['save'])
+    for name in NAMES:
+        MaterialIcon.get(name)
+    return [MaterialIcon(icon) for icon in ('add', 'remove')]
+NAMES = ['home', 'search']
+'''
+    assert names(source) == (
+        {'save', 'folder_open', 'home', 'search', 'add', 'remove'},
+        [],
+    )
+
+
+def test_scopes() -> None:
+    source = '''
+name = 'Window title'
+def icon(name):
+    return MaterialIcon(name)
+def other():
+    name = 'settings'
+    return MaterialIcon(name)
+'''
+    assert names(source) == ({'settings'}, ['module.py:4'])
+
+
+def test_class_attributes() -> None:
+    source = '''
+ICONS = ('module',)
+class Icons:
+    HOME = 'home'
+class Widget:
+    ICONS = ('add', 'remove')
+    def build(self):
+        for name in self.ICONS:
+            MaterialIcon(name)
+        MaterialIcon(Icons.HOME)
+        MaterialIcon(self.HOME)
+'''
+    assert names(source) == ({'add', 'remove', 'home'}, ['module.py:11'])
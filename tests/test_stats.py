@@ -0,0 +1,56 @@
+import pytest
+from PySide6 import QtCore, QtGui
+
+from qt_material_icons import _engine, _path
+from qt_material_icons._cache import mask_cache, pixmap_cache
+from qt_material_icons._stats import stats
+
+SVG = (
+    b'<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 24 24">'
+    b'<path d="M4 4h16v16H4z"/></svg>'
+)
+SIZE = 16
+
+
+@pytest.fixture
+def collect(app, monkeypatch):
+    monkeypatch.setattr(_path, '_loaders', [])
+    pixmap_cache.clear()
+    mask_cache.clear()
+    _path.clear()
+    stats.reset()
+    stats.enable()
+    yield stats
+    stats.enable(False)
+    stats.reset()
+
+
+def render(path: str, rendering: _engine.Rendering, monkeypatch) -> None:
+    monkeypatch.setattr(_engine.SVGIconEngine, 'rendering', rendering)
+    engine = _engine.SVGIconEngine(path, data=SVG)
+    engine.pixmap(QtCore.QSize(SIZE, SIZE), color=QtGui.QColor('red'), dpr=1.0)
+
+
+def test_mask_stats(collect, monkeypatch) -> None:
+    render(':/icon.svg', _engine.Rendering.MASK, monkeypatch)
+
+    data = collect.snapshot()
+    assert data['renders'] == {':/icon.svg': 1}
+    assert collect.keys['tint_mask'] == {':/icon.svg': 1}
+    # The alpha mask and the tinted image
+    assert data['bytes'] == SIZE * SIZE + SIZE * SIZE * 4
+
+
+def test_path_stats(collect, monkeypatch) -> None:
+    compiled = _path.encode_path(
+        [_path.MOVE, _path.LINE, _path.LINE, _path.CLOSE],
+        [4, 4, 20, 4, 20, 20],
+        (0, 0, 24, 24),
+    )
+    monkeypatch.setattr(_path, '_loaders', [lambda path: compiled])
+    render(':/icon.svg', _engine.Rendering.PATH, monkeypatch)
+
+    data = collect.snapshot()
+    assert data['renders'] == {':/icon.svg': 1}
+    assert collect.keys['decode_path'] == {':/icon.svg': 1}
+    assert data['bytes'] == SIZE * SIZE * 4